@@ -3,5 +3,9 @@
 # Extend namespace to allow aqua-diagnostics to contribute
 __path__ = __import__('pkgutil').extend_path(__path__, __name__)
 
-from .core import *
 from .core import __version__, __all__
+from .core import _LAZY_ATTRIBUTES
+from .core.util.lazy import lazy_attributes
+
+# Public API is resolved lazily from the aqua.core modules defining it (see aqua/core/__init__.py)
+__getattr__, __dir__ = lazy_attributes(__name__, {name: f".core{module}" for name, module in _LAZY_ATTRIBUTES.items()})
@@ -1,24 +1,36 @@
 """AQUA module"""
 from .version import __version__
-from .graphics import plot_single_map, plot_maps, plot_single_map_diff, plot_timeseries
-from .graphics import plot_hovmoller
-from .graphics import plot_lat_lon_profiles, plot_seasonal_lat_lon_profiles
-from .catgen import AquaFDBGenerator
-from .drop import Drop
-from .reader import Reader, Streaming, show_catalog_content
-from .regridder import Regridder
-from .gridbuilder import GridBuilder
-from .fldstat import FldStat
-from .fixer import Fixer
-from .accessor import AquaAccessor
-from .histogram import histogram
+from .util.lazy import lazy_attributes
 
+# The public API is imported lazily on first access, so that importing aqua
+# (e.g. from the console) does not pay for graphics, reader and dask imports.
+_LAZY_ATTRIBUTES = {
+    "plot_single_map": ".graphics", "plot_maps": ".graphics",
+    "plot_single_map_diff": ".graphics", "plot_timeseries": ".graphics",
+    "plot_hovmoller": ".graphics",
+    "plot_lat_lon_profiles": ".graphics", "plot_seasonal_lat_lon_profiles": ".graphics",
+    "AquaFDBGenerator": ".catgen",
+    "Drop": ".drop",
+    "Reader": ".reader", "Streaming": ".reader", "show_catalog_content": ".reader",
+    "ReaderPool": ".reader", "get_reader": ".reader", "reader_pool": ".reader",
+    "Regridder": ".regridder",
+    "GridBuilder": ".gridbuilder",
+    "FldStat": ".fldstat",
+    "Fixer": ".fixer",
+    "AquaAccessor": ".accessor",
+    "histogram": ".histogram", "HistogramAccumulator": ".histogram",
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES)
+
+# register the xarray "aqua" accessor, which imports the Reader only when used
+from . import accessor  # noqa: F401,E402
 
 __all__ = ["plot_single_map", "plot_maps", "plot_single_map_diff", "plot_timeseries",
-           "plot_hovmoller", "histogram",
+           "plot_hovmoller", "histogram", "HistogramAccumulator",
            "plot_lat_lon_profiles", "plot_seasonal_lat_lon_profiles",
            "AquaFDBGenerator",
            "Drop",
-           "Reader", "Streaming", "show_catalog_content",
+           "Reader", "ReaderPool", "get_reader", "reader_pool", "Streaming", "show_catalog_content",
            "Regridder", "GridBuilder",
            "Fixer", "FldStat"]
@@ -2,15 +2,14 @@
 
 import xarray as xr
 
-from .graphics import plot_single_map
-from .reader import Reader
-
 
 # For now not distinguishing between dataarray and dataset methods
 @xr.register_dataset_accessor("aqua")
 @xr.register_dataarray_accessor("aqua")
 class AquaAccessor:
     def __init__(self, xarray_obj):
+        from .reader import Reader  # reader is heavy, import only when the accessor is used
+
         self._obj = xarray_obj
         self.instance = Reader.instance  # by default use the latest available instance of the Reader class
 
@@ -29,6 +28,8 @@ class AquaAccessor:
 
     def plot_single_map(self, **kwargs):
         """Plot contour or pcolormesh map of a single variable."""
+        from .graphics import plot_single_map  # graphics is heavy, import only when plotting
+
         plot_single_map(self._obj, **kwargs)
 
     def select_area(self, **kwargs):
@@ -68,6 +69,14 @@ class AquaAccessor:
         """Perform time statistics."""
         return self.instance.timstat(self._obj, **kwargs)
 
+    def climatology(self, **kwargs):
+        """Compute a monthly, seasonal or day-of-year climatology."""
+        return self.instance.climatology(self._obj, **kwargs)
+
+    def anomalies(self, **kwargs):
+        """Compute the anomalies with respect to a climatology."""
+        return self.instance.anomalies(self._obj, **kwargs)
+
     # Field stat operations
     def fldstat(self, **kwargs):
         """Perform a weighted field statistic."""
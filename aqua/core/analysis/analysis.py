@@ -8,13 +8,24 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
 from importlib import resources as pypath
 
+from dask.utils import format_bytes
+
 from aqua.core.configurer import ConfigPath
 from aqua.core.dask.daskcluster import DaskCluster
+from aqua.core.dask.resources import detect_resources
 from aqua.core.logger import log_configure
 from aqua.core.util import create_folder, dump_yaml, format_realization, get_arg, load_yaml, to_list
 
+from .scheduler import AnalysisJob, JobScheduler, load_durations, save_durations
+from .workerpool import WarmWorkerPool
+
+# backends running the diagnostic tools
+BACKENDS = ["subprocess", "warm"]
+
 
 class Analysis:
     """Structured class for running AQUA diagnostic collections and managing configurations."""
@@ -60,6 +71,18 @@ class Analysis:
         self.serial = False
         self.cluster = DaskCluster(loglevel=loglevel)
 
+        # temporary folders of the rendered config files, removed once the jobs are run
+        self.temp_cfg_dirs = []
+
+        # execution backend of the diagnostic tools
+        self.backend = "subprocess"
+        self.preload = None
+        self.pool = None
+        self._pool_lock = threading.Lock()  # the pool is closed by the scheduler threads if it breaks
+
+        # run-scoped cache of the products shared by the diagnostics
+        self.cache = None
+
     def get_config(self):
         """Load the configuration file and return the config dictionary."""
 
@@ -195,6 +218,39 @@ class Analysis:
         else:
             self.logger.info("Parallel execution enabled; dask cluster will be used if configured.")
 
+    def set_backend(self, args, config):
+        """Get the execution backend of the diagnostic tools from command-line arguments and configuration.
+        With 'warm' the tools run in-process in workers with the heavy modules already imported,
+        with 'subprocess' (default) each tool runs in a new python interpreter.
+
+        Args:
+            args (argparse.Namespace): Parsed command-line arguments.
+            config (dict): Job configuration dictionary loaded from YAML.
+        """
+        backend = get_arg(args, "backend", None, config=config)
+        self.backend = backend if backend else "subprocess"
+        if self.backend not in BACKENDS:
+            self.logger.error("Unknown backend %s, available backends are %s", self.backend, BACKENDS)
+            sys.exit(1)
+        self.preload = config.get("preload")
+        self.logger.info("Diagnostic tools will run with the %s backend", self.backend)
+
+    def start_pool(self, max_workers=None):
+        """Start the warm worker pool if the warm backend is selected, falling back to subprocesses otherwise."""
+        if self.backend != "warm" or self.pool is not None:
+            return
+        try:
+            self.pool = WarmWorkerPool(max_workers=max_workers, preload=self.preload, loglevel=self.loglevel)
+        except (ValueError, OSError) as e:
+            self.logger.warning("Cannot start the warm worker pool, falling back to subprocesses: %s", e)
+
+    def close_pool(self):
+        """Close the warm worker pool if it is active. Safe to call from concurrent threads, only one closes it."""
+        with self._pool_lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.close()
+
     def check_realization(self):
         """Check that realization is set and log the configuration."""
         if not self.realization:
@@ -269,6 +325,7 @@ class Analysis:
         script_path: str,
         extra_args: str,
         logfile: str = "aqua-diagnostic-tool.log",
+        backend: str = None,
     ):
         """
         Run the diagnostic tool script with specified arguments.
@@ -279,18 +336,35 @@ class Analysis:
             script_path (str): Path to the diagnostic tool script.
             extra_args (str): Additional arguments for the script.
             logfile (str): Path to the logfile for capturing the command output.
+            backend (str, optional): 'subprocess' to run the tool in a new interpreter even if
+                                     the warm worker pool is active. Defaults to None.
+
+        Returns:
+            int: The exit code of the tool.
         """
 
         self.logger.info("Running tool %s for diagnostic collection %s", tool, collection)
         cmd = f"python {script_path} {extra_args} -l {self.loglevel}"
         self.logger.debug("Command: %s", cmd)
 
-        result = self.run_command(cmd, logfile)
+        result = None
+        pool = self.pool
+        if pool is not None and backend != "subprocess":
+            try:
+                logfile = os.path.expandvars(logfile)
+                create_folder(os.path.dirname(logfile))
+                result = pool.run(script_path, f"{extra_args} -l {self.loglevel}", logfile)
+            except BrokenProcessPool as e:
+                self.logger.warning("Warm worker of tool %s died (%s), running it in a subprocess", tool, e)
+                self.close_pool()
+        if result is None:
+            result = self.run_command(cmd, logfile)
 
         if result != 0:
             self.logger.error("Tool %s for diagnostic collection %s failed with exit code %s", tool, collection, result)
         else:
             self.logger.info("Tool %s for diagnostic collection %s completed successfully.", tool, collection)
+        return result
 
     def run_setup_checker(
         self,
@@ -340,22 +414,49 @@ class Analysis:
         diag_config=None,
     ):
         """
-        Run the diagnostic collection and log the output, handling parallel processing if required.
+        Run the tools of a diagnostic collection serially and log the output.
+
+        Args:
+            collection (str): Name of the diagnostic collection.
+            cli (dict): CLI definitions for the tools.
+            diag_config (dict): Configuration dictionary loaded from YAML.
+        """
+        for job in self.build_jobs(collection, cli=cli, diag_config=diag_config):
+            self.run_job(job)
+        self.remove_temp_configs()
+
+    def build_jobs(
+        self,
+        collection: str,
+        cli: dict = None,
+        diag_config=None,
+        after: list = None,
+    ):
+        """
+        Build a job for each tool and config file of a diagnostic collection.
+        The footprint of a job is given by the nworkers x nthreads CPUs and the memory of the tool configuration,
+        or by a single CPU if the tool runs on the shared dask cluster, its expected duration by the duration key
+        or by the duration measured in the previous runs.
 
         Args:
             collection (str): Name of the diagnostic collection.
-            regrid (str): Regrid option.
             cli (dict): CLI definitions for the tools.
             diag_config (dict): Configuration dictionary loaded from YAML.
+            after (list, optional): Jobs, tools or collections that all the jobs wait for, even if they fail.
+                                    Hard dependencies are set with the depends_on key of the tool configuration.
+
+        Returns:
+            list: The AnalysisJob of the collection.
         """
         if cli is None:
             cli = {}
 
+        durations = load_durations(self.output_dir) if self.output_dir else {}
+
         # Internal naming scheme:
         # collection: the name of the wrapper metadiagnostic, e.g. atmosphere2d, climate_metrics, etc.
         # tool: the name of the individual command-line tool being run, e.g. biases, ecmean, etc.
-
-        # run individual tools in serial mode
+        jobs = []
         for tool, tool_config in diag_config.items():
             self.logger.info("Configuring tool %s for diagnostic collection %s", tool, collection)
 
@@ -375,16 +476,17 @@ class Analysis:
             if self.regrid:
                 extra_args += f" --regrid {self.regrid}"
 
+            tool_nworkers = tool_config.get("nworkers")
+            tool_nthreads = tool_config.get("nthreads")
             if not self.serial:
-                tool_nworkers = tool_config.get("nworkers")
-                tool_nthreads = tool_config.get("nthreads")
                 if tool_nworkers is not None:
                     extra_args += f" --nworkers {tool_nworkers}"
                 if tool_nthreads is not None:
                     extra_args += f" --nthreads {tool_nthreads}"
 
             # This is needed for ECmean which uses multiprocessing
-            if self.cluster.address and not tool_config.get("nocluster", False):
+            on_cluster = bool(self.cluster.address) and not tool_config.get("nocluster", False)
+            if on_cluster:
                 extra_args += f" --cluster {self.cluster.address}"
 
             # Add standard arguments using helper function
@@ -407,30 +509,184 @@ class Analysis:
             # update cfgs with experiment kind templating if exp_kind_dict is provided
             if self.exp_kind_dict:
                 cfgs = self.configure_template_configs(cfgs)
+                self.temp_cfg_dirs.append(os.path.dirname(cfgs[0]))
 
+            # tools on the shared cluster only drive it, its workers are budgeted by run_jobs
+            cpus = 1 if self.serial or on_cluster else (tool_nworkers or 1) * (tool_nthreads or 1)
             for i, cfg in enumerate(cfgs, start=1):
                 args = (
                     f"--model {self.model} --exp {self.exp} --source {self.source} --outputdir {outname}"
                     f" {extra_args} --config {cfg}"
                 )
                 if len(cfgs) == 1:
+                    name = f"{collection}.{tool}"
                     logfile = f"{self.output_dir}/{collection}-{tool}.log"
                 else:
+                    name = f"{collection}.{tool}.{i}"
                     logfile = f"{self.output_dir}/{collection}-{tool}-{i}.log"
 
-                self.run_diagnostic_tool(
-                    collection=collection,
-                    tool=tool,
-                    script_path=cli_path,
-                    extra_args=args,
-                    logfile=logfile,
+                kwargs = {
+                    "collection": collection,
+                    "tool": tool,
+                    "script_path": cli_path,
+                    "extra_args": args,
+                    "logfile": logfile,
+                    "backend": tool_config.get("backend"),
+                }
+                jobs.append(
+                    AnalysisJob(
+                        name,
+                        collection,
+                        tool,
+                        kwargs,
+                        cpus=cpus,
+                        memory=tool_config.get("memory"),
+                        duration=tool_config.get("duration", durations.get(name)),
+                        depends_on=tool_config.get("depends_on"),
+                        after=after,
+                    )
                 )
 
-            # remove temporary rendered config files created when using experiment kind templating
-            if self.exp_kind_dict:
-                temp_cfg_dir = os.path.dirname(cfgs[0])
-                shutil.rmtree(temp_cfg_dir, ignore_errors=True)
-                self.logger.debug("Removed temporary config directory: %s", temp_cfg_dir)
+        return jobs
+
+    def run_job(self, job):
+        """
+        Run a single analysis job.
+
+        Args:
+            job (AnalysisJob): The job to run.
+
+        Returns:
+            int: The exit code of the tool.
+        """
+        return self.run_diagnostic_tool(**job.kwargs)
+
+    def run_jobs(self, jobs, cpus=None, memory=None, max_jobs=None):
+        """
+        Run the analysis jobs concurrently within the node budget, longest first and honouring their dependencies.
+        The measured durations are stored in the output directory to order the jobs of the following runs.
+
+        Args:
+            jobs (list): The AnalysisJob to run.
+            cpus (int, optional): CPUs available to the jobs. Defaults to the CPUs of the node (SLURM and cgroups aware),
+                                  minus the CPUs of the shared dask cluster workers if it is running.
+            memory (str or int, optional): Memory available to the jobs. Defaults to the memory of the node,
+                                           minus the memory of the shared dask cluster workers if it is running.
+            max_jobs (int, optional): Maximum number of concurrent jobs. Defaults to None (no limit).
+
+        Returns:
+            dict: The exit code of each job, None for the jobs skipped after a failed dependency.
+        """
+        if cpus is None or memory is None:
+            resources = detect_resources()
+            footprint = self.cluster.footprint
+            if footprint:
+                self.logger.info(
+                    "Reserving %d CPUs and %s for the dask cluster", footprint["cpus"], format_bytes(footprint["memory"])
+                )
+                resources = {key: max(resources[key] - footprint[key], 1) for key in ["cpus", "memory"]}
+            cpus = cpus if cpus is not None else resources["cpus"]
+            memory = memory if memory is not None else resources["memory"]
+        self.logger.info("Running %d jobs on %d CPUs", len(jobs), cpus)
+
+        scheduler = JobScheduler(cpus=cpus, memory=memory, max_jobs=max_jobs, loglevel=self.loglevel)
+        self.start_pool(max_workers=max_jobs or cpus)
+        try:
+            results = scheduler.run(jobs, self.run_job)
+        finally:
+            self.close_pool()
+            self.remove_temp_configs()
+            if self.output_dir and scheduler.durations:
+                save_durations(self.output_dir, scheduler.durations)
+
+        failed = [name for name, result in results.items() if result != 0]
+        if failed:
+            self.logger.error("Failed or skipped jobs: %s", failed)
+        return results
+
+    def remove_temp_configs(self):
+        """Remove temporary rendered config files created when using experiment kind templating."""
+        for temp_cfg_dir in self.temp_cfg_dirs:
+            shutil.rmtree(temp_cfg_dir, ignore_errors=True)
+            self.logger.debug("Removed temporary config directory: %s", temp_cfg_dir)
+        self.temp_cfg_dirs = []
+
+    def build_cache(self, cache_config):
+        """
+        Compute once the products shared by the diagnostics and store them in a run-scoped Zarr cache.
+        The cache is exported to the diagnostics through an environment variable, so that their
+        Readers return the cached statistic when they compute it on the same data.
+        An intake catalog of the cached products is written in the cache folder.
+
+        Args:
+            cache_config (dict): The cache section of the configuration, with the list of 'products'
+                                 (each with 'var', and optionally 'regrid', 'freq', 'stat' and 'source'),
+                                 the cache 'path' and whether to 'keep' it after the run.
+
+        Returns:
+            ProductCache: The cache, None if no product is configured.
+        """
+        products = cache_config.get("products") if cache_config else None
+        if not products:
+            return None
+
+        # imported here to keep the console startup fast
+        from dask.distributed import Client
+
+        from aqua.core.reader import Reader
+        from aqua.core.reader.product_cache import CACHE_ENV, ProductCache
+
+        path = os.path.expandvars(cache_config.get("path") or os.path.join(self.output_dir, ".aqua-cache"))
+        self.cache = ProductCache(path, loglevel=self.loglevel)
+        self.cache.clear()
+
+        client = Client(self.cluster.address) if self.cluster.address else None
+        try:
+            for product in products:
+                source = product.get("source", self.source)
+                regrid = product.get("regrid", self.regrid)
+                stat = product.get("stat", "mean")
+                freq = product.get("freq", "monthly")
+                reader_kwargs = {"realization": self.realization} if self.realization else {}
+                try:
+                    reader = Reader(
+                        model=self.model,
+                        exp=self.exp,
+                        source=source,
+                        catalog=self.catalog,
+                        regrid=regrid,
+                        loglevel=self.loglevel,
+                        **reader_kwargs,
+                    )
+                    data = reader.retrieve(var=product.get("var"), startdate=self.startdate, enddate=self.enddate)
+                    if regrid:
+                        data = reader.regrid(data)
+                    product_data = reader.timstat(data, stat, freq=freq)
+                    # options as passed by Reader.timstat to the lookup
+                    self.cache.store(
+                        data, product_data, stat, freq=freq, exclude_incomplete=False, time_bounds=False, center_time=False
+                    )
+                except Exception as e:
+                    self.logger.error("Cannot cache product %s: %s", product, e)
+        finally:
+            if client is not None:
+                client.close()
+
+        if self.cache.index:
+            self.cache.write_catalog()
+            os.environ[CACHE_ENV] = self.cache.path
+            self.logger.info("Products cached in %s", self.cache.path)
+        return self.cache
+
+    def clear_cache(self, keep=False):
+        """Stop exporting the cache to the diagnostics and remove it, unless it has to be kept."""
+        from aqua.core.reader.product_cache import CACHE_ENV
+
+        os.environ.pop(CACHE_ENV, None)
+        if self.cache is not None and not keep:
+            self.cache.clear()
+            self.logger.debug("Removed cache %s", self.cache.path)
+        self.cache = None
 
     def configure_experiment_kind(self, exp_kind, exp_kind_file):
         """
@@ -490,9 +746,10 @@ class Analysis:
             cluster_config (dict): Cluster configuration dictionary loaded from YAML.
         """
 
-        nthreads = get_arg(args, "nthreads", 2, config=cluster_config, key="threads")
-        nworkers = get_arg(args, "nworkers", 32, config=cluster_config, key="workers")
-        mem_limit = cluster_config.get("memory_limit", "3.1GiB")
+        # settings not provided are derived from the resources of the node
+        nthreads = get_arg(args, "nthreads", None, config=cluster_config, key="threads")
+        nworkers = get_arg(args, "nworkers", None, config=cluster_config, key="workers")
+        mem_limit = cluster_config.get("memory_limit")
         timeouts = {
             "DASK_DISTRIBUTED__COMM__TIMEOUTS__CONNECT": cluster_config.get("connect_timeout"),
             "DASK_DISTRIBUTED__COMM__TIMEOUTS__TCP": cluster_config.get("tcp_timeout"),
@@ -504,6 +761,9 @@ class Analysis:
             mem_limit=mem_limit,
             connect_timeout=timeouts["DASK_DISTRIBUTED__COMM__TIMEOUTS__CONNECT"],
             tcp_timeout=timeouts["DASK_DISTRIBUTED__COMM__TIMEOUTS__TCP"],
+            profile=cluster_config.get("profile", "compute"),
+            adaptive=cluster_config.get("adaptive", False),
+            minimum_workers=cluster_config.get("minimum_workers", 1),
         )
         if not self.cluster.active:
             self.logger.error("Failed to start Dask cluster.")
@@ -0,0 +1,208 @@
+"""
+Scheduler for the jobs of an AQUA analysis run.
+Each (collection, tool, config) is a job with a CPU and memory footprint and optional dependencies.
+Jobs whose dependencies are completed are started longest-first as long as they fit in the node budget.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dask.utils import format_bytes, parse_bytes
+
+from aqua.core.logger import log_configure
+from aqua.core.util import to_list
+
+# file of the output directory where the job durations are kept for the following runs
+DURATIONS_FILE = ".aqua-analysis-durations.json"
+
+
+class AnalysisJob:
+    """A diagnostic tool run with a single configuration file."""
+
+    def __init__(self, name, collection, tool, kwargs, cpus=1, memory=0, duration=None, depends_on=None, after=None):
+        """
+        Args:
+            name (str): Unique name of the job, i.e. 'collection.tool' or 'collection.tool.index'.
+            collection (str): Name of the diagnostic collection.
+            tool (str): Name of the diagnostic tool.
+            kwargs (dict): Arguments of Analysis.run_diagnostic_tool.
+            cpus (int, optional): CPUs used by the job, i.e. nworkers x nthreads. Defaults to 1.
+            memory (str or int, optional): Memory used by the job. Defaults to 0 (not accounted).
+            duration (float, optional): Expected duration in seconds, used to start the longest jobs first.
+            depends_on (list, optional): Names of the jobs, tools ('collection.tool') or collections
+                                         which have to be completed successfully before the job starts.
+            after (list, optional): As depends_on, but the job runs also if they fail.
+        """
+        self.name = name
+        self.collection = collection
+        self.tool = tool
+        self.kwargs = kwargs
+        self.cpus = max(1, int(cpus))
+        self.memory = parse_bytes(memory) if memory else 0
+        self.duration = duration
+        self.depends_on = to_list(depends_on) if depends_on else []
+        self.after = to_list(after) if after else []
+
+    def __repr__(self):
+        return f"AnalysisJob({self.name}, cpus={self.cpus}, memory={format_bytes(self.memory)})"
+
+    def matches(self, reference):
+        """True if the job is the reference or belongs to the referenced tool or collection."""
+        return self.name == reference or self.name.startswith(f"{reference}.")
+
+
+def load_durations(output_dir):
+    """Load the job durations measured in the previous runs, empty if not available."""
+    filename = os.path.join(output_dir, DURATIONS_FILE)
+    try:
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(output_dir, durations):
+    """Update the job durations of the output directory."""
+    filename = os.path.join(output_dir, DURATIONS_FILE)
+    merged = {**load_durations(output_dir), **durations}
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=1, sort_keys=True)
+
+
+class JobScheduler:
+    """Run analysis jobs concurrently within a CPU and memory budget, honouring their dependencies."""
+
+    def __init__(self, cpus, memory=None, max_jobs=None, loglevel="WARNING"):
+        """
+        Args:
+            cpus (int): CPUs available to the jobs.
+            memory (str or int, optional): Memory available to the jobs. Defaults to None (not accounted).
+            max_jobs (int, optional): Maximum number of concurrent jobs. Defaults to None (no limit).
+            loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+        """
+        self.cpus = max(1, int(cpus))
+        self.memory = parse_bytes(memory) if memory else None
+        self.max_jobs = max_jobs
+        self.logger = log_configure(log_level=loglevel, log_name="JobScheduler")
+
+        # measured duration and exit code of each job
+        self.durations = {}
+        self.results = {}
+
+    def resolve(self, jobs):
+        """
+        Resolve the dependencies of the jobs into job names.
+
+        Returns:
+            tuple: The names of the jobs each job depends on, and of the jobs each job waits for
+                   (dependencies included).
+
+        Raises:
+            ValueError: If the job names are not unique or the dependencies are circular.
+        """
+        names = [job.name for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Job names are not unique: {names}")
+
+        dependencies, waits = {}, {}
+        for job in jobs:
+            dependencies[job.name] = set()
+            for reference in job.depends_on:
+                matches = {other.name for other in jobs if other.matches(reference) and other is not job}
+                if not matches:
+                    self.logger.warning("Dependency %s of job %s does not match any job, ignoring it", reference, job.name)
+                dependencies[job.name] |= matches
+            waits[job.name] = set(dependencies[job.name])
+            for reference in job.after:
+                waits[job.name] |= {other.name for other in jobs if other.matches(reference) and other is not job}
+
+        # circular dependencies would never start
+        pending = dict(waits)
+        while pending:
+            free = [name for name, deps in pending.items() if not deps & pending.keys()]
+            if not free:
+                raise ValueError(f"Circular dependencies between jobs {sorted(pending)}")
+            for name in free:
+                del pending[name]
+
+        return dependencies, waits
+
+    def _fits(self, job, cpus, memory, running):
+        """True if the job fits in the free resources. A job larger than the budget runs alone."""
+        if not running:
+            return True
+        if self.max_jobs and len(running) >= self.max_jobs:
+            return False
+        if job.cpus > cpus:
+            return False
+        return self.memory is None or job.memory <= memory
+
+    def run(self, jobs, runner):
+        """
+        Run the jobs.
+
+        Args:
+            jobs (list): The AnalysisJob to run.
+            runner (callable): Function running a job and returning its exit code.
+
+        Returns:
+            dict: The exit code of each job, None for the jobs skipped after a failed dependency.
+        """
+        dependencies, waits = self.resolve(jobs)
+        for job in jobs:
+            if job.cpus > self.cpus or (self.memory is not None and job.memory > self.memory):
+                self.logger.warning("Job %s exceeds the budget of %d CPUs, it will run alone", job, self.cpus)
+
+        # longest first, jobs without a duration keep the configuration order after the others
+        pending = sorted(jobs, key=lambda job: -(job.duration or 0))
+        running = {}
+        free_cpus, free_memory = self.cpus, self.memory or 0
+
+        with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as executor:
+            while pending or running:
+                for job in list(pending):
+                    deps = dependencies[job.name]
+                    if any(self.results.get(dep, 0) != 0 for dep in deps if dep in self.results):
+                        self.logger.error("Skipping job %s since one of its dependencies %s failed", job.name, sorted(deps))
+                        self.results[job.name] = None
+                        pending.remove(job)
+                        continue
+                    if not waits[job.name] <= self.results.keys():
+                        continue
+                    if not self._fits(job, free_cpus, free_memory, running):
+                        continue
+
+                    self.logger.info("Starting job %s (%d CPUs, %s)", job.name, job.cpus, format_bytes(job.memory))
+                    future = executor.submit(self._timed, runner, job)
+                    running[future] = job
+                    pending.remove(job)
+                    free_cpus -= job.cpus
+                    free_memory -= job.memory
+
+                if not running:
+                    # only jobs depending on skipped jobs are left
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    free_cpus += job.cpus
+                    free_memory += job.memory
+                    try:
+                        self.results[job.name] = future.result()
+                    except Exception as e:
+                        self.logger.error("Job %s raised an exception: %s", job.name, e)
+                        self.results[job.name] = 1
+                    self.logger.info("Job %s finished in %.1fs", job.name, self.durations[job.name])
+
+        return self.results
+
+    def _timed(self, runner, job):
+        """Run a job recording its duration."""
+        start = time.perf_counter()
+        try:
+            return runner(job)
+        finally:
+            self.durations[job.name] = time.perf_counter() - start
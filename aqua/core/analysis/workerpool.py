@@ -0,0 +1,128 @@
+"""
+Warm pool of Python workers running the diagnostic command line tools in-process.
+Workers are forked from a server which has already imported the heavy modules,
+so that each tool starts without paying the import time again.
+"""
+
+import multiprocessing
+import os
+import runpy
+import shlex
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from aqua.core.logger import log_configure
+
+# modules imported once by the fork server, shared by all the workers
+DEFAULT_PRELOAD = [
+    "numpy",
+    "pandas",
+    "xarray",
+    "dask.array",
+    "dask.distributed",
+    "intake",
+    "matplotlib.pyplot",
+    "cartopy.crs",
+    "metpy.calc",
+    "aqua.core.reader.reader",
+    "aqua.core.configurer",
+    "aqua.core.graphics",
+]
+
+
+def _exit_code(code):
+    """Exit code of a SystemExit argument, as the interpreter would return it."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_script(script_path, args, log_file, environ=None):
+    """
+    Run a python script as __main__ in the current process, redirecting its output to a log file.
+    Standard output and error are redirected at file descriptor level, so that the output of
+    compiled libraries and child processes is captured as well.
+
+    Args:
+        script_path (str): Path to the script.
+        args (str): Command line arguments of the script.
+        log_file (str): Path to the log file.
+        environ (dict, optional): Environment variables to set before running the script.
+
+    Returns:
+        int: The exit code of the script.
+    """
+    if environ:
+        os.environ.update(environ)
+
+    with open(log_file, "w", encoding="utf-8") as log:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+
+        sys.argv = [script_path] + shlex.split(args)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script_path)))
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            code = _exit_code(e.code)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+    return code
+
+
+class WarmWorkerPool:
+    """Pool of workers forked from a server with the heavy modules already imported."""
+
+    def __init__(self, max_workers=None, preload=None, loglevel="WARNING"):
+        """
+        Args:
+            max_workers (int, optional): Maximum number of tools running concurrently. Defaults to the CPUs.
+            preload (list, optional): Modules imported by the fork server. Defaults to DEFAULT_PRELOAD.
+                                      Modules which cannot be imported are skipped.
+            loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+
+        Raises:
+            ValueError: If the forkserver start method is not available on the platform.
+        """
+        self.logger = log_configure(log_level=loglevel, log_name="WarmWorkerPool")
+        self.preload = DEFAULT_PRELOAD if preload is None else list(preload)
+
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(self.preload)
+        # each worker runs a single tool, so that tools never share their state
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context, max_tasks_per_child=1)
+        self.logger.info("Warm worker pool started, preloading %s", self.preload)
+
+    def run(self, script_path, args, log_file):
+        """
+        Run a diagnostic script in a warm worker.
+
+        Args:
+            script_path (str): Path to the script.
+            args (str): Command line arguments of the script.
+            log_file (str): Path to the log file.
+
+        Returns:
+            int: The exit code of the script.
+
+        Raises:
+            concurrent.futures.process.BrokenProcessPool: If the worker died, e.g. killed by the out-of-memory killer.
+        """
+        future = self._executor.submit(run_script, script_path, args, log_file, dict(os.environ))
+        return future.result()
+
+    def close(self):
+        """Shut down the workers."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.logger.debug("Warm worker pool closed")
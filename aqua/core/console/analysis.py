@@ -3,9 +3,7 @@
 import argparse
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from aqua.core.analysis import Analysis
 from aqua.core.logger import log_configure
 from aqua.core.util import expand_env_vars, get_arg
 
@@ -52,7 +50,10 @@ def analysis_parser(parser=None):
     parser.add_argument("--nthreads", type=int, default=None,
                         help="Number of threads per worker to use in the cluster (overrides config file)")
     parser.add_argument("--nmaxprocesses", type=int, default=-1,
-                        help="Maximum number of processes to use in the ThreadPoolExecutor. Default==-1 (no limit)")
+                        help="Maximum number of diagnostic jobs running concurrently. Default==-1 (no limit)")
+    parser.add_argument("--backend", type=str, choices=["subprocess", "warm"], default=None,
+                        help="Run the diagnostics in new interpreters (subprocess, default) "
+                             "or in workers with the modules already imported (warm)")
 
 
     # logger
@@ -67,6 +68,8 @@ def analysis_execute(args):
     """
     Executing the AQUA analysis by parsing the arguments and configuring the machinery
     """
+    from aqua.core.analysis import Analysis  # imported here to keep the console startup fast
+
     loglevel = args.loglevel
     logger = log_configure(loglevel, "AQUA Analysis")
 
@@ -94,11 +97,12 @@ def analysis_execute(args):
     analyzer.set_regrid_option(args, job_config)
     analyzer.set_output_directory(args, job_config)
     analyzer.set_serial_or_parallel(args)
+    analyzer.set_backend(args, job_config)
 
     # TODO: understand if this is used somewhere by diagnostics
     os.environ["OUTPUT"] = analyzer.output_dir
 
-    # maximum parallel processes for the ThreadPoolExecutor
+    # maximum number of concurrent diagnostic jobs
     nmaxprocesses = args.nmaxprocesses if args.nmaxprocesses > 0 else None
     logger.debug("nmaxprocesses: %d", nmaxprocesses)
 
@@ -130,31 +134,33 @@ def analysis_execute(args):
     # Internal naming scheme:
     # collection: the name of the wrapper metadiagnostic, e.g. atmosphere2d, climate_metrics, etc.
     # tool: the name of the individual command-line tool being run, e.g. biases, ecmean, etc.
+    # Each (collection, tool, config) is a job: jobs of a run block wait for the collections of the
+    # previous blocks, and are scheduled concurrently within the CPU and memory budget of the node.
+    jobs = []
+    previous = []
     for collections in run:
-        with ThreadPoolExecutor(max_workers=nmaxprocesses) as executor:
-            futures = []
-            for collection in collections:
-                logger.info("Starting diagnostic collection: %s", collection)
-                diag_config = config.get("diagnostics", {}).get(collection)
-                if diag_config is None:
-                    logger.error("Diagnostic collection '%s' not found in the configuration, skipping.", collection)
-                    continue
-
-                futures.append(
-                    executor.submit(
-                        analyzer.run_diagnostic_collection,
-                        collection=collection,
-                        diag_config=diag_config,
-                        cli=cli,
-                    )
-                )
-
-            for future in as_completed(futures):
-                try:
-                    _ = future.result()
-                except Exception as e:
-                    logger.error("Diagnostic collection raised an exception: %s", e)
-
+        for collection in collections:
+            logger.info("Configuring diagnostic collection: %s", collection)
+            diag_config = config.get("diagnostics", {}).get(collection)
+            if diag_config is None:
+                logger.error("Diagnostic collection '%s' not found in the configuration, skipping.", collection)
+                continue
+            jobs.extend(analyzer.build_jobs(collection, cli=cli, diag_config=diag_config, after=previous))
+        previous = previous + list(collections)
+
+    # products shared by the diagnostics, computed once before the jobs start
+    cache_config = config.get("cache", {})
+    analyzer.build_cache(cache_config)
+
+    scheduler_config = config.get("scheduler", {})
+    analyzer.run_jobs(
+        jobs,
+        cpus=scheduler_config.get("cpus"),
+        memory=scheduler_config.get("memory"),
+        max_jobs=nmaxprocesses,
+    )
+
+    analyzer.clear_cache(keep=cache_config.get("keep", False))
     analyzer.close_dask_cluster()
 
     logger.info("All diagnostic collections finished.")
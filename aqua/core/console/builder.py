@@ -4,7 +4,6 @@ This module contains the CLI for the GridBuilder.
 
 import argparse
 
-from aqua import GridBuilder, Reader
 from aqua.core.util import get_arg, load_yaml
 
 
@@ -57,6 +56,8 @@ def builder_execute(args):
     """
     Execute the builder CLI with the provided arguments or configuration file.
     """
+    from aqua import GridBuilder, Reader  # imported here to keep the console startup fast
+
     config = {}
     reader_config = {}
     builder_config = {}
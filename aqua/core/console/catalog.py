@@ -12,7 +12,6 @@ from urllib.error import HTTPError
 import fsspec
 
 from aqua.core.lock import SafeFileLock
-from aqua.core.reader.catalog import show_catalog_content as print_catalog
 from aqua.core.util import dump_yaml, load_yaml
 from aqua.core.util.util import HiddenPrints, to_list
 
@@ -56,6 +55,9 @@ class CatalogMixin:
             else:
                 self._add_catalog_github(args.catalog, args.repository)
 
+            # the reader is imported here to keep the console startup fast
+            from aqua.core.reader.catalog import show_catalog_content as print_catalog
+
             with HiddenPrints():
                 print_catalog()
 
@@ -8,7 +8,6 @@ AQUA CLI wrapper for the FDB catalog generator.
 import argparse
 import sys
 
-from aqua import AquaFDBGenerator
 from aqua.core.util import get_arg
 
 
@@ -26,6 +25,7 @@ def catgen_parser(parser=None):
 
 def catgen_execute(args):
     """Useful wrapper for the FDB catalog generator class"""
+    from aqua import AquaFDBGenerator  # imported here to keep the console startup fast
 
     dp_version = get_arg(args, "portfolio", "full")
     config_file = get_arg(args, "config", "config.yaml")
@@ -10,7 +10,6 @@ a configuration yaml file.
 import argparse
 import sys
 
-from aqua import Drop
 from aqua import __version__ as version
 from aqua.core.util import get_arg, load_yaml, to_list
 
@@ -42,6 +41,8 @@ def drop_parser(parser=None):
                         help='log level [default: WARNING]')
     parser.add_argument('--monitoring', action="store_true",
                         help='enable the dask performance monitoring. Will run a single chunk')
+    parser.add_argument('--report', type=str, nargs='+', metavar='TELEMETRY',
+                        help='summarize one or more DROP telemetry files (drop_telemetry_*.jsonl) and exit')
     parser.add_argument('--catalog-entry', type=str, choices=['yes', 'no', 'only'],
                         help="Catalog entry behaviour [default: yes, or options.catalog_entry from config]: "
                              "'yes' writes data and creates catalog; "
@@ -131,6 +132,13 @@ def drop_execute(args):
 
     print("AQUA version is: " + version)
 
+    report = get_arg(args, "report", None)
+    if report:
+        from aqua.core.drop.drop_telemetry import telemetry_report  # imported here to keep the console startup fast
+
+        print(telemetry_report(report))
+        return
+
     file = get_arg(args, "config", "drop_config.yaml")
     explicit_config = bool(getattr(args, "config", None))
 
@@ -172,6 +180,7 @@ def drop_execute(args):
     engine = get_arg(args, "engine", _cfg(config, "options", "engine", "fdb"))
     loglevel = get_arg(args, "loglevel", _cfg(config, "options", "loglevel", "WARNING"))
     compact = _cfg(config, "options", "compact", "cdo")
+    chunks = _cfg(config, "options", "chunks")
     driver = get_arg(args, "driver", _cfg(config, "options", "driver", "netcdf"))
 
     # Other options, only from command line
@@ -229,6 +238,7 @@ def drop_execute(args):
         catalog_entry=catalog_entry,
         driver=driver,
         exclude_incomplete=exclude_incomplete,
+        chunks=chunks,
     )
 
 
@@ -260,6 +270,7 @@ def drop_cli(
     compact="cdo",
     catalog_entry="yes",
     exclude_incomplete=True,
+    chunks=None,
 ):
     """
     Running the default DROP from CLI, looping on all the configuration model/exp/source/var combination
@@ -293,7 +304,9 @@ def drop_cli(
         compact: compaction method
         catalog_entry: catalog entry behaviour ('yes', 'no', 'only')
         exclude_incomplete: bool flag to exclude incomplete temporal chunks when averaging
+        chunks: chunking of the data access, 'auto' to tune it on the data and on the workers memory
     """
+    from aqua import Drop  # imported here to keep the console startup fast
 
     models = to_list(get_arg(args, "model", config["data"]))
     for model in models:
@@ -359,6 +372,7 @@ def drop_cli(
                             exclude_incomplete=exclude_incomplete,
                             output_format=driver,
                             engine=engine,
+                            chunks=chunks,
                             **extra_args,
                         )
 
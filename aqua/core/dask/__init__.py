@@ -1,5 +1,6 @@
 """Dask cluster management for AQUA"""
 
 from .daskcluster import DaskCluster
+from .resources import cluster_layout, detect_resources
 
-__all__ = ["DaskCluster"]
+__all__ = ["DaskCluster", "cluster_layout", "detect_resources"]
@@ -4,18 +4,21 @@ import logging
 import os
 
 from dask.distributed import LocalCluster
+from dask.utils import format_bytes
 
 from aqua.core.logger import log_configure
 
+from .resources import check_layout, cluster_layout
+
 
-# TODO: expand and implement in DROP
 class DaskCluster:
-    """Manages the lifecycle of a Dask LocalCluster for parallel diagnostic execution."""
+    """Manages the lifecycle of a Dask LocalCluster for parallel diagnostic execution and DROP."""
 
     def __init__(self, loglevel: str = "WARNING"):
         self.loglevel = loglevel
         self.logger = log_configure(log_level=loglevel, log_name="ClusterManager")
         self._cluster = None
+        self._layout = None
 
     @property
     def address(self):
@@ -27,35 +30,59 @@ class DaskCluster:
         """Return True if the cluster is active."""
         return self._cluster is not None
 
+    @property
+    def footprint(self):
+        """Return the CPUs and memory reserved by the workers (all of them if adaptive), None if not running."""
+        if not self.active:
+            return None
+        return {
+            "cpus": self._layout["nworkers"] * self._layout["nthreads"],
+            "memory": self._layout["nworkers"] * self._layout["mem_limit"],
+        }
+
     def setup(
         self,
-        nworkers: int,
-        nthreads: int,
+        nworkers: int = None,
+        nthreads: int = None,
         mem_limit: str = None,
         connect_timeout: float = None,
         tcp_timeout: float = None,
+        profile: str = "compute",
+        adaptive: bool = False,
+        minimum_workers: int = 1,
         **kwargs,
     ):
         """
         Setup a LocalCluster with the specified configuration if not already running.
+        Settings which are not provided are derived from the CPUs and memory available
+        to the process (cgroups and SLURM allocations included), see `cluster_layout`.
 
         Args:
-            nworkers (int): Number of dask workers to start.
-            nthreads (int): Number of dask threads per worker.
-            mem_limit (str): Memory limit per worker.
+            nworkers (int, optional): Number of dask workers to start, the maximum if adaptive.
+            nthreads (int, optional): Number of dask threads per worker.
+            mem_limit (str, optional): Memory limit per worker.
             connect_timeout (float, optional): Connection timeout for Dask communications.
             tcp_timeout (float, optional): TCP timeout for Dask communications.
+            profile (str, optional): 'io' for I/O-bound or 'compute' for compute-bound work. Defaults to 'compute'.
+            adaptive (bool, optional): Scale the number of workers with the load,
+                                       between minimum_workers and nworkers. Defaults to False.
+            minimum_workers (int, optional): Minimum number of workers of an adaptive cluster. Defaults to 1.
 
         """
         if self.active:
             self.logger.warning("Cluster already running at %s, skipping reconfiguration.", self.address)
             return
 
+        layout = cluster_layout(profile=profile, nworkers=nworkers, nthreads=nthreads, mem_limit=mem_limit)
+        for warning in check_layout(layout):
+            self.logger.warning("Cluster oversubscribed: %s", warning)
         self.logger.debug(
-            "Cluster configuration — nthreads: %d, nworkers: %d, memory_limit: %s",
-            nthreads,
-            nworkers,
-            mem_limit,
+            "Cluster configuration — nthreads: %d, nworkers: %d, memory_limit: %s, profile: %s, resources: %s",
+            layout["nthreads"],
+            layout["nworkers"],
+            format_bytes(layout["mem_limit"]),
+            profile,
+            layout["resources"],
         )
 
         # configure environment variables for Dask timeouts if provided
@@ -65,12 +92,22 @@ class DaskCluster:
 
         # spinup cluster
         self._cluster = LocalCluster(
-            threads_per_worker=nthreads, n_workers=nworkers, memory_limit=mem_limit, silence_logs=logging.ERROR, **kwargs
+            threads_per_worker=layout["nthreads"],
+            n_workers=min(minimum_workers, layout["nworkers"]) if adaptive else layout["nworkers"],
+            memory_limit=layout["mem_limit"],
+            silence_logs=logging.ERROR,
+            **kwargs,
         )
+        self._layout = layout
+        if adaptive:
+            self._cluster.adapt(minimum=min(minimum_workers, layout["nworkers"]), maximum=layout["nworkers"])
         self.logger.info(
-            "Initialized dask cluster at %s with %d workers.",
+            "Initialized dask cluster at %s with %d workers (%s) x %d threads x %s.",
             self.address,
             len(self._cluster.workers),
+            f"adaptive up to {layout['nworkers']}" if adaptive else "fixed",
+            layout["nthreads"],
+            format_bytes(layout["mem_limit"]),
         )
 
     def close(self):
@@ -82,6 +119,7 @@ class DaskCluster:
         self.logger.info("Closing dask cluster at %s.", self.address)
         self._cluster.close()
         self._cluster = None
+        self._layout = None
 
     def _configure_timeouts(self, connect_timeout: float = None, tcp_timeout: float = None):
         """
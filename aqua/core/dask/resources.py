@@ -0,0 +1,116 @@
+"""Detection of the resources available to a dask cluster and choice of its layout"""
+
+import os
+import re
+
+from dask.system import cpu_count
+from dask.utils import format_bytes, parse_bytes
+from distributed.system import memory_limit
+
+# Maximum threads per worker of each profile: I/O-bound work (netCDF/HDF5 and GRIB
+# decoding holding the GIL or a global lock) scales with processes, compute-bound
+# work on numpy arrays releases the GIL and benefits from shared memory between threads
+PROFILES = {"io": 1, "compute": 4}
+# Fraction of the memory given to the workers, the rest is left to the scheduler and the client
+MEMORY_FRACTION = 0.9
+
+
+def _slurm_cpus(environ):
+    """CPUs allocated by SLURM on this node, None outside a SLURM job"""
+    if environ.get("SLURM_CPUS_PER_TASK"):
+        return int(environ["SLURM_CPUS_PER_TASK"]) * int(environ.get("SLURM_NTASKS_PER_NODE", 1))
+    if environ.get("SLURM_JOB_CPUS_PER_NODE"):
+        # e.g. '128', '64(x2)' or '64(x2),32': the first entry refers to this node
+        return int(re.match(r"\d+", environ["SLURM_JOB_CPUS_PER_NODE"]).group())
+    return None
+
+
+def _slurm_memory(environ, cpus):
+    """Memory allocated by SLURM on this node in bytes, None outside a SLURM job or without a memory request"""
+    if environ.get("SLURM_MEM_PER_NODE"):
+        return int(environ["SLURM_MEM_PER_NODE"]) * 2**20
+    if environ.get("SLURM_MEM_PER_CPU"):
+        return int(environ["SLURM_MEM_PER_CPU"]) * 2**20 * cpus
+    return None
+
+
+def detect_resources(environ=None):
+    """
+    Detect the CPUs and memory available to this process.
+    CPU affinity, cgroup quotas and RSS limits are detected by dask, and SLURM
+    allocations are read from the job environment variables. The minimum is used.
+
+    Args:
+        environ (dict, optional): the environment variables. Defaults to os.environ.
+
+    Returns:
+        dict: the number of 'cpus', the 'memory' in bytes and the 'source' of the limits
+    """
+    environ = os.environ if environ is None else environ
+    cpus, memory, source = cpu_count(), memory_limit(), "system"
+
+    slurm_cpus = _slurm_cpus(environ)
+    if slurm_cpus and slurm_cpus < cpus:
+        cpus, source = slurm_cpus, "slurm"
+    slurm_memory = _slurm_memory(environ, cpus)
+    if slurm_memory and slurm_memory < memory:
+        memory, source = slurm_memory, "slurm"
+
+    return {"cpus": cpus, "memory": memory, "source": source}
+
+
+def cluster_layout(profile="compute", nworkers=None, nthreads=None, mem_limit=None, resources=None):
+    """
+    Choose the number of workers, threads per worker and memory per worker of a cluster.
+    Values provided by the user are kept, the others are derived from the available resources.
+
+    Args:
+        profile (str, optional): 'io' for I/O-bound work (one thread per worker) or 'compute'
+                                 for compute-bound work (up to 4 threads per worker). Defaults to 'compute'.
+        nworkers (int, optional): the number of workers. Defaults to all the CPUs over the threads.
+        nthreads (int, optional): the number of threads per worker. Defaults from the profile.
+        mem_limit (str or int, optional): the memory limit per worker. Defaults to the available memory over the workers.
+        resources (dict, optional): the resources, as from detect_resources(). Detected if not provided.
+
+    Returns:
+        dict: 'nworkers', 'nthreads', 'mem_limit' (bytes) and the 'resources' they are based on
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown cluster profile {profile}, available profiles are {list(PROFILES)}")
+    resources = resources or detect_resources()
+    cpus = resources["cpus"]
+
+    if nthreads is None:
+        if nworkers:
+            nthreads = min(PROFILES[profile], max(1, cpus // nworkers))
+        else:
+            # the largest number of threads dividing the CPUs, so that no core is left idle
+            nthreads = max(n for n in range(1, min(PROFILES[profile], cpus) + 1) if cpus % n == 0)
+    if nworkers is None:
+        nworkers = max(1, cpus // nthreads)
+    if mem_limit is None:
+        mem_limit = int(resources["memory"] * MEMORY_FRACTION / nworkers)
+
+    return {"nworkers": nworkers, "nthreads": nthreads, "mem_limit": parse_bytes(mem_limit), "resources": resources}
+
+
+def check_layout(layout):
+    """
+    Check a cluster layout against the available resources.
+
+    Returns:
+        list: the warnings on oversubscribed CPUs or memory, empty if the layout fits
+    """
+    resources = layout["resources"]
+    warnings = []
+    if layout["nworkers"] * layout["nthreads"] > resources["cpus"]:
+        warnings.append(
+            f"{layout['nworkers']} workers x {layout['nthreads']} threads exceed "
+            f"the {resources['cpus']} CPUs available ({resources['source']})"
+        )
+    if layout["nworkers"] * layout["mem_limit"] > resources["memory"]:
+        warnings.append(
+            f"{layout['nworkers']} workers x {format_bytes(layout['mem_limit'])} exceed "
+            f"the {format_bytes(resources['memory'])} of memory available ({resources['source']})"
+        )
+    return warnings
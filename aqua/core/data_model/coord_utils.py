@@ -3,6 +3,7 @@
 import os
 from functools import cache
 
+import numpy as np
 from metpy.units import units
 from pint.errors import DimensionalityError, UndefinedUnitError
 
@@ -13,6 +14,9 @@ from aqua.core.util import load_yaml
 pressure_dim = units.pascal.dimensionality
 meter_dim = units.meter.dimensionality
 
+# Coordinate attributes used in the coordinate signature
+SIGNATURE_ATTRS = ("units", "standard_name", "axis", "long_name", "positive", "bounds", "calendar")
+
 # module logger
 # logger = log_configure(log_level='INFO', log_name='coord_utils')
 
@@ -91,7 +95,8 @@ def get_data_model(name: str = "aqua"):
     return _load_data_model(name)
 
 
-# Function to get the conversion factor
+# Function to get the conversion factor, cached since unit strings are parsed by pint
+@cache
 def units_conversion_factor(from_unit_str, to_unit_str):
     """
     Get the conversion factor between two units.
@@ -108,6 +113,38 @@ def units_conversion_factor(from_unit_str, to_unit_str):
         return None
 
 
+def coord_signature(coords):
+    """
+    Build a cheap, hashable signature of a set of coordinates.
+    It includes everything used for the coordinate identification: names, dims,
+    dtypes, shapes, the relevant attributes, the endpoints and the range of the values.
+    Multidimensional and dask coordinates are not described, since reading them is not cheap.
+
+    Args:
+        coords (xr.Coordinates): The coordinates to be described.
+
+    Returns:
+        tuple: The signature of the coordinates, None if they cannot be described cheaply.
+    """
+    signature = []
+    for name, coord in coords.items():
+        if coord.ndim > 1 or coord.chunks is not None:
+            return None
+        if coord.ndim == 0:
+            values = (str(coord.values),)
+        elif coord.size:
+            values = (str(coord[0].values), str(coord[-1].values))
+            if np.issubdtype(coord.dtype, np.number):
+                # the range is used for identification, e.g. of the longitude convention
+                values += (str(coord.min().values), str(coord.max().values))
+        else:
+            values = ()
+        attrs = tuple(str(coord.attrs.get(key)) for key in SIGNATURE_ATTRS)
+        signature.append((str(name), coord.dims, str(coord.dtype), coord.shape, attrs, values))
+    return tuple(signature)
+
+
+@cache
 def is_pressure(unit):
     """Check if a unit is a pressure unit."""
     try:
@@ -116,6 +153,7 @@ def is_pressure(unit):
         return False
 
 
+@cache
 def is_meter(unit):
     """Check if a unit is a length unit (depth)."""
     try:
@@ -15,13 +15,17 @@ class CoordTransformer:
     a standard format.
     """
 
-    def __init__(self, data, loglevel="WARNING"):
+    def __init__(self, data, loglevel="WARNING", src_coords=None, gridtype=None):
         """
         Constructor of the CoordTransator class.
 
         Args:
             data (xr.Dataset or xr.DataArray): Xarray Dataset or DataArray object.
             loglevel (str, optional): Log level. Defaults to 'WARNING'.
+            src_coords (dict, optional): Coordinates already identified by CoordIdentifier
+                                         for the same coordinate layout. Defaults to None.
+            gridtype (str, optional): Grid type already identified for the same coordinate layout.
+                                      Defaults to None.
         """
         if not isinstance(data, (xr.Dataset, xr.DataArray)):
             raise TypeError("data must be an Xarray Dataset or DataArray object.")
@@ -30,9 +34,11 @@ class CoordTransformer:
 
         self.data = data
 
-        self.src_coords = CoordIdentifier(data.coords, loglevel=loglevel).identify_coords()
+        if src_coords is None:
+            src_coords = CoordIdentifier(data.coords, loglevel=loglevel).identify_coords()
+        self.src_coords = src_coords
         self.tgt_coords = None
-        self.gridtype = self._info_grid(data.coords)
+        self.gridtype = gridtype if gridtype is not None else self._info_grid(data.coords)
         self.logger.info("Grid type: %s", self.gridtype)
 
     def _info_grid(self, coords):
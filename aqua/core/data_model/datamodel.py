@@ -1,15 +1,21 @@
 """
 DataModel class for applying base coordinate transformations.
-Provides a clean interface to CoordTransformer with caching.
+Provides a clean interface to CoordTransformer with caching of the identified coordinates.
 """
 
+import copy
+from collections import OrderedDict
+
 import xarray as xr
 
 from aqua.core.logger import log_configure
 
-from .coord_utils import get_data_model
+from .coord_utils import coord_signature, get_data_model
 from .coordtransformer import CoordTransformer
 
+# maximum number of coordinate layouts kept in the plan cache
+PLAN_CACHE_SIZE = 64
+
 
 class DataModel:
     """
@@ -33,6 +39,10 @@ class DataModel:
         >>> data = datamodel.apply(data)
     """
 
+    # Identified coordinates and grid type, keyed by coordinate signature.
+    # Shared among instances, since identification does not depend on the data model.
+    _plan_cache = OrderedDict()
+
     def __init__(self, name: str = "aqua", loglevel: str = "WARNING"):
         """
         Initialize DataModel.
@@ -61,7 +71,41 @@ class DataModel:
             xr.Dataset: Transformed dataset with standardized coordinates
         """
         self.logger.info("Applying data model: %s", self.name)
-        return CoordTransformer(data, loglevel=self.loglevel).transform_coords(name=self.name, flip_coords=flip_coords)
+        return self._get_transformer(data).transform_coords(name=self.name, flip_coords=flip_coords)
+
+    def _get_transformer(self, data):
+        """
+        Get the CoordTransformer for the data, reusing the identified coordinates
+        if a dataset with the same coordinate layout has already been seen.
+
+        Args:
+            data (xr.Dataset or xr.DataArray): Input data
+
+        Returns:
+            CoordTransformer: The transformer for the data
+        """
+        signature = coord_signature(data.coords)
+        if signature is None:
+            return CoordTransformer(data, loglevel=self.loglevel)
+        plan = self._plan_cache.get(signature)
+
+        if plan is not None:
+            self.logger.debug("Coordinate layout already identified, using cached plan")
+            self._plan_cache.move_to_end(signature)
+            src_coords, gridtype = plan
+            # the transformer can update the source coordinates, so a copy is provided
+            return CoordTransformer(data, loglevel=self.loglevel, src_coords=copy.deepcopy(src_coords), gridtype=gridtype)
+
+        transformer = CoordTransformer(data, loglevel=self.loglevel)
+        self._plan_cache[signature] = (copy.deepcopy(transformer.src_coords), transformer.gridtype)
+        if len(self._plan_cache) > PLAN_CACHE_SIZE:
+            self._plan_cache.popitem(last=False)
+        return transformer
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear the cache of identified coordinate layouts."""
+        cls._plan_cache.clear()
 
     def get_config(self) -> dict:
         """
@@ -21,9 +21,10 @@ from time import time
 
 import dask
 import pandas as pd
-from dask.distributed import Client, LocalCluster
+from dask.distributed import Client
 
 from aqua.core.configurer import ConfigPath
+from aqua.core.dask import DaskCluster
 from aqua.core.lock import SafeFileLock
 from aqua.core.logger import log_configure, log_history
 from aqua.core.reader import Reader
@@ -84,6 +85,7 @@ class Drop:
         engine="fdb",
         output_format="netcdf",
         zarr_chunks=None,
+        chunks=None,
         **kwargs,
     ):
         """
@@ -140,6 +142,9 @@ class Drop:
             output_format (string, opt): Output format: 'netcdf', 'zarr' or 'icechunk'.
                                          Default is 'netcdf'. When set to 'icechunk',
                                          catalog entry generation is skipped.
+            chunks (str or dict, opt): Chunking of the data access, passed to the Reader.
+                                       If 'auto', chunks are tuned on the output frequency and
+                                       statistic and on the memory of the workers. Default is None.
             **kwargs:                kwargs to be sent to the Reader, as 'zoom' or 'realization'
         """
 
@@ -192,6 +197,7 @@ class Drop:
         self.output_format = output_format
         self.compact = compact
         self.zarr_chunks = zarr_chunks
+        self.chunks = chunks
 
         # whether to regrid before time statistics
         self.regrid_first = regrid_first
@@ -252,6 +258,11 @@ class Drop:
             self.basedir,
             f"drop_stats_{self.catalog}_{self.model}_{self.exp}_{self.source}_{output_format}_{_ts}.txt",
         )
+        # per-chunk telemetry as JSON lines, to be summarized with `aqua drop --report`
+        self.telemetry_file = os.path.join(
+            self.basedir,
+            f"drop_telemetry_{self.catalog}_{self.model}_{self.exp}_{self.source}_{output_format}_{_ts}.jsonl",
+        )
 
     @staticmethod
     def _require_param(param, name, msg=None):
@@ -393,6 +404,7 @@ class Drop:
             enddate=self.enddate,
             fix=self.fix,
             engine=self.engine,
+            chunks=self.chunks,
             **self.kwargs,
         )
 
@@ -402,6 +414,11 @@ class Drop:
             self.logger.info("Assuming catalog from the reader so that is %s", self.reader.catalog)
             self.catalog = self.reader.catalog
 
+        if self.chunks == "auto":
+            self.reader.autotune_chunks(
+                var=self.var, level=self.level, freq=self.frequency, stat=self.stat if self.frequency else None
+            )
+
         self.logger.info("Retrieving data...")
         self.data = self.reader.retrieve(var=self.var, level=self.level)
 
@@ -523,8 +540,10 @@ class Drop:
             self.logger.info("Setting up dask cluster with %s workers", self.nproc)
             dask.config.set({"temporary_directory": self.tmpdir})
             self.logger.info("Temporary directory: %s", self.tmpdir)
-            self.cluster = LocalCluster(n_workers=self.nproc, threads_per_worker=1)
-            self.client = Client(self.cluster)
+            # DROP reads and writes data: one thread per worker, memory split among them
+            self.cluster = DaskCluster(loglevel=self.loglevel)
+            self.cluster.setup(nworkers=self.nproc, profile="io")
+            self.client = Client(self.cluster.address)
         else:
             self.client = None
             dask.config.set(scheduler="synchronous")
@@ -534,7 +553,7 @@ class Drop:
         Close dask cluster
         """
         if self.dask:  # self.nproc > 1
-            self.client.shutdown()
+            self.client.close()
             self.cluster.close()
             self.logger.info("Dask cluster closed")
 
@@ -652,6 +671,7 @@ class Drop:
             dask=self.dask,
             performance_reporting=self.performance_reporting,
             stats_file=self.stats_file if self.definitive else None,
+            telemetry_file=self.telemetry_file if self.definitive else None,
         )
 
         del temp_data
@@ -674,6 +694,7 @@ class Drop:
         with open(self.stats_file, "a", encoding="utf-8") as fh:
             fh.write(header)
         self.logger.info("Stats file: %s", self.stats_file)
+        self.logger.info("Telemetry file: %s", self.telemetry_file)
 
     def _append_stats(self, var, t_beg, t_end):
         """Append a variable summary line to the stats file (chunk lines already written inline)."""
@@ -0,0 +1,193 @@
+"""
+Per-chunk performance telemetry for DROP
+
+Each written chunk is recorded as a JSON line with the time spent in each phase
+(compute, write, validate, move), the bytes read and written, the dask graph size,
+the bytes spilled to disk and the peak worker memory. The report summarizes one
+or more telemetry files, e.g. to size the resources of a job.
+"""
+
+import json
+import os
+from datetime import datetime
+from time import time
+
+import pandas as pd
+import psutil
+
+PHASES = ["compute", "write", "validate", "move"]
+
+
+def process_counters(dask_worker=None, since=None):
+    """
+    I/O, spill and peak memory counters of the current process.
+    Designed to be run on dask workers through ``Client.run``, which provides ``dask_worker``.
+
+    Args:
+        dask_worker (distributed.Worker, optional): the dask worker, if run on a worker
+        since (float, optional): the timestamp from which the peak memory is computed
+
+    Returns:
+        dict: cumulative bytes read, written and spilled to disk, and the peak memory in bytes
+    """
+    process = psutil.Process()
+    try:
+        io = process.io_counters()
+        # read_chars/write_chars include cached I/O and are available only on Linux
+        read_bytes = getattr(io, "read_chars", io.read_bytes)
+        write_bytes = getattr(io, "write_chars", io.write_bytes)
+    except (AttributeError, psutil.Error):
+        read_bytes = write_bytes = None
+
+    spilled_bytes = 0
+    peak_memory = process.memory_info().rss
+    if dask_worker is not None:
+        metrics = getattr(dask_worker.data, "cumulative_metrics", {})
+        spilled_bytes = metrics.get(("disk-write", "bytes"), 0)
+        # the worker system monitor samples the memory every 500ms
+        quantities = dask_worker.monitor.quantities
+        samples = [mem for t, mem in zip(quantities["time"], quantities["memory"]) if since is None or t >= since]
+        peak_memory = max(samples + [peak_memory])
+
+    return {"read": read_bytes, "write": write_bytes, "spilled": spilled_bytes, "peak_memory": peak_memory}
+
+
+def cluster_counters(client=None, since=None):
+    """
+    Counters of the current process and of all the dask workers, if a client is provided.
+    Bytes are summed over the processes, while the peak memory is the maximum over the workers.
+
+    Args:
+        client (distributed.Client, optional): the dask client
+        since (float, optional): the timestamp from which the peak memory is computed
+
+    Returns:
+        dict: the counters, see ``process_counters``
+    """
+    counters = [process_counters()]
+    if client is not None:
+        counters += list(client.run(process_counters, since=since).values())
+
+    total = {}
+    for key in ["read", "write", "spilled"]:
+        values = [counter[key] for counter in counters]
+        total[key] = None if None in values else sum(values)
+    # the local process only orchestrates the workers, it is relevant only without a cluster
+    workers = counters[1:] or counters
+    total["peak_memory"] = max(counter["peak_memory"] for counter in workers)
+    return total
+
+
+class ChunkTelemetry:
+    """
+    Telemetry of a single DROP chunk. Phases are timed with ``phase`` and
+    the record is completed and appended to a JSON lines file with ``finish``.
+    """
+
+    def __init__(self, client=None):
+        """
+        Args:
+            client (distributed.Client, optional): the dask client, to collect the workers counters
+        """
+        self.client = client
+        self.start = time()
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.tasks = None
+        self.counters = cluster_counters(client)
+
+    def phase(self, name, func, *args, **kwargs):
+        """Run a function and add its elapsed time to a phase"""
+        t_start = time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.timings[name] += time() - t_start
+
+    def finish(self, telemetry_file, **record):
+        """
+        Complete the record with timings and counters and append it to the telemetry file.
+
+        Args:
+            telemetry_file (str): the JSON lines file
+            **record: chunk information (var, year, month, status, data_bytes...)
+
+        Returns:
+            dict: the complete record
+        """
+        elapsed = time() - self.start
+        counters = cluster_counters(self.client, since=self.start)
+
+        def delta(key):
+            if counters[key] is None or self.counters[key] is None:
+                return None
+            return counters[key] - self.counters[key]
+
+        data_bytes = record.get("data_bytes")
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **record,
+            **{f"{name}_time": value for name, value in self.timings.items()},
+            "total_time": elapsed,
+            "bytes_read": delta("read"),
+            "bytes_written": delta("write"),
+            "dask_tasks": self.tasks,
+            "spilled_bytes": delta("spilled"),
+            "peak_worker_memory": counters["peak_memory"],
+            "throughput_mib_s": data_bytes / 2**20 / elapsed if data_bytes is not None and elapsed > 0 else None,
+        }
+
+        with open(telemetry_file, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, default=str) + "\n")
+        return record
+
+
+def load_telemetry(files):
+    """
+    Load one or more telemetry files.
+
+    Args:
+        files (str or list): the JSON lines files
+
+    Returns:
+        pd.DataFrame: one row per chunk
+    """
+    records = []
+    for telemetry_file in [files] if isinstance(files, str) else files:
+        with open(telemetry_file, "r", encoding="utf-8") as fh:
+            records += [dict(json.loads(line), file=os.path.basename(telemetry_file)) for line in fh if line.strip()]
+    return pd.DataFrame(records)
+
+
+def telemetry_report(files):
+    """
+    Summarize one or more telemetry files by variable.
+
+    Args:
+        files (str or list): the JSON lines files
+
+    Returns:
+        str: the report, with totals and the slowest chunk
+    """
+    data = load_telemetry(files)
+    if data.empty:
+        return "No chunks found in the telemetry files"
+
+    gib = 2**30
+    lines = [f"DROP telemetry: {len(data)} chunks from {data['file'].nunique()} files"]
+    for var, group in data.groupby("var"):
+        total = group["total_time"].sum()
+        phases = ", ".join(f"{name} {group[f'{name}_time'].sum():.1f}s" for name in PHASES)
+        failed = (group["status"] != "ok").sum()
+        slowest = group.loc[group["total_time"].idxmax()]
+        lines += [
+            f"\nVariable {var}: {len(group)} chunks ({failed} failed), total {total:.1f}s "
+            f"(mean {group['total_time'].mean():.1f}s, max {slowest['total_time']:.1f}s "
+            f"for {slowest['year']}-{int(slowest['month']):02d})",
+            f"  phases: {phases}",
+            f"  data: {group['data_bytes'].sum() / gib:.2f} GiB, read {group['bytes_read'].sum() / gib:.2f} GiB, "
+            f"written {group['bytes_written'].sum() / gib:.2f} GiB, spilled {group['spilled_bytes'].sum() / gib:.2f} GiB",
+            f"  throughput: {group['throughput_mib_s'].median():.1f} MiB/s (median), "
+            f"dask tasks per chunk: {group['dask_tasks'].median():.0f} (median)",
+            f"  peak worker memory: {group['peak_worker_memory'].max() / gib:.2f} GiB",
+        ]
+    return "\n".join(lines)
@@ -16,10 +16,12 @@ import numpy as np
 import pandas as pd
 import xarray as xr
 import zarr
+from dask import is_dask_collection
 from dask.diagnostics import ProgressBar
-from dask.distributed import progress
+from dask.distributed import get_client, progress
 from dask.distributed.diagnostics import MemorySampler
 
+from aqua.core.drop.drop_telemetry import ChunkTelemetry
 from aqua.core.drop.drop_util import move_tmp_files
 from aqua.core.logger import log_configure
 
@@ -44,6 +46,7 @@ class BaseWriter(ABC):
                 var, year, month, elapsed, mem, size_bytes, throughput_mib_s
         _last_mem_stats: the last memory stats dictionary with keys avg_mem and max_mem, or None
         _last_chunk_size_bytes: the size in bytes of the last chunk, or None
+        _telemetry: the ChunkTelemetry of the chunk being written, or None if telemetry is disabled
     """
 
     def __init__(
@@ -69,6 +72,7 @@ class BaseWriter(ABC):
         self._chunk_stats = []
         self._last_mem_stats = None
         self._last_chunk_size_bytes = None
+        self._telemetry = None
 
     @abstractmethod
     def get_extension(self):
@@ -183,6 +187,8 @@ class BaseWriter(ABC):
         Returns:
             xarray Dataset/DataArray: Computed data
         """
+        if self._telemetry is not None and is_dask_collection(data):
+            self._telemetry.tasks = len(data.__dask_graph__())
         if dask:
             self.logger.info("Computing data with Dask monitoring...")
             if performance_reporting:
@@ -295,14 +301,14 @@ class BaseWriter(ABC):
         data = self._to_dataset(data, var)
 
         # Compute data
-        data = self._compute_data(data, dask=dask, performance_reporting=performance_reporting)
+        data = self._phase("compute", self._compute_data, data, dask=dask, performance_reporting=performance_reporting)
         self._last_chunk_size_bytes = data.nbytes
 
         # Get encoding
         encoding = self._get_encoding(data, var)
 
         # Write to disk
-        success = self._write_chunk_to_disk(data, tmpfile, encoding)
+        success = self._phase("write", self._write_chunk_to_disk, data, tmpfile, encoding)
 
         if success:
             self.logger.info("Writing file %s successful!", tmpfile)
@@ -510,6 +516,7 @@ class BaseWriter(ABC):
         dask=False,
         performance_reporting=False,
         stats_file=None,
+        telemetry_file=None,
     ):
         """
         Write complete variable with all year/month logic.
@@ -536,6 +543,7 @@ class BaseWriter(ABC):
             dask: If True, use Dask for distributed computing
             performance_reporting: Limit to first month only
             stats_file: Path to stats text file for immediate per-chunk writes. None disables writing.
+            telemetry_file: Path to the JSON lines per-chunk telemetry file. None disables telemetry.
         """
         for year, year_data in self._iter_years(data, performance_reporting):
             self.logger.info("Processing year %s...", str(year))
@@ -562,26 +570,36 @@ class BaseWriter(ABC):
                 # Write file
                 if definitive:
                     tmpfile = self.get_filename(var, level=level, year=year, month=month, tmp=True)
+                    self._start_telemetry(telemetry_file, dask=dask)
                     t_start = time()
                     success = self._write_chunk(
                         month_data, var, year, month, level=level, dask=dask, performance_reporting=performance_reporting
                     )
-                    t_elapsed = time() - t_start
-                    self.logger.info("Chunk execution time: %.2f", t_elapsed)
-                    self._record_chunk_stats(var, year, month, t_elapsed, self._last_chunk_size_bytes, stats_file)
 
                     if not success:
                         self.logger.error("Failed to write chunk for %s-%s", year, month)
-                        continue
-
                     # Validate temp file
-                    if not self.validate(tmpfile):
+                    elif not self._phase("validate", self.validate, tmpfile):
                         self.logger.error("Something has gone wrong in %s!", tmpfile)
-                        continue
+                        success = False
+                    else:
+                        # Move IMMEDIATELY (NetCDF timing, not Zarr's deferred move)
+                        self.logger.info("Moving temporary file %s to %s", tmpfile, monthfile)
+                        self._phase("move", move_tmp_files, self.tmpdir, self.outdir)
 
-                    # Move IMMEDIATELY (NetCDF timing, not Zarr's deferred move)
-                    self.logger.info("Moving temporary file %s to %s", tmpfile, monthfile)
-                    move_tmp_files(self.tmpdir, self.outdir)
+                    t_elapsed = time() - t_start
+                    self.logger.info("Chunk execution time: %.2f", t_elapsed)
+                    self._record_chunk_stats(
+                        var,
+                        year,
+                        month,
+                        t_elapsed,
+                        self._last_chunk_size_bytes,
+                        stats_file,
+                        telemetry_file=telemetry_file,
+                        level=level,
+                        success=success,
+                    )
 
             # Concatenate into yearly file if concat enabled
             if definitive and self._should_concat():
@@ -589,10 +607,36 @@ class BaseWriter(ABC):
 
         return True
 
-    def _record_chunk_stats(self, var, year, month, t_elapsed, size_bytes, stats_file):
-        """Record per-chunk performance stats and optionally append to the stats file.
+    def _start_telemetry(self, telemetry_file, dask=False):
+        """Start collecting the telemetry of a chunk, if a telemetry file is provided.
 
-        Resets ``_last_mem_stats`` and ``_last_chunk_size_bytes`` after recording
+        Args:
+            telemetry_file: Path to the JSON lines telemetry file, or None to disable telemetry.
+            dask: If True, the counters of the dask workers are collected as well.
+        """
+        if telemetry_file is None:
+            self._telemetry = None
+            return
+        client = None
+        if dask:
+            try:
+                client = get_client()
+            except ValueError:
+                self.logger.debug("No dask client found, collecting telemetry of the local process only")
+        self._telemetry = ChunkTelemetry(client)
+
+    def _phase(self, name, func, *args, **kwargs):
+        """Run a function, timing it as a telemetry phase (compute, write, validate, move) if telemetry is active."""
+        if self._telemetry is None:
+            return func(*args, **kwargs)
+        return self._telemetry.phase(name, func, *args, **kwargs)
+
+    def _record_chunk_stats(
+        self, var, year, month, t_elapsed, size_bytes, stats_file, telemetry_file=None, level=None, success=True
+    ):
+        """Record per-chunk performance stats and optionally append to the stats and telemetry files.
+
+        Resets ``_last_mem_stats``, ``_last_chunk_size_bytes`` and ``_telemetry`` after recording
         so the next chunk starts with clean state.
 
         Args:
@@ -602,6 +646,9 @@ class BaseWriter(ABC):
             t_elapsed: Wall-clock elapsed time in seconds.
             size_bytes: Uncompressed data size in bytes, or None.
             stats_file: Path to the stats text file, or None to skip file write.
+            telemetry_file: Path to the JSON lines telemetry file, or None to skip telemetry.
+            level: Level of the chunk, if any.
+            success: Whether the chunk has been written, validated and moved successfully.
         """
         entry = {
             "var": var,
@@ -617,6 +664,18 @@ class BaseWriter(ABC):
         self._last_chunk_size_bytes = None
         if stats_file is not None:
             self._write_chunk_stat_line(entry, stats_file)
+        if telemetry_file is not None and self._telemetry is not None:
+            self._telemetry.finish(
+                telemetry_file,
+                var=var,
+                level=level,
+                year=int(year),
+                month=int(month),
+                format=self.__class__.__name__.removesuffix("Writer").lower(),
+                status="ok" if success else "failed",
+                data_bytes=size_bytes,
+            )
+        self._telemetry = None
 
     def _write_chunk_stat_line(self, entry, stats_file):
         """Write a single chunk stat line immediately to the stats file."""
@@ -327,6 +327,7 @@ class IcechunkWriter(BaseWriter):
         dask=False,
         performance_reporting=False,
         stats_file=None,
+        telemetry_file=None,
     ):
         """
         Write complete variable with monthly commits to icechunk repo.
@@ -348,6 +349,8 @@ class IcechunkWriter(BaseWriter):
             definitive: Actually write files (vs dry-run)
             dask: If True, use Dask for distributed computing
             performance_reporting: Limit to first month only (for benchmarking)
+            stats_file: Path to stats text file for immediate per-chunk writes. None disables writing.
+            telemetry_file: Path to the JSON lines per-chunk telemetry file. None disables telemetry.
 
         Returns:
             bool: True if successful
@@ -384,65 +387,86 @@ class IcechunkWriter(BaseWriter):
                 self.logger.info("Processing month %s-%02d...", year, month)
 
                 if definitive:
+                    self._start_telemetry(telemetry_file, dask=dask)
                     t_start = time.time()
-
-                    # Compute data
-                    month_data = self._compute_data(month_data, dask=dask, performance_reporting=performance_reporting)
-                    self._last_chunk_size_bytes = month_data.nbytes
-
-                    mode = "w" if first_session_write else "a"
-                    append_dim = None if first_session_write else "time"
-
-                    # Write to session
+                    success = False
+                    # stats and telemetry are recorded for failed chunks as well
                     try:
-                        if not self._write_to_icechunk_session(
-                            month_data, self.main_session, mode=mode, append_dim=append_dim
-                        ):
-                            self.logger.error("Failed to write month %s-%02d; skipping", year, month)
-                            self.main_session = self.repo.writable_session("main")
-                            continue
+                        # Compute data
+                        month_data = self._phase(
+                            "compute", self._compute_data, month_data, dask=dask, performance_reporting=performance_reporting
+                        )
+                        self._last_chunk_size_bytes = month_data.nbytes
+
+                        mode = "w" if first_session_write else "a"
+                        append_dim = None if first_session_write else "time"
 
-                        # Commit per month (atomic unit)
+                        # Write to session
                         try:
-                            self.main_session.commit(f"DROP {var} {year}-{month:02d}")
-                            self.logger.info("Month %s-%02d committed", year, month)
-                            # Create new session for next write (current becomes read-only after commit)
-                            self.main_session = self.repo.writable_session("main")
-                            first_session_write = False
+                            if not self._phase(
+                                "write",
+                                self._write_to_icechunk_session,
+                                month_data,
+                                self.main_session,
+                                mode=mode,
+                                append_dim=append_dim,
+                            ):
+                                self.logger.error("Failed to write month %s-%02d; skipping", year, month)
+                                self.main_session = self.repo.writable_session("main")
+                                continue
+
+                            # Commit per month (atomic unit)
+                            try:
+                                self._phase("write", self.main_session.commit, f"DROP {var} {year}-{month:02d}")
+                                self.logger.info("Month %s-%02d committed", year, month)
+                                # Create new session for next write (current becomes read-only after commit)
+                                self.main_session = self.repo.writable_session("main")
+                                first_session_write = False
+
+                            except Exception as e:
+                                self.logger.error("Commit failed for month %s-%02d: %s", year, month, e)
+                                self.main_session = self.repo.writable_session("main")
+                                continue
+
+                            # Post-commit integrity check: verify committed snapshot is readable
+                            # and the last timestamp matches what was just written.
+                            expected_last = pd.Timestamp(month_data.time.values[-1]).strftime("%Y%m%d")
+                            integrity = self._phase("validate", self.check_integrity, var)
+                            if not integrity["complete"] or integrity["last_record"] != expected_last:
+                                self.logger.error(
+                                    "Post-commit integrity check failed for %s-%02d: %s",
+                                    year,
+                                    month,
+                                    integrity["message"],
+                                )
+                                continue
+                            self.logger.debug(
+                                "Post-commit check passed for %s-%02d (last_record=%s)",
+                                year,
+                                month,
+                                integrity["last_record"],
+                            )
+                            success = True
 
                         except Exception as e:
-                            self.logger.error("Commit failed for month %s-%02d: %s", year, month, e)
+                            self.logger.error("Write failed for month %s-%02d: %s", year, month, e)
                             self.main_session = self.repo.writable_session("main")
                             continue
 
-                        # Post-commit integrity check: verify committed snapshot is readable
-                        # and the last timestamp matches what was just written.
-                        expected_last = pd.Timestamp(month_data.time.values[-1]).strftime("%Y%m%d")
-                        integrity = self.check_integrity(var)
-                        if not integrity["complete"] or integrity["last_record"] != expected_last:
-                            self.logger.error(
-                                "Post-commit integrity check failed for %s-%02d: %s",
-                                year,
-                                month,
-                                integrity["message"],
-                            )
-                            continue
-                        self.logger.debug(
-                            "Post-commit check passed for %s-%02d (last_record=%s)",
+                    finally:
+                        t_elapsed = time.time() - t_start
+                        self.logger.info("Month %s-%02d execution time: %.2f seconds", year, month, t_elapsed)
+                        self._record_chunk_stats(
+                            var,
                             year,
                             month,
-                            integrity["last_record"],
+                            t_elapsed,
+                            self._last_chunk_size_bytes,
+                            stats_file,
+                            telemetry_file=telemetry_file,
+                            success=success,
                         )
 
-                    except Exception as e:
-                        self.logger.error("Write failed for month %s-%02d: %s", year, month, e)
-                        self.main_session = self.repo.writable_session("main")
-                        continue
-
-                    t_elapsed = time.time() - t_start
-                    self.logger.info("Month %s-%02d execution time: %.2f seconds", year, month, t_elapsed)
-                    self._record_chunk_stats(var, year, month, t_elapsed, self._last_chunk_size_bytes, stats_file)
-
             # Yearly checkpoint (optional)
             if definitive:
                 self.concat_year_files(var, year)  # Calls optional GC
@@ -1,5 +1,6 @@
 import operator
 import re
+from functools import lru_cache
 
 import xarray as xr
 
@@ -16,10 +17,17 @@ OPS = {
     "+": operator.add,  # Addition (lowest precedence)
 }
 
+# maximum number of parsed formulas kept in memory
+FORMULA_CACHE_SIZE = 256
+
 
 class EvaluateFormula:
     """
     Class to evaluate a formula based on a string input.
+
+    The formula is parsed once into an expression tree (cached by formula string),
+    which is then compiled into a single elementwise kernel applied with one
+    ``xr.apply_ufunc`` call over all the input variables.
     """
 
     def __init__(
@@ -55,32 +63,33 @@ class EvaluateFormula:
         self.short_name = short_name
         self.long_name = long_name
 
-        self.token = self._extract_tokens()
-
     def _evaluate(self):
         """
         Evaluate the formula using the provided data.
-        Handles parentheses by recursively evaluating sub-expressions.
 
         Returns:
             xr.DataArray: The result of the evaluated formula as an xarray DataArray.
         """
         self.logger.debug("Evaluating formula: %s", self.formula)
 
-        # Handle parentheses first by recursively evaluating sub-expressions
-        formula_with_parentheses = self._handle_parentheses(self.formula)
+        tree = parse_formula(self.formula)
+        kernel, variables = compile_formula(self.formula)
+
+        if not variables:
+            self.logger.error("No variables found in formula %s", self.formula)
+            raise KeyError(f"No variables found in formula {self.formula}")
 
-        # Re-tokenize after parentheses handling
-        self.token = self._extract_tokens(formula_with_parentheses)
+        missing = [var for var in variables if var not in self.data]
+        if missing:
+            self.logger.error(f"Variable {missing[0]} not found in data")
+            raise KeyError(f"Variable {missing[0]} not found in data")
 
-        if not self.token:
-            self.logger.error("No tokens extracted from the formula.")
+        # a plain variable name does not need any computation
+        if tree[0] == "var":
+            return self.data[tree[1]]
 
-        if len(self.token) > 1:
-            if self.token[0] == "-":
-                return -self.data[self.token[1]]
-            return self._operations()
-        return self.data[self.token[0]]
+        # Use apply_ufunc to maintain xarray functionality, a single blockwise layer for the whole formula
+        return xr.apply_ufunc(kernel, *[self.data[var] for var in variables], keep_attrs=True, dask="parallelized")
 
     def evaluate(self):
         """
@@ -93,111 +102,6 @@ class EvaluateFormula:
         out = self._evaluate()
         return self._update_attributes(out)
 
-    def _extract_tokens(self, formula_str=None):
-        """
-        Tokenize the formula string into individual components.
-
-        Returns:
-            list: A list of tokens extracted from the formula.
-        """
-        if formula_str is None:
-            formula_str = self.formula
-
-        token = [i for i in re.split("([^\\w.]+)", formula_str) if i and i.strip()]
-        return token
-
-    def _handle_parentheses(self, formula_str):
-        """
-        Handle parentheses in the formula by recursively evaluating sub-expressions.
-
-        This method finds the innermost parentheses, evaluates the expression within them,
-        stores the result as a temporary variable, and replaces the parentheses expression
-        with the temporary variable name.
-
-        Args:
-            formula_str (str): The formula string potentially containing parentheses.
-
-        Returns:
-            str: The formula string with parentheses resolved.
-        """
-        temp_var_counter = 0
-
-        while "(" in formula_str:
-            # Find the innermost parentheses (rightmost opening parenthesis)
-            start = -1
-            for i, char in enumerate(formula_str):
-                if char == "(":
-                    start = i
-                elif char == ")" and start != -1:
-                    # Found a complete parenthesis pair
-                    sub_expr = formula_str[start + 1 : i]
-
-                    # Create temporary variable name
-                    temp_var_name = f"_temp_{temp_var_counter}"
-                    temp_var_counter += 1
-
-                    # Recursively evaluate the sub-expression
-                    sub_evaluator = EvaluateFormula(data=self.data, formula=sub_expr, loglevel=self.loglevel)
-                    sub_result = sub_evaluator._evaluate()
-
-                    # Store the result in our data dictionary for later use
-                    # We'll need to modify _operations to handle temp variables
-                    self.data = self.data.copy()  # Avoid modifying original data
-                    self.data[temp_var_name] = sub_result
-
-                    # Replace the parentheses expression with temp variable
-                    formula_str = formula_str[:start] + temp_var_name + formula_str[i + 1 :]
-                    break
-
-        return formula_str
-
-    def _operations(self):
-        """
-        Parsing of the operations using operator package and precedence-based evaluation.
-        Now supports power operator (^) and handles temporary variables from parentheses.
-
-        Operations are evaluated in order of precedence:
-        1. ^ (power) - highest precedence
-        2. *, / (multiplication, division)
-        3. +, - (addition, subtraction) - lowest precedence
-
-        Returns:
-            xr.DataArray: The result of the evaluated formula as an xarray DataArray.
-        """
-
-        # use a dictionary to store xarray field and call them easily
-        dct = {}
-        for k in self.token:
-            if k not in OPS:
-                try:
-                    dct[k] = float(k)
-                except ValueError:
-                    # Handle both regular variables and temporary variables from parentheses
-                    if k in self.data:
-                        dct[k] = self.data[k]
-                    else:
-                        self.logger.error(f"Variable {k} not found in data")
-                        raise KeyError(f"Variable {k} not found in data")
-
-        # apply operators to all occurrences, from top priority
-        # Operations are processed in order of precedence (as defined in OPS dictionary)
-        code = 0
-        for p in OPS:
-            while p in self.token:
-                code += 1
-                x = self.token.index(p)
-                name = "op" + str(code)
-
-                # Use apply_ufunc to maintain xarray functionality
-                replacer = xr.apply_ufunc(
-                    OPS.get(p), dct[self.token[x - 1]], dct[self.token[x + 1]], keep_attrs=True, dask="parallelized"
-                )
-                dct[name] = replacer
-                self.token[x - 1] = name
-                del self.token[x : x + 2]
-
-        return replacer
-
     def _update_attributes(self, out):
         """
         Update the attributes of the output DataArray.
@@ -262,3 +166,139 @@ class EvaluateFormula:
             raise ValueError("Mismatched parentheses: unclosed opening parenthesis")
 
         return consolidated
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def parse_formula(formula: str):
+    """
+    Parse a consolidated formula into an expression tree.
+
+    Nodes are tuples: ("var", name), ("const", value), ("neg", node)
+    or ("op", symbol, left, right). Parentheses are resolved first, from the
+    innermost one, then operators are reduced following the OPS precedence.
+
+    Args:
+        formula (str): The formula to parse, without spaces.
+
+    Returns:
+        tuple: The root node of the expression tree.
+
+    Raises:
+        ValueError: If parentheses are not properly matched or a group is empty.
+        KeyError: If the formula contains an unsupported operator.
+    """
+    tokens = [t for t in re.split(r"([()]|[^\w.()]+)", formula) if t and t.strip()]
+
+    # stack of token lists, one for each open parenthesis
+    stack = [[]]
+    for token in tokens:
+        if token == "(":
+            stack.append([])
+        elif token == ")":
+            if len(stack) == 1:
+                raise ValueError("Mismatched parentheses: closing parenthesis without opening")
+            group = stack.pop()
+            stack[-1].append(_reduce_tokens(group))
+        else:
+            stack[-1].append(token)
+
+    if len(stack) != 1:
+        raise ValueError("Mismatched parentheses: unclosed opening parenthesis")
+
+    return _reduce_tokens(stack[0])
+
+
+def _reduce_tokens(tokens: list):
+    """
+    Reduce a flat list of tokens (strings or already parsed nodes) to a single node.
+    Operators are applied to all occurrences, from top priority, left to right.
+    """
+    if not tokens:
+        raise ValueError("Empty expression found in formula")
+
+    tokens = [_leaf(t) if isinstance(t, str) and t not in OPS else t for t in tokens]
+
+    # leading minus sign is a negation of the first operand
+    if tokens[0] == "-" and len(tokens) > 1:
+        tokens = [("neg", tokens[1])] + tokens[2:]
+
+    for p in OPS:
+        while p in tokens:
+            x = tokens.index(p)
+            if x == 0 or x == len(tokens) - 1:
+                raise KeyError(f"Operator {p} is missing an operand")
+            tokens[x - 1] = ("op", p, tokens[x - 1], tokens[x + 1])
+            del tokens[x : x + 2]
+
+    if len(tokens) > 1:
+        raise KeyError(f"Cannot parse tokens {tokens}")
+
+    return tokens[0]
+
+
+def _leaf(token: str):
+    """Convert a token to a constant or variable node."""
+    try:
+        return ("const", float(token))
+    except ValueError:
+        # anything else than a word here is an unsupported operator (e.g. '++')
+        if not re.fullmatch(r"[\w.]+", token):
+            raise KeyError(f"Variable {token} not found in data")
+        return ("var", token)
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def compile_formula(formula: str):
+    """
+    Compile a formula into a single elementwise kernel.
+
+    Args:
+        formula (str): The formula to compile, without spaces.
+
+    Returns:
+        tuple: The kernel function and the ordered tuple of the variables it expects as positional arguments.
+    """
+    tree = parse_formula(formula)
+    variables = []
+    _collect_variables(tree, variables)
+    variables = tuple(variables)
+    index = {var: i for i, var in enumerate(variables)}
+
+    evaluator = _build_evaluator(tree, index)
+
+    def kernel(*arrays):
+        return evaluator(arrays)
+
+    return kernel, variables
+
+
+def _collect_variables(node, variables: list):
+    """Collect the unique variable names of the tree, in order of appearance."""
+    kind = node[0]
+    if kind == "var":
+        if node[1] not in variables:
+            variables.append(node[1])
+    elif kind == "neg":
+        _collect_variables(node[1], variables)
+    elif kind == "op":
+        _collect_variables(node[2], variables)
+        _collect_variables(node[3], variables)
+
+
+def _build_evaluator(node, index: dict):
+    """Recursively build a closure evaluating the node on a tuple of arrays."""
+    kind = node[0]
+    if kind == "const":
+        value = node[1]
+        return lambda arrays: value
+    if kind == "var":
+        position = index[node[1]]
+        return lambda arrays: arrays[position]
+    if kind == "neg":
+        operand = _build_evaluator(node[1], index)
+        return lambda arrays: -operand(arrays)
+
+    func = OPS[node[1]]
+    left = _build_evaluator(node[2], index)
+    right = _build_evaluator(node[3], index)
+    return lambda arrays: func(left(arrays), right(arrays))
@@ -1,13 +1,11 @@
 """Fixer mixin for the Reader class"""
 
-import re
-
 import numpy as np
 
 from aqua.core.logger import log_configure, log_history
 from aqua.core.util import convert_units, get_eccodes_attr, to_list
 
-from .evaluate_formula import EvaluateFormula
+from .evaluate_formula import EvaluateFormula, compile_formula
 from .fixer_configure import FixerConfigure
 from .fixer_datamodel import FixerDataModel
 from .fixer_operator import FixerOperator
@@ -45,6 +43,9 @@ class Fixer:
         self.deltat = self._define_deltat(default=DEFAULT_DELTAT)
         self.time_correction = False
 
+        # cache of the fix plans, keyed by the requested variables
+        self._fix_plans = {}
+
         # this is the fixes operator, called internally by the fixer
         self.operator = FixerOperator(self.fixes, loglevel=loglevel)
 
@@ -103,45 +104,25 @@ class Fixer:
 
         fixd = {}  # variables dictionary for name change: only for source, done as {source: var}
         varlist = {}  # variable dictionary for name change
-        vars_to_fix = self.fixes.get("vars", None)  # variables with available fixes
 
-        # check which variables need to be fixed among the requested ones
-        vars_to_fix = self._check_which_variables_to_fix(vars_to_fix, destvar)
+        # check which variables need to be fixed among the requested ones, with their precomputed plans
+        vars_to_fix, var_plans = self._get_fix_plan(destvar)
 
         if vars_to_fix:
             for var in vars_to_fix:
                 # Dictionary of fixes of the single var
                 varfix = vars_to_fix[var]
+                plan = var_plans[var]
 
-                # Get grib attributes if requested and fix name
-                # This can be expanded to other formats in the future
-                grib = varfix.get("grib", None)
-                # We make sure also of the case were an user saw a grib: True
-                # and decided to build a grib: False instead of just not using
-                # the block
-                if grib is not None and grib is not False:
-                    # grib: True means that we're just going to use the default grib attributes
-                    # associated with the variable name var
-                    if isinstance(grib, bool):
-                        attributes, shortname = self._get_variables_grib_attributes(var)
-                    # grib: paramid is an option, this means that the variable name may not correspond
-                    # to the shortname that it can be found within the attributes
-                    elif isinstance(grib, int):
-                        attributes, shortname = self._get_variables_grib_attributes(f"var{grib}")
-                    else:
-                        raise ValueError("grib should be either a boolean or an integer")
-                else:
-                    attributes = {}
-                    shortname = var
-
-                # Get extra attributes from fixer, leave empty dict otherwise
-                attributes.update(varfix.get("attributes", {}))
+                # Attributes and names are already resolved in the plan, copy to avoid changing it
+                attributes = dict(plan["attributes"])
+                shortname = plan["shortname"]
 
                 # Define the list of name changes
                 varlist[var] = shortname
 
                 # 1. source case. We want to be able to work with a list of sources to scan
-                source = to_list(varfix.get("source", None))
+                source = plan["source"]
                 # We want to process a list of sources
                 if source:
                     match = list(set(source) & set(data.variables))
@@ -174,7 +155,7 @@ class Fixer:
                         continue
 
                 # 2. derived case: let's compute the formula it and create the new variable
-                formula = varfix.get("derived", None)
+                formula = plan["formula"]
                 if formula:
                     # If the formula is the same as the variable name, we raise an error
                     # Asking for a derived variable that is also a source variable is not allowed
@@ -209,27 +190,16 @@ class Fixer:
                 # fix source units
                 data = self._override_src_units(data, varfix, var, source)
 
-                # update attributes to the data but the units
-                tgt_units = None
+                # update attributes to the data but the units, already excluded from the plan attributes
                 if attributes:
-                    for att, value in attributes.items():
-                        # Already adjust all attributes but not yet units
-                        if att == "units":
-                            tgt_units = value
-                        else:
-                            data[source].attrs[att] = value
-
-                tgt_units = self._override_tgt_units(tgt_units, varfix, var)
+                    data[source].attrs.update(attributes)
+                tgt_units = plan["tgt_units"]
 
                 if "units" not in data[source].attrs:  # Houston we have had a problem, no units!
                     self.logger.error("Variable %s has no units!", source)
 
                 # adjust units
                 if tgt_units:
-                    if tgt_units.count("{"):  # WHAT IS THIS ABOUT?
-                        tgt_units = self.fixes_dictionary["defaults"]["units"]["shortname"][
-                            tgt_units.replace("{", "").replace("}", "")
-                        ]
                     self.logger.info("%s: converting units %s --> %s", var, data[source].units, tgt_units)
                     if data[source].units != tgt_units:
                         log_history(data[source], f"Converting units of {var}: from {data[source].units} to {tgt_units}")
@@ -287,6 +257,84 @@ class Fixer:
 
         return data
 
+    def _get_fix_plan(self, destvar):
+        """
+        Get the variables to be fixed and their fix plans for the requested variables.
+        Plans are computed once for each set of requested variables and then cached,
+        so that repeated retrieves only apply them.
+
+        Args:
+            destvar (list of str): the requested variables, if None all available variables are fixed
+
+        Returns:
+            A tuple with the dictionary of variables to be fixed and the dictionary of plans for each of them
+        """
+        key = tuple(sorted(to_list(destvar))) if destvar else None
+        if key in self._fix_plans:
+            self.logger.debug("Using cached fix plan for variables %s", key)
+            return self._fix_plans[key]
+
+        # variables with available fixes
+        vars_to_fix = self._check_which_variables_to_fix(self.fixes.get("vars", None), destvar)
+
+        var_plans = {}
+        if vars_to_fix:
+            for var, varfix in vars_to_fix.items():
+                var_plans[var] = self._build_var_plan(var, varfix)
+
+        self._fix_plans[key] = (vars_to_fix, var_plans)
+        return self._fix_plans[key]
+
+    def _build_var_plan(self, var, varfix):
+        """
+        Build the data-independent fix plan of a single variable: name, attributes, sources,
+        derived formula and target units.
+
+        Args:
+            var (str): the name of the variable in the fixes
+            varfix (dict): the fixes of the variable
+
+        Returns:
+            A dictionary with the keys shortname, attributes, source, formula and tgt_units
+        """
+        # Get grib attributes if requested and fix name
+        # This can be expanded to other formats in the future
+        grib = varfix.get("grib", None)
+        # We make sure also of the case were an user saw a grib: True
+        # and decided to build a grib: False instead of just not using
+        # the block
+        if grib is not None and grib is not False:
+            # grib: True means that we're just going to use the default grib attributes
+            # associated with the variable name var
+            if isinstance(grib, bool):
+                attributes, shortname = self._get_variables_grib_attributes(var)
+            # grib: paramid is an option, this means that the variable name may not correspond
+            # to the shortname that it can be found within the attributes
+            elif isinstance(grib, int):
+                attributes, shortname = self._get_variables_grib_attributes(f"var{grib}")
+            else:
+                raise ValueError("grib should be either a boolean or an integer")
+        else:
+            attributes = {}
+            shortname = var
+
+        # Get extra attributes from fixer, leave empty dict otherwise
+        attributes.update(varfix.get("attributes", {}))
+
+        # units are not set as attributes, but used as target of the conversion
+        tgt_units = attributes.pop("units", None)
+        tgt_units = self._override_tgt_units(tgt_units, varfix, var)
+        if tgt_units and tgt_units.count("{"):  # WHAT IS THIS ABOUT?
+            tgt_units = self.fixes_dictionary["defaults"]["units"]["shortname"][tgt_units.replace("{", "").replace("}", "")]
+
+        return {
+            "shortname": shortname,
+            "attributes": attributes,
+            "source": to_list(varfix.get("source", None)),
+            "formula": varfix.get("derived", None),
+            "tgt_units": tgt_units,
+        }
+
     def _define_deltat(self, default):
         """
         Define the deltat for the fixer.
@@ -431,10 +479,9 @@ class Fixer:
 
                 # get the ones from the equation of the derived ones
                 if "derived" in variables[vvv]:
-                    # filter operations
-                    required = [s for s in re.split(r"[-+*/]", variables[vvv]["derived"]) if s]
-                    # filter constants
-                    required_strings = [x for x in required if not x.replace(".", "").isnumeric()]
+                    # variables required by the (cached) parsed formula, constants are filtered out
+                    formula = EvaluateFormula.consolidate_formula(variables[vvv]["derived"])
+                    required_strings = list(compile_formula(formula)[1])
                     if bool(set(required_strings) & set(variables.keys())):
                         self.logger.error(
                             "Recursive fixer definition: %s are variables defined in the fixer!", required_strings
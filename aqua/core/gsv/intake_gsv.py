@@ -711,30 +711,59 @@ class GSVSource(base.DataSource):
         ds = xr.concat(ds, dim="time", coords="different")
         return ds
 
-    def get_part_delayed(self, ii, var, shape, dtype):
+    def _get_block(self, var, itime, ilevel=None, block_id=None):
         """
-        Function to read a delayed partition.
+        Function to read the data partition corresponding to a dask block.
+        Returns a numpy array
+
+        Args:
+            var (string): variable name
+            itime (int): index of the time axis
+            ilevel (int, optional): index of the level axis, used only with vertical chunking
+            block_id (tuple): index of the block along each axis, provided by dask
+        """
+        ii = block_id[itime]
+        if self.chunking_vertical:  # inverse of _index_to_timelevel()
+            ii = ii * len(self.chk_vert) + block_id[ilevel]
+
+        ds = self._get_partition(ii, var=var)
+
+        # get the data from the first (and only) data array
+        return ds.to_array()[0].values
+
+    def get_blocks_dask(self, var, shape, dtype):
+        """
+        Function to build a dask array reading one partition per block.
+        A single blockwise layer is used, without any concatenation,
+        so that the graph has exactly one task per partition.
         Returns a dask.array
 
         Args:
-            ii (int): partition number
             var (string): variable name
             shape: shape of the schema
             dtype: data type of the schema
         """
 
-        i, j = self._index_to_timelevel(ii)
-
-        ds = dask.delayed(self._get_partition)(ii, var=var)
-
-        # get the data from the first (and only) data array
-        ds = ds.to_array()[0].data
-        newshape = list(shape)
-        newshape[self.itime] = self.chk_size[i]
+        chunks = [(size,) for size in shape]
+        chunks[self.itime] = tuple(self.chk_size[i] for i in range(self.ntimechunks))
         if self.chunking_vertical:  # if we have vertical chunking
-            newshape[self.ilevel] = len(self.chk_vert[j])
-
-        return dask.array.from_delayed(ds, newshape, dtype)
+            chunks[self.ilevel] = tuple(len(levels) for levels in self.chk_vert)
+
+        ilevel = self.ilevel if self.chunking_vertical else None
+        # explicit name, to avoid tokenizing the whole source object: all the state read by _get_partition() is used
+        state = {key: value for key, value in self.__getstate__().items() if key not in ["logger", "gsv_log_level"]}
+        token = dask.base.tokenize(var, state, tuple(chunks), dtype, self.itime, ilevel)
+
+        return dask.array.map_blocks(
+            self._get_block,
+            var,
+            self.itime,
+            ilevel,
+            chunks=tuple(chunks),
+            dtype=dtype,
+            meta=np.array((), dtype=dtype),
+            name=f"gsv-{token}",
+        )
 
     def to_dask(self):
         """Return a dask xarray dataset for this data source"""
@@ -780,19 +809,8 @@ class GSVSource(base.DataSource):
                     original_paramid,
                     updated_var,
                 )
-            # Create a dask array from a list of delayed get_partition calls
-            if not self.chunking_vertical:
-                dalist = [self.get_part_delayed(i, original_paramid, shape, dtype) for i in range(self.npartitions)]
-                darr = dask.array.concatenate(dalist, axis=self.itime)  # This is a lazy dask array
-            else:
-                dalist = []
-                for j in range(self.nlevelchunks):
-                    dalistlev = [
-                        self.get_part_delayed(i * self.nlevelchunks + j, original_paramid, shape, dtype)
-                        for i in range(self.ntimechunks)
-                    ]  # noqa: E501
-                    dalist.append(dask.array.concatenate(dalistlev, axis=self.itime))
-                darr = dask.array.concatenate(dalist, axis=self.ilevel)  # This is a lazy dask array
+            # Create a lazy dask array with one get_partition task per block
+            darr = self.get_blocks_dask(original_paramid, shape, dtype)
 
             da = xr.DataArray(
                 darr,
@@ -1,4 +1,6 @@
 """Histogram module."""
-from .histogram import histogram
+from .histogram import (HistogramAccumulator, bin_edges, bin_index, expand_like,
+                        format_histogram, histogram, histogram_weights)
 
-__all__ = ['histogram']
+__all__ = ['HistogramAccumulator', 'histogram', 'bin_edges', 'bin_index',
+           'histogram_weights', 'expand_like', 'format_histogram']
@@ -1,5 +1,6 @@
 import builtins
 
+import dask
 import dask.array as da
 import numpy as np
 import xarray as xr
@@ -19,6 +20,7 @@ def histogram(
     dask: bool = True,
     check: bool = False,
     density: bool = False,
+    regions: dict | None = None,
 ):
     """
     Function to calculate a histogram of a DataArray.
@@ -28,13 +30,16 @@ def histogram(
         range (tuple, optional):   The lower and upper range of the bins. Defaults to None.
         bins (int, optional):      The number of bins for the histogram. Defaults to 10.
         weighted (bool, optional): Use latitudinal weights for the histogram. Defaults to True.
-        weights (xr.DataArray, optional): Weights for the histogram. Defaults to None.
+        weights (xr.DataArray, optional): Weights for the histogram, broadcastable against the data. Defaults to None.
         dask (bool, optional):     If True, uses Dask for parallel computation. Defaults to True.
         units (str, optional):     Convert data to these units. Defaults to None.
         check (bool, optional):    Checks if the sum of counts in the histogram is equal to the size of the data.
                                    Defaults to False. This forces the histogram to be computed.
         density (bool, optional):  Returns a probability density function,
                                    normalized such that the integral over the range is 1. Defaults to False.
+        regions (dict, optional):  Regions where to compute the histogram in the same pass over the data,
+                                   adding a 'region' dimension. Each region is a boolean DataArray or
+                                   a dict with 'lat' and/or 'lon' limits. Defaults to None.
         loglevel (str, optional):  Logging level. Defaults to 'WARNING'.
 
     Raises:
@@ -57,41 +62,299 @@ def histogram(
 
     logger.info("Computing histogram with the following parameters: bins={}, range={}".format(bins, range))
 
-    if weights is not None:
-        if weights.size != data.size:
-            raise ValueError("Weights must have the same size as the data.")
-    elif weighted:
-        logger.debug("Using latitudinal weights")
-        if "lat" not in data.coords:
-            raise ValueError("DataArray must have a 'lat' coordinate for weighted histogram.")
-        weights = xr.ones_like(data)
-        weights = weights * weights.lat
-        weights = np.cos(np.radians(weights))
+    weights = histogram_weights(data, weights=weights, weighted=weighted, logger=logger)
+    names, masks = _region_masks(data, regions)
+    if range is None and np.ndim(bins) == 0:
+        range = (float(data.min()), float(data.max()))
+    edges = bin_edges(bins, range)
 
-    if dask and isinstance(data.data, da.Array):
-        logger.debug("Using Dask for histogram computation")
-        hist, edges = da.histogram(data, weights=weights, bins=bins, range=range, density=density)
-    else:
-        logger.debug("Using NumPy for histogram computation")
-        hist, edges = np.histogram(data, weights=weights, bins=bins, range=range, density=density)
+    use_dask = dask and isinstance(data.data, da.Array)
+    logger.debug("Using %s for histogram computation", "Dask" if use_dask else "NumPy")
+    hist = _counts(data, edges, weights=weights, masks=masks, use_dask=use_dask)
+    if regions is None:
+        hist = hist[0]
 
     size_of_the_data = data.size
 
     if check and not density:
         if isinstance(hist, da.Array):
             hist = hist.compute()
-        if int(sum(hist)) != size_of_the_data:
+        if int(hist.sum()) != size_of_the_data:
             logger.warning("Sum of counts in the histogram is not equal to the size of the data")
 
+    return format_histogram(hist, edges, data.attrs, size_of_the_data, density=density, regions=names)
+
+
+class HistogramAccumulator:
+    """
+    Histograms of many variables and regions accumulated over successive chunks of data,
+    e.g. time chunks or streamed slices, so that long records are processed in bounded memory.
+    """
+
+    def __init__(
+        self,
+        range: tuple,
+        bins: int = 10,
+        units: str | dict | None = None,
+        weighted: bool = True,
+        regions: dict | None = None,
+        loglevel: str = "WARNING",
+    ):
+        """
+        Args:
+            range (tuple):             The lower and upper range of the bins, fixed so that chunks can be merged.
+            bins (int, optional):      The number of bins, or their edges. Defaults to 10.
+            units (str or dict, optional): Convert data to these units, also per variable. Defaults to None.
+            weighted (bool, optional): Use latitudinal weights for the histogram. Defaults to True.
+            regions (dict, optional):  Regions where to compute the histograms, see histogram(). Defaults to None.
+            loglevel (str, optional):  Logging level. Defaults to 'WARNING'.
+        """
+        self.edges = bin_edges(bins, range)
+        self.units = units
+        self.weighted = weighted
+        self.regions = regions
+        self.loglevel = loglevel
+        self.logger = log_configure(log_level=loglevel, log_name="HistogramAccumulator")
+
+        # counts, number of values and attributes of each variable, and names of the regions
+        self.names = None
+        self.counts = {}
+        self.sizes = {}
+        self.attrs = {}
+
+    def update(self, data: xr.DataArray | xr.Dataset, weights: xr.DataArray | None = None):
+        """
+        Add a chunk of data. All the variables and regions are computed together, in a single pass.
+
+        Args:
+            data (xr.DataArray or xr.Dataset): The chunk of data.
+            weights (xr.DataArray, optional): Weights broadcastable against the data. Defaults to None.
+        """
+        if isinstance(data, xr.DataArray):
+            data = data.to_dataset(name=data.name if data.name is not None else "histogram")
+
+        lazy = {}
+        for var in data.data_vars:
+            array = data[var]
+            units = self.units.get(var) if isinstance(self.units, dict) else self.units
+            if units is not None:
+                array = convert_data_units(array, var=var, units=units, loglevel=self.loglevel)
+            var_weights = histogram_weights(array, weights=weights, weighted=self.weighted, logger=self.logger)
+            self.names, masks = _region_masks(array, self.regions)
+            lazy[var] = _counts(array, self.edges, weights=var_weights, masks=masks, use_dask=isinstance(array.data, da.Array))
+            self.sizes[var] = self.sizes.get(var, 0) + array.size
+            self.attrs.setdefault(var, array.attrs)
+
+        (computed,) = dask.compute(lazy)
+        for var, counts in computed.items():
+            self.counts[var] = self.counts[var] + counts if var in self.counts else counts
+        self.logger.debug("Accumulated histograms of %s", list(computed))
+
+    def merge(self, other: "HistogramAccumulator"):
+        """
+        Add the histograms accumulated by another accumulator with the same bins, e.g. on another process.
+
+        Args:
+            other (HistogramAccumulator): The other accumulator.
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms with different bins cannot be merged.")
+        for var, counts in other.counts.items():
+            self.counts[var] = self.counts[var] + counts if var in self.counts else counts
+            self.sizes[var] = self.sizes.get(var, 0) + other.sizes[var]
+            self.attrs.setdefault(var, other.attrs[var])
+        self.names = self.names or other.names
+
+    def result(self, density: bool = False) -> xr.Dataset:
+        """
+        The accumulated histograms.
+
+        Args:
+            density (bool, optional): Return probability density functions. Defaults to False.
+
+        Returns:
+            xr.Dataset: The histogram of each variable, as returned by histogram().
+        """
+        histograms = {}
+        for var, counts in self.counts.items():
+            hist = format_histogram(
+                counts if self.names else counts[0],
+                self.edges,
+                self.attrs[var],
+                self.sizes[var],
+                density=density,
+                regions=self.names,
+            )
+            histograms[var] = hist.rename(var)
+        return xr.Dataset(histograms)
+
+
+def bin_edges(bins, range):
+    """Edges of the bins, from their number and range or from the edges themselves."""
+    if np.ndim(bins) == 1:
+        return np.asarray(bins, dtype="float64")
+    if range is None:
+        raise ValueError("A range is required with a number of bins.")
+    return np.linspace(range[0], range[1], bins + 1)
+
+
+def histogram_weights(data, weights=None, weighted=True, logger=None):
+    """
+    Weights of the histogram, broadcastable against the data but not broadcast:
+    latitudinal weights are computed on the latitude coordinate only.
+    """
+    if weights is not None:
+        if not set(weights.dims) <= set(data.dims):
+            raise ValueError("Weights must have the same size as the data.")
+        return weights
+    if weighted:
+        if logger:
+            logger.debug("Using latitudinal weights")
+        if "lat" not in data.coords:
+            raise ValueError("DataArray must have a 'lat' coordinate for weighted histogram.")
+        return np.cos(np.radians(data["lat"].reset_coords(drop=True)))
+    return None
+
+
+def _region_masks(data, regions):
+    """
+    Boolean masks of the regions, on the horizontal coordinates only.
+
+    Returns:
+        tuple: The names of the regions (None if no region is given) and the masks.
+    """
+    if not regions:
+        return None, []
+    masks = []
+    for name, region in regions.items():
+        if isinstance(region, xr.DataArray):
+            masks.append(region.astype(bool))
+            continue
+        mask = xr.DataArray(True)
+        for coord in ["lat", "lon"]:
+            if coord not in region:
+                continue
+            if coord not in data.coords:
+                raise ValueError(f"DataArray must have a '{coord}' coordinate for region {name}.")
+            low, high = region[coord]
+            values = data[coord].reset_coords(drop=True)
+            # longitude boxes can cross the dateline
+            inside = (values >= low) | (values <= high) if low > high else (values >= low) & (values <= high)
+            mask = mask & inside
+        masks.append(mask)
+    return list(regions), masks
+
+
+def expand_like(array, data):
+    """Array with the dimensions of the data, of size one where it is not defined."""
+    if not set(array.dims) <= set(data.dims):
+        raise ValueError(f"Dimensions {array.dims} are not dimensions of the data {data.dims}")
+    array = array.expand_dims([dim for dim in data.dims if dim not in array.dims])
+    return array.transpose(*data.dims).data
+
+
+def bin_index(values, edges):
+    """
+    The bin of each value, the last edge included as in numpy, and len(edges) - 1 outside the bins.
+    Uniform bins are found arithmetically, others by bisection.
+    """
+    nbins = len(edges) - 1
+    widths = np.diff(edges)
+    if np.allclose(widths, widths[0]):
+        inside = (values >= edges[0]) & (values <= edges[-1])
+        with np.errstate(invalid="ignore"):
+            index = np.floor((values - edges[0]) * (nbins / (edges[-1] - edges[0])))
+        index = np.where(inside, np.clip(index, 0, nbins - 1), nbins).astype(np.intp)
+        # rounding errors next to the edges are corrected as numpy does
+        np.subtract(index, 1, out=index, where=inside & (values < edges[index]))
+        np.add(index, 1, out=index, where=inside & (index < nbins - 1) & (values >= edges[np.minimum(index + 1, nbins)]))
+        return index
+    index = np.searchsorted(edges, values, side="right") - 1
+    index[values == edges[-1]] = nbins - 1
+    index[(index < 0) | (index >= nbins)] = nbins
+    return index
+
+
+def _histogram_block(values, *arrays, edges, weighted):
+    """
+    Counts of a block of data in the bins, for each region mask.
+    Weights and masks are broadcast on the block only, never on the whole data.
+    """
+    nbins = len(edges) - 1
+    weights = np.broadcast_to(arrays[0], values.shape).ravel() if weighted else None
+    masks = arrays[1:] if weighted else arrays
+
+    # values outside the bins are counted in an extra bin, then dropped
+    index = bin_index(values, edges).ravel()
+    counts = np.zeros((max(len(masks), 1), nbins), dtype="float64" if weighted else "int64")
+    for i, mask in enumerate(masks or [None]):
+        if mask is None:
+            counts[i] = np.bincount(index, weights=weights, minlength=nbins + 1)[:nbins]
+            continue
+        selected = np.broadcast_to(mask, values.shape).ravel()
+        block_weights = weights[selected] if weighted else None
+        counts[i] = np.bincount(index[selected], weights=block_weights, minlength=nbins + 1)[:nbins]
+    return counts.reshape((1,) * values.ndim + counts.shape)
+
+
+def _counts(data, edges, weights=None, masks=None, use_dask=True):
+    """
+    Counts of the data in the bins, for each region mask (a single row without masks).
+
+    Returns:
+        np.ndarray or da.Array: The counts, with shape (regions, bins), lazy with dask.
+    """
+    masks = masks or []
+    weighted = weights is not None
+    arrays = ([expand_like(weights, data)] if weighted else []) + [expand_like(mask, data) for mask in masks]
+    nrows = max(len(masks), 1)
+    nbins = len(edges) - 1
+    dtype = "float64" if weighted else "int64"
+
+    if not use_dask:
+        values = np.asarray(data.values)
+        arrays = [np.asarray(array) for array in arrays]
+        return _histogram_block(values, *arrays, edges=edges, weighted=weighted)[(0,) * values.ndim]
+
+    values = data.data if isinstance(data.data, da.Array) else da.from_array(data.data)
+    ndim = values.ndim
+    # weights and masks are small arrays, chunked as the data where defined and broadcast block by block
+    arrays = [
+        da.asarray(array).rechunk(tuple(c if n > 1 else (1,) for c, n in zip(values.chunks, np.shape(array))))
+        for array in arrays
+    ]
+    blocks = da.map_blocks(
+        _histogram_block,
+        values,
+        *arrays,
+        edges=edges,
+        weighted=weighted,
+        new_axis=[ndim, ndim + 1],
+        chunks=tuple((1,) * n for n in values.numblocks) + ((nrows,), (nbins,)),
+        dtype=dtype,
+        meta=np.empty((0,) * (ndim + 2), dtype=dtype),
+    )
+    return blocks.sum(axis=tuple(builtins.range(ndim)))
+
+
+def format_histogram(hist, edges, attrs, size_of_the_data, density=False, regions=None):
+    """DataArray of the histogram, with the bins centers and widths, and the metadata of the data."""
+    if density:
+        widths = np.diff(edges)
+        hist = hist / (hist.sum(axis=-1, keepdims=True) * widths)
+
     center_of_bin = [0.5 * (edges[i] + edges[i + 1]) for i in builtins.range(len(edges) - 1)]
     width_table = [edges[i + 1] - edges[i] for i in builtins.range(len(edges) - 1)]
 
-    counts_per_bin = xr.DataArray(hist, coords=[center_of_bin], dims=["center_of_bin"])
+    if regions is not None:
+        counts_per_bin = xr.DataArray(hist, coords=[regions, center_of_bin], dims=["region", "center_of_bin"])
+    else:
+        counts_per_bin = xr.DataArray(hist, coords=[center_of_bin], dims=["center_of_bin"])
     counts_per_bin = counts_per_bin.assign_coords(width=("center_of_bin", width_table))
 
-    counts_per_bin.attrs = data.attrs
+    counts_per_bin.attrs = dict(attrs)
 
-    counts_per_bin.center_of_bin.attrs["units"] = data.units
+    counts_per_bin.center_of_bin.attrs["units"] = attrs.get("units")
 
     counts_per_bin.attrs["size_of_the_data"] = size_of_the_data
 
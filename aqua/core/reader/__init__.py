@@ -1,7 +1,8 @@
 """Reader module."""
 from .reader import Reader
+from .reader_pool import ReaderPool, get_reader, reader_pool
 from .streaming import Streaming
 from .trender import Trender
 from .catalog import show_catalog_content
 
-__all__ = ["Reader", "Streaming", "Trender", "show_catalog_content"]
+__all__ = ["Reader", "ReaderPool", "get_reader", "reader_pool", "Streaming", "Trender", "show_catalog_content"]
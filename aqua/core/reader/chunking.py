@@ -0,0 +1,263 @@
+"""
+Automatic dask chunking for data access.
+
+Time and vertical chunks are chosen from the size and dtype of the variables,
+the output frequency and the statistic to be computed, so that each chunk is close
+to a target size (dask ``array.chunk-size``, 128MiB by default) and a few of them
+fit in the memory of a single worker thread.
+"""
+
+import os
+
+import dask
+import numpy as np
+import pandas as pd
+import psutil
+from dask.utils import format_bytes, parse_bytes
+from pandas.tseries.frequencies import to_offset
+from smmregrid import GridInspector
+
+from aqua.core.logger import log_configure
+from aqua.core.timstat.grouped import group_codes
+from aqua.core.util import frequency_string_to_pandas
+
+# Fraction of the memory of a worker thread a chunk can use: input, output
+# and intermediate arrays of a task have to fit together
+MEMORY_FRACTION = 0.25
+# Statistics holding more intermediate arrays per chunk than a mean
+STAT_MEMORY_FACTOR = {"std": 2, "histogram": 2}
+# Time chunking of GSV sources, with their nominal duration
+GSV_TIME_CHUNKS = {
+    "h": pd.Timedelta("1h"),
+    "3h": pd.Timedelta("3h"),
+    "6h": pd.Timedelta("6h"),
+    "D": pd.Timedelta("1D"),
+    "5D": pd.Timedelta("5D"),
+    "W": pd.Timedelta("7D"),
+    "M": pd.Timedelta("31D"),
+    "Y": pd.Timedelta("366D"),
+}
+
+
+def worker_memory():
+    """
+    Memory available to a single dask thread, in bytes. The memory limit of the workers
+    is used if a dask client is active, the available system memory otherwise.
+    """
+    try:
+        from distributed import get_client
+
+        workers = get_client().scheduler_info()["workers"].values()
+        limits = [w["memory_limit"] / max(w.get("nthreads", 1), 1) for w in workers if w.get("memory_limit")]
+        if limits:
+            return min(limits)
+    except (ImportError, ValueError):
+        pass
+
+    threads = 1 if dask.config.get("scheduler", None) in ["synchronous", "sync", "single-threaded"] else os.cpu_count()
+    return psutil.virtual_memory().available / (threads or 1)
+
+
+def time_step(data):
+    """
+    Median time step of a dataset.
+
+    Args:
+        data (xr.Dataset or xr.DataArray): the data, with a time coordinate
+
+    Returns:
+        pd.Timedelta: the time step, None if it cannot be inferred
+    """
+    if "time" not in data.coords or data["time"].size < 2:
+        return None
+    # cftime dates are subtracted as objects, giving datetime.timedelta
+    deltas = pd.to_timedelta(np.diff(data["time"].values))
+    return deltas.median()
+
+
+def _is_calendar(freq):
+    """True if an AQUA frequency has no fixed length, e.g. months, seasons or years"""
+    if freq is None:
+        return False
+    try:
+        to_offset(frequency_string_to_pandas(freq)).nanos
+    except ValueError:
+        return True
+    return False
+
+
+def _period_steps(freq, timestep):
+    """
+    Number of time steps in a period of an AQUA frequency, or in a day
+    for calendar frequencies (months, seasons, years) of sub-daily data.
+    None if chunks cannot be aligned to the frequency.
+    """
+    day = pd.Timedelta("1D")
+    period = None
+    if freq is not None:
+        try:
+            period = pd.Timedelta(to_offset(frequency_string_to_pandas(freq)).nanos)
+        except ValueError:  # calendar offsets have no fixed length
+            period = day
+    elif timestep < day:
+        period = day
+
+    if period is None or period <= timestep:
+        return None
+    return int(round(period / timestep))
+
+
+def _align(steps, period_steps):
+    """Align a number of time steps to multiples or divisors of a period"""
+    if not period_steps:
+        return steps
+    if steps >= period_steps:
+        return steps // period_steps * period_steps
+    return max(n for n in range(1, steps + 1) if period_steps % n == 0)
+
+
+def calendar_chunks(time, freq, steps):
+    """
+    Time chunks aligned to the periods of a calendar frequency (months, seasons, years),
+    from the time index as the grouped time statistics do. Whole periods are packed in chunks
+    of at most ``steps`` time steps, and longer periods are split in chunks of ``steps``
+    (aligned to days for sub-daily data) starting from the beginning of the period.
+
+    Args:
+        time (xr.DataArray): the time coordinate
+        freq (str): the output frequency, in AQUA or pandas style
+        steps (int): the largest number of time steps in a chunk
+
+    Returns:
+        tuple: the size of each time chunk, None if the time axis cannot be grouped (e.g. non-standard calendars)
+    """
+    timestep = time_step(time)
+    grouping = group_codes(time, frequency_string_to_pandas(freq))
+    if timestep is None or grouping is None:
+        return None
+    counts = np.bincount(grouping[0])
+    piece = _align(steps, _period_steps(freq, timestep))
+
+    chunks, current = [], 0
+    for count in counts[counts > 0]:
+        if current + count > steps and current:
+            chunks.append(current)
+            current = 0
+        if count > steps:
+            chunks += [piece] * (count // piece) + ([count % piece] if count % piece else [])
+        else:
+            current += count
+    if current:
+        chunks.append(current)
+    return tuple(int(chunk) for chunk in chunks)
+
+
+def autotune_chunks(data, freq=None, stat=None, chunk_bytes=None, memory=None, loglevel="WARNING"):
+    """
+    Choose the time and vertical chunks of a dataset.
+
+    All the levels are kept in a chunk if they fit in the target size, otherwise the levels are split.
+    The remaining budget goes to the time dimension, aligned to the output frequency if provided,
+    or to days for sub-daily data, so that chunks do not straddle the output periods.
+    Calendar frequencies (months, seasons, years) give time chunks of different sizes, see ``calendar_chunks()``.
+
+    Args:
+        data (xr.Dataset): the data, as retrieved without chunking. Only its metadata are used.
+        freq (str, optional): the output frequency of the statistic, in AQUA or pandas style.
+        stat (str, optional): the statistic to be computed, e.g. 'mean', 'std' or 'histogram'.
+        chunk_bytes (int or str, optional): the target chunk size, e.g. '256MiB'.
+                                            Defaults to the dask 'array.chunk-size' configuration.
+        memory (int, optional): the memory available to a worker thread in bytes. Defaults to ``worker_memory()``.
+        loglevel (str, optional): the log level. Defaults to 'WARNING'.
+
+    Returns:
+        dict: the chunks of each dimension, with -1 for unchunked dimensions, and the
+              'time_step' (pd.Timedelta), 'time_freq' (the calendar frequency the time chunks
+              are aligned to, or None) and 'vertical_dims' (list) used to choose them.
+              None if the data have no time dimension.
+    """
+    logger = log_configure(loglevel, "autotune_chunks")
+
+    if "time" not in data.dims:
+        logger.warning("No time dimension found, cannot autotune chunks")
+        return None
+
+    target = parse_bytes(chunk_bytes or dask.config.get("array.chunk-size"))
+    memory = memory or worker_memory()
+    target = int(min(target, memory * MEMORY_FRACTION / STAT_MEMORY_FACTOR.get(stat, 1)))
+
+    gridtypes = GridInspector(data, loglevel=loglevel).get_gridtype()
+    horizontal_dims = GridInspector.get_gridtype_attr(gridtypes, "horizontal_dims")
+
+    # the chunks are sized on the largest variable
+    variables = list(data.data_vars.values()) if hasattr(data, "data_vars") else [data]
+    largest = max(variables, key=lambda x: x.nbytes / x.sizes.get("time", 1))
+    if not horizontal_dims:
+        # without a known grid no dimension is safe to be split
+        logger.debug("No horizontal dimensions found, chunking only the time dimension")
+        horizontal_dims = list(largest.dims)
+    vertical_dims = [dim for dim in largest.dims if dim != "time" and dim not in horizontal_dims]
+    level_bytes = largest.dtype.itemsize * int(
+        np.prod([largest.sizes[dim] for dim in largest.dims if dim != "time" and dim not in vertical_dims])
+    )
+
+    # the largest number of levels per vertical dimension fitting in the target
+    nlevels = max([largest.sizes[dim] for dim in vertical_dims], default=1)
+    while nlevels > 1 and level_bytes * np.prod([min(largest.sizes[dim], nlevels) for dim in vertical_dims]) > target:
+        nlevels -= 1
+    step_bytes = level_bytes * int(np.prod([min(largest.sizes[dim], nlevels) for dim in vertical_dims]))
+
+    timestep = time_step(data)
+    steps = min(max(1, target // step_bytes), data.sizes["time"])
+    if timestep is not None:
+        steps = _align(steps, _period_steps(freq, timestep))
+
+    chunks = {dim: -1 for dim in data.dims}
+    chunks["time"] = int(steps)
+    time_freq = None
+    if timestep is not None and _is_calendar(freq):
+        aligned = calendar_chunks(data["time"], freq, int(steps))
+        if aligned:
+            chunks["time"], time_freq = aligned, freq
+    for dim in vertical_dims:
+        chunks[dim] = -1 if nlevels >= largest.sizes[dim] else nlevels
+
+    logger.info(
+        "Autotuned chunks: %s, %s per chunk of %s (target %s, %s per worker thread)",
+        chunks,
+        format_bytes(steps * step_bytes),
+        largest.name,
+        format_bytes(target),
+        format_bytes(memory),
+    )
+    return {**chunks, "time_step": timestep, "time_freq": time_freq, "vertical_dims": vertical_dims}
+
+
+def gsv_chunks(chunks, freq=None):
+    """
+    Convert the output of ``autotune_chunks`` to the chunks of a GSV source:
+    the longest GSV time chunking not exceeding the time span of the chunk, and
+    the number of levels of the vertical chunks.
+
+    Args:
+        chunks (dict): the chunks from ``autotune_chunks``
+        freq (str, optional): the output frequency. Chunking by 5 days or weeks is
+                              excluded for calendar frequencies, since it is not aligned.
+
+    Returns:
+        dict: the 'time' and 'vertical' chunking
+    """
+    timestep = chunks["time_step"]
+    vertical = [chunks[dim] for dim in chunks["vertical_dims"] if chunks[dim] != -1]
+    gsv = {"time": "S", "vertical": vertical[0] if vertical else None}
+    if timestep is None:
+        return gsv
+
+    calendar = _is_calendar(freq)
+    span = max(np.atleast_1d(chunks["time"])) * timestep
+    for name, duration in GSV_TIME_CHUNKS.items():
+        if calendar and name in ["5D", "W"]:
+            continue
+        if timestep < duration <= span:
+            gsv["time"] = name
+    return gsv
@@ -0,0 +1,153 @@
+"""Persistent time index of the files of a NetCDF source"""
+
+import json
+import os
+
+import cftime
+import pandas as pd
+import xarray as xr
+
+from aqua.core.lock import SafeFileLock
+from aqua.core.logger import log_configure
+from aqua.core.util import to_list
+
+FILE_INDEX_VERSION = 1
+
+
+class FileIndex:
+    """
+    Index of the files of a NetCDF source, storing for each file its time range,
+    variables and chunk layout. The index is persisted as a JSON file and refreshed
+    incrementally: only new files or files with a changed modification time or size are opened.
+    """
+
+    def __init__(self, index_file, loglevel="WARNING"):
+        """
+        Args:
+            index_file (str): path of the JSON file where the index is stored
+            loglevel (str): the log level. Default is 'WARNING'.
+        """
+        self.index_file = index_file
+        self.loglevel = loglevel
+        self.logger = log_configure(log_level=loglevel, log_name="FileIndex")
+        self.files = []
+        self.entries = self._load()
+
+    def _load(self):
+        """Load the index from disk, if available and compatible"""
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Cannot read file index %s, rebuilding it: %s", self.index_file, e)
+            return {}
+        if index.get("version") != FILE_INDEX_VERSION:
+            self.logger.info("File index %s has an old version, rebuilding it", self.index_file)
+            return {}
+        return index.get("files", {})
+
+    def _save(self):
+        """
+        Write the index to disk, atomically and under a lock.
+        If the index cannot be written (e.g. read-only configuration directory), it is kept in memory only.
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_file)), exist_ok=True)
+            with SafeFileLock(self.index_file + ".lock", loglevel=self.loglevel):
+                tmpfile = f"{self.index_file}.{os.getpid()}.tmp"
+                with open(tmpfile, "w", encoding="utf-8") as f:
+                    json.dump({"version": FILE_INDEX_VERSION, "files": self.entries}, f)
+                os.replace(tmpfile, self.index_file)
+        except OSError as e:
+            self.logger.warning("Cannot write file index %s, keeping it in memory only: %s", self.index_file, e)
+
+    def update(self, files):
+        """
+        Update the index with a list of files: new and modified files are scanned,
+        files not in the list are dropped.
+
+        Args:
+            files (list): the list of files of the source
+        """
+        self.files = to_list(files)
+        changed = False
+
+        for file in self.files:
+            stat = os.stat(file)
+            entry = self.entries.get(file)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                continue
+            self.entries[file] = {"mtime": stat.st_mtime, "size": stat.st_size, **self._scan(file)}
+            changed = True
+
+        removed = set(self.entries) - set(self.files)
+        for file in removed:
+            del self.entries[file]
+
+        if changed or removed:
+            self.logger.info("Updating file index %s (%d files)", self.index_file, len(self.files))
+            self._save()
+
+    @staticmethod
+    def _scan(file):
+        """
+        Read the time range, variables and chunk layout of a file.
+        Times are decoded with cftime and stored as ISO strings, to support any calendar and date range.
+        """
+        with xr.open_dataset(file, decode_times=False) as ds:
+            variables = list(ds.data_vars)
+            chunks = {}
+            for var in variables:
+                chunksizes = ds[var].encoding.get("chunksizes")
+                chunks[var] = [int(size) for size in chunksizes] if chunksizes else None
+            # files without a decodable time axis are always selected
+            start = end = None
+            time = ds.variables.get("time")
+            if time is not None and time.size > 0 and "since" in time.attrs.get("units", ""):
+                values = cftime.num2date(
+                    [time.values.min(), time.values.max()],
+                    time.attrs["units"],
+                    calendar=time.attrs.get("calendar", "standard"),
+                )
+                start, end = (value.isoformat() for value in values)
+
+        return {"start": start, "end": end, "variables": variables, "chunks": chunks}
+
+    def select(self, startdate=None, enddate=None, var=None):
+        """
+        Select the files intersecting a time range and containing at least one of the variables.
+        Files without time information are always selected.
+
+        Args:
+            startdate (str, optional): the starting date of the selection
+            enddate (str, optional): the ending date of the selection
+            var (str, list, optional): the variables to be found. A list of alternatives
+                                       (as provided by the fixer) can be used as element.
+
+        Returns:
+            list: the selected files, in the original order
+        """
+        # dates are expanded to their resolution, e.g. '2020-01' covers the whole month
+        start = pd.Period(startdate).start_time.isoformat() if startdate else None
+        end = pd.Period(enddate).end_time.isoformat() if enddate else None
+
+        files = []
+        for file in self.files:
+            entry = self.entries[file]
+            if entry["start"] is not None:
+                if end and entry["start"] > end:
+                    continue
+                if start and entry["end"] < start:
+                    continue
+            files.append(file)
+
+        if var:
+            names = {name for element in to_list(var) for name in to_list(element)}
+            with_var = [file for file in files if names & set(self.entries[file]["variables"])]
+            # if no file has the variables, let the reader complain about it
+            if with_var:
+                files = with_var
+
+        return files
@@ -0,0 +1,205 @@
+"""
+Run-scoped cache of time statistics shared by the Readers of an AQUA analysis.
+Products are stored in Zarr and indexed by the signature of the data they are computed from,
+so that Reader.timstat can return them when called on the same data.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import xarray as xr
+from dask.base import tokenize
+
+from aqua.core.logger import log_configure
+from aqua.core.util import dump_yaml, frequency_string_to_pandas
+
+# environment variable pointing the Readers to the cache of the running analysis
+CACHE_ENV = "AQUA_ANALYSIS_CACHE"
+INDEX_FILE = "index.json"
+CATALOG_FILE = "catalog.yaml"
+
+# instances opened in this process, by path
+_caches = {}
+
+
+class ProductCache:
+    """Zarr store of precomputed time statistics with an index and an intake catalog."""
+
+    def __init__(self, path, loglevel="WARNING"):
+        """
+        Args:
+            path (str): Folder of the cache.
+            loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+        """
+        self.path = os.path.abspath(path)
+        self.logger = log_configure(log_level=loglevel, log_name="ProductCache")
+        self._index = None
+        self._index_mtime = None
+
+    @classmethod
+    def from_environ(cls, loglevel="WARNING"):
+        """The cache of the running analysis, None if no cache is set in the environment."""
+        path = os.environ.get(CACHE_ENV)
+        if not path or not os.path.exists(os.path.join(path, INDEX_FILE)):
+            return None
+        if path not in _caches:
+            _caches[path] = cls(path, loglevel=loglevel)
+        return _caches[path]
+
+    @property
+    def index(self):
+        """The cache index, reloaded if modified."""
+        filename = os.path.join(self.path, INDEX_FILE)
+        mtime = os.path.getmtime(filename) if os.path.exists(filename) else None
+        if mtime != self._index_mtime:
+            with open(filename, encoding="utf-8") as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index if self._index is not None else {}
+
+    @staticmethod
+    def signature(data, stat, freq=None, **options):
+        """
+        Signature of a variable and of the statistic computed on it.
+        Besides the AQUA attributes (model, exp, source, regrid...), the shape and the time range,
+        it includes the token of the data (the dask graph, or the values of in-memory data),
+        so that data modified after the retrieve never match.
+
+        Args:
+            data (xr.DataArray): The input variable.
+            stat (str): The statistic.
+            freq (str, optional): The frequency of the statistic.
+            **options: Other options of the statistic.
+
+        Returns:
+            dict: The signature.
+        """
+        time = data["time"].values if "time" in data.coords else []
+        return {
+            "var": data.name,
+            "attrs": {key: str(value) for key, value in data.attrs.items() if key.startswith("AQUA_")},
+            "units": str(data.attrs.get("units")),
+            "dims": list(data.dims),
+            "shape": list(data.shape),
+            "dtype": str(data.dtype),
+            "time": [str(time[0]), str(time[-1])] if len(time) else None,
+            "token": tokenize(data.data),
+            "stat": stat,
+            "freq": frequency_string_to_pandas(freq) if freq else None,
+            "options": {key: str(value) for key, value in sorted(options.items())},
+        }
+
+    @staticmethod
+    def key(signature):
+        """Key of a signature in the index."""
+        return hashlib.sha1(json.dumps(signature, sort_keys=True).encode()).hexdigest()
+
+    def store(self, data, product, stat, freq=None, **options):
+        """
+        Store the product computed from each variable of the data. The product is computed here.
+
+        Args:
+            data (xr.Dataset or xr.DataArray): The input data of the statistic.
+            product (xr.Dataset or xr.DataArray): The statistic computed on the data.
+            stat (str): The statistic.
+            freq (str, optional): The frequency of the statistic.
+            **options: Other options of the statistic.
+
+        Returns:
+            list: The keys of the stored variables.
+        """
+        data = data.to_dataset() if isinstance(data, xr.DataArray) else data
+        product = product.to_dataset() if isinstance(product, xr.DataArray) else product
+
+        os.makedirs(self.path, exist_ok=True)
+        index = dict(self.index) if os.path.exists(os.path.join(self.path, INDEX_FILE)) else {}
+        keys = []
+        for var in data.data_vars:
+            signature = self.signature(data[var], stat, freq=freq, **options)
+            key = self.key(signature)
+            store = os.path.join(self.path, f"{key}.zarr")
+            self.logger.info("Caching %s %s of %s in %s", signature["freq"], stat, var, store)
+            product[[var]].to_zarr(store, mode="w")
+            index[key] = {**signature, "store": store}
+            keys.append(key)
+
+        self._write_index(index)
+        return keys
+
+    def lookup(self, data, stat, freq=None, **options):
+        """
+        Look up the statistic of the data in the cache.
+
+        Args:
+            data (xr.Dataset or xr.DataArray): The input data of the statistic.
+            stat (str): The statistic.
+            freq (str, optional): The frequency of the statistic.
+            **options: Other options of the statistic.
+
+        Returns:
+            xr.Dataset or xr.DataArray: The cached statistic, None if any of the variables is not cached.
+        """
+        index = self.index
+        if not index:
+            return None
+        arrays = [data] if isinstance(data, xr.DataArray) else [data[var] for var in data.data_vars]
+        if not arrays or any(array.name is None for array in arrays):
+            return None
+
+        products = []
+        for array in arrays:
+            entry = index.get(self.key(self.signature(array, stat, freq=freq, **options)))
+            if entry is None or not os.path.exists(entry["store"]):
+                return None
+            products.append(xr.open_zarr(entry["store"])[array.name])
+
+        self.logger.info("Using cached %s %s of %s", freq, stat, [array.name for array in arrays])
+        if isinstance(data, xr.DataArray):
+            return products[0]
+        return xr.merge(products, combine_attrs="override").assign_attrs(data.attrs)
+
+    def write_catalog(self):
+        """
+        Write an intake catalog with a zarr source for each cached variable, e.g. '2t-r100-MS-mean'.
+
+        Returns:
+            str: The catalog file.
+        """
+        sources = {}
+        for key, entry in sorted(self.index.items()):
+            attrs = entry["attrs"]
+            grid = attrs.get("AQUA_target_grid", "native") if attrs.get("AQUA_regridded") else "native"
+            name = "-".join(str(item) for item in [entry["var"], grid, entry["freq"], entry["stat"]] if item)
+            if name in sources:
+                name = f"{name}-{key[:8]}"
+            description = (
+                f"AQUA analysis cache: {entry['freq']} {entry['stat']} of {entry['var']}"
+                f" from {attrs.get('AQUA_model')} {attrs.get('AQUA_exp')} {attrs.get('AQUA_source')}"
+            )
+            if entry["time"]:
+                description += f", {entry['time'][0]} to {entry['time'][1]}"
+            sources[name] = {
+                "driver": "zarr",
+                "description": description,
+                "args": {"urlpath": entry["store"]},
+                "metadata": {"source_grid_name": False},
+            }
+        filename = os.path.join(self.path, CATALOG_FILE)
+        dump_yaml(filename, {"sources": sources})
+        return filename
+
+    def clear(self):
+        """Remove the cache."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        _caches.pop(self.path, None)
+        self._index, self._index_mtime = None, None
+
+    def _write_index(self, index):
+        """Write the index atomically."""
+        filename = os.path.join(self.path, INDEX_FILE)
+        with open(f"{filename}.tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(f"{filename}.tmp", filename)
+        self._index, self._index_mtime = index, os.path.getmtime(filename)
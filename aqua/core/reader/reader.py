@@ -2,6 +2,7 @@
 
 import os
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from glob import glob
 
@@ -15,7 +16,7 @@ from smmregrid import GridInspector
 
 import aqua.core.gsv
 from aqua.core.configurer import ConfigPath
-from aqua.core.data_model import DataModel, counter_reverse_coordinate
+from aqua.core.data_model import DataModel
 from aqua.core.exceptions import NoDataError, NoRegridError
 from aqua.core.fixer import Fixer
 from aqua.core.fldstat import FldStat
@@ -25,7 +26,12 @@ from aqua.core.regridder import Regridder
 from aqua.core.timstat import TimStat
 from aqua.core.util import default_time_unit, files_exist, find_vert_coord, fix_calendar, load_multi_yaml, to_list
 from aqua.core.version import __version__ as aqua_version
+from aqua.core.vertinterp import METHODS as VERTINTERP_METHODS
+from aqua.core.vertinterp import vertinterp
 
+from .chunking import autotune_chunks, calendar_chunks, gsv_chunks
+from .file_index import FileIndex
+from .product_cache import ProductCache
 from .reader_utils import set_attrs
 from .streaming import Streaming
 from .trender import Trender
@@ -64,6 +70,7 @@ class Reader:
         preproc=None,
         convention="eccodes",
         engine="fdb",
+        retrieve_cache=8,
         **kwargs,
     ):
         """
@@ -97,10 +104,14 @@ class Reader:
                                             If it is a dictionary the keys 'time' and 'vertical' are looked for.
                                             Time chunking can be one of S (step), 10M, 15M, 30M, h, 1h, 3h, 6h, D, 5D, W, M, Y.
                                             Vertical chunking is expressed as the number of vertical levels to be used.
+                                            If 'auto', time and vertical chunks are tuned on the data and on the
+                                            available memory at each retrieve, see `autotune_chunks()`.
             preproc (function, optional): a function to be applied to the dataset when retrieved. Defaults to None.
             convention (str, optional): convention to be used for reading data. Defaults to 'eccodes'.
                                         (Only one supported so far)
             engine (str, optional): Engine to be used for GSV retrieval: 'polytope' or 'fdb'. Defaults to 'fdb'.
+            retrieve_cache (int, optional): Number of retrieves kept to serve identical (or subset) requests
+                                            without reading the source again. 0 disables it. Defaults to 8.
 
         Keyword Args:
             zoom (int, optional): HEALPix grid zoom level (e.g. zoom=10 is h1024). Allows for multiple gridname definitions.
@@ -128,6 +139,9 @@ class Reader:
         self.time_correction = False  # extra flag for correction data with cumulation time on monthly timescale
         self.aggregation = aggregation
         self.chunks = chunks
+        self.autochunks = {}  # chunks tuned for each retrieved variable and level with chunks='auto'
+        self.retrieve_cache = retrieve_cache
+        self._retrieved = OrderedDict()  # lazy data of the latest retrieves
 
         # Preprocessing function
         self.preproc = preproc
@@ -145,16 +159,22 @@ class Reader:
             # Export streaming methods TO DO: probably useless
             self.reset_stream = self.streamer.reset
             self.stream = self.streamer.stream
+            self.stream_generator = self.streamer.generator
         self.streaming = streaming
 
         self.startdate = startdate
         self.enddate = enddate
 
         self.sample_data = None  # used to avoid multiple calls of retrieve_plain
+        self.file_index = None  # time index of netcdf files, used by filter_key: time
 
         # define configuration file and paths
         configurer = ConfigPath(catalog=catalog, loglevel=loglevel)
         self.configdir = configurer.configdir
+        # folder of the file indexes used by filter_key: time, configurable in the paths of the main config file
+        self.file_index_dir = (configurer.config_dict.get("paths") or {}).get("file_index") or os.path.join(
+            self.configdir, "file_index"
+        )
         self.machine = configurer.get_machine()
         self.config_file = configurer.config_file
         self.cat, self.catalog_file, self.machine_file = configurer.deliver_intake_catalog(
@@ -286,6 +306,8 @@ class Reader:
                 loglevel=self.loglevel,
             )
 
+        # activate time statistics, available also when regrid and areas are disabled
+        self.timemodule = TimStat(loglevel=self.loglevel)
         self.trender = Trender(loglevel=self.loglevel)
 
     def _configure_regridder(self, machine_paths, regrid=False, areas=False, rebuild=False, reader_kwargs=None):
@@ -371,9 +393,6 @@ class Reader:
             # expose target horizontal dimensions
             self.tgt_space_coord = self.regridder.tgt_horizontal_dims
 
-        # activate time statistics
-        self.timemodule = TimStat(loglevel=self.loglevel)
-
         return areas, regrid
 
     def _fix_datamodel_weights(self, weights, mode="datamodel"):
@@ -423,46 +442,83 @@ class Reader:
         if not enddate:  # In case the streaming startdate is used also for FDB copy it
             enddate = self.enddate
 
-        # get loadvar
-        if var:
-            if isinstance(var, str) or isinstance(var, int):
-                var = str(var).split()  # conversion to list guarantees that a Dataset is produced
-            self.logger.info("Retrieving variables: %s", var)
-            # HACK: to be checked if can be done in a better way
-            loadvar = self.fixer.get_fixer_varname(var) if self.fix else var
-        else:
-            # If we are retrieving from fdb we have to specify the var
-            if isinstance(self.esmcat, aqua.core.gsv.intake_gsv.GSVSource):
-                metadata = self.esmcat.metadata
-                if metadata:
-                    loadvar = metadata.get("variables")
+        # streamed data move forward at each retrieve, they are never reused
+        if self.streaming or not self.retrieve_cache:
+            return self._retrieve(var, level, startdate, enddate, history=history, sample=sample)
 
-                    if loadvar is None:
-                        loadvar = [self.esmcat._request["param"]]  # retrieve var from catalog
-
-                    if not isinstance(loadvar, list):
-                        loadvar = [loadvar]
+        key = self._retrieve_key(var, level, startdate, enddate, history=history, sample=sample)
+        data = self._cached_retrieve(key)
+        if data is None:
+            data = self._retrieve(var, level, startdate, enddate, history=history, sample=sample)
+            self._retrieved[key] = data
+            while len(self._retrieved) > self.retrieve_cache:
+                self._retrieved.popitem(last=False)
 
-                    if sample:
-                        # self.logger.debug("FDB source sample reading, selecting only one variable")
-                        loadvar = [loadvar[0]]
-
-                    self.logger.debug("FDB source: loading variables as %s", loadvar)
-
-            else:
-                loadvar = None
-
-        ffdb = False
+        # shallow copy sharing the lazy arrays, so that changes to the returned data never reach the cache
+        data = data.copy(deep=False)
+        if isinstance(data, xr.Dataset):
+            data.aqua.set_default(self)
+        return data
 
-        # If this is an ESM-intake catalog use first dictionary value,
-        # if isinstance(self.esmcat, intake_esm.core.esm_datastore):
-        #    data = self.reader_esm(self.esmcat, loadvar)
-        # If this is an fdb entry
-        if isinstance(self.esmcat, aqua.core.gsv.intake_gsv.GSVSource):
-            data = self.reader_fdb(self.esmcat, loadvar, startdate, enddate, dask=True, level=level)
-            ffdb = True  # These data have been read from fdb
-        else:
-            data = self.reader_intake(self.esmcat, var, loadvar)
+    def clear_retrieve_cache(self):
+        """Forget the data of the previous retrieves, e.g. after the source files have changed."""
+        self._retrieved.clear()
+
+    def _retrieve_key(self, var, level, startdate, enddate, history=True, sample=False):
+        """
+        Key of a retrieve request in the retrieve cache, including the Reader settings
+        which can be changed temporarily (e.g. by _retrieve_plain).
+        """
+        if var is not None:
+            var = tuple(str(var).split()) if isinstance(var, (str, int)) else tuple(str(v) for v in var)
+        if level is not None:
+            level = tuple(to_list(level))
+        settings = (self.fix, bool(self.datamodel), id(self.preproc), str(self.chunks), str(self.aggregation))
+        return (var, level, str(startdate), str(enddate), history, sample and var is None, settings)
+
+    def _cached_retrieve(self, key):
+        """
+        The data of a previous retrieve serving the request, also as a subset of the variables
+        of a retrieve with the same levels, dates and settings. None if not available.
+        """
+        if key in self._retrieved:
+            self._retrieved.move_to_end(key)
+            self.logger.debug("Using cached retrieve of %s", key[0])
+            return self._retrieved[key]
+
+        var = key[0]
+        if var is None:
+            return None
+        for cached_key in reversed(self._retrieved):
+            cached_var = cached_key[0]
+            if cached_key[1:] != key[1:]:
+                continue
+            if cached_var is not None and not set(var) <= set(cached_var):
+                continue
+            data = self._retrieved[cached_key]
+            if isinstance(data, xr.Dataset) and all(v in data.data_vars for v in var):
+                self._retrieved.move_to_end(cached_key)
+                self.logger.debug("Using variables %s of the cached retrieve of %s", var, cached_var)
+                return data[list(var)]
+        return None
+
+    def _retrieve(self, var=None, level=None, startdate=None, enddate=None, history=True, sample=False):
+        """Perform a data retrieve from the source, see retrieve()."""
+
+        var, loadvar = self._get_loadvar(var, sample=sample)
+
+        chunks = self.chunks
+        if chunks == "auto":
+            chunks = self.autochunks.get(self._autochunks_key(var, level)) or self.autotune_chunks(var=var, level=level)
+
+        # time chunks aligned to calendar periods differ in size: files are read with the
+        # largest of them and rechunked once the time axis is known
+        time_freq = chunks.get("time_freq") if isinstance(chunks, dict) else None
+        if time_freq:
+            chunks = {dim: size for dim, size in chunks.items() if dim != "time_freq"}
+            chunks["time"] = max(chunks["time"])
+
+        data, ffdb = self._read_source(var, loadvar, startdate, enddate, level=level, chunks=chunks)
 
         # if retrieve history is required (disable for retrieve_plain)
         if history:
@@ -492,6 +548,8 @@ class Reader:
             #     data['time'] = data.time.astype(f"datetime64[{default_time_unit}]")
             # Fix the calendar to Gregorian if needed
             data = fix_calendar(data, loglevel=self.loglevel)
+            if time_freq:
+                data = data.chunk(time=calendar_chunks(data["time"], time_freq, chunks["time"]) or chunks["time"])
 
         # log an error if some variables have no units
         if isinstance(data, xr.Dataset) and self.fix:
@@ -530,6 +588,133 @@ class Reader:
 
         return data
 
+    def _get_loadvar(self, var=None, sample=False):
+        """
+        Get the variables to be loaded from the source, i.e. the source names of the fixed variables.
+
+        Arguments:
+            var (str, list): the variable(s) to retrieve. If None, all variables are retrieved.
+            sample (bool): read only one default variable (used only if var is not specified). Defaults to False.
+
+        Returns:
+            tuple: the requested variables as a list and the variables to be loaded
+        """
+        loadvar = None
+        if var:
+            if isinstance(var, str) or isinstance(var, int):
+                var = str(var).split()  # conversion to list guarantees that a Dataset is produced
+            self.logger.info("Retrieving variables: %s", var)
+            # HACK: to be checked if can be done in a better way
+            loadvar = self.fixer.get_fixer_varname(var) if self.fix else var
+        else:
+            # If we are retrieving from fdb we have to specify the var
+            if isinstance(self.esmcat, aqua.core.gsv.intake_gsv.GSVSource):
+                metadata = self.esmcat.metadata
+                if metadata:
+                    loadvar = metadata.get("variables")
+
+                    if loadvar is None:
+                        loadvar = [self.esmcat._request["param"]]  # retrieve var from catalog
+
+                    if not isinstance(loadvar, list):
+                        loadvar = [loadvar]
+
+                    if sample:
+                        # self.logger.debug("FDB source sample reading, selecting only one variable")
+                        loadvar = [loadvar[0]]
+
+                    self.logger.debug("FDB source: loading variables as %s", loadvar)
+
+        return var, loadvar
+
+    def _read_source(self, var, loadvar, startdate=None, enddate=None, level=None, chunks=None):
+        """
+        Read the data from the source, with no fixes applied.
+
+        Returns:
+            tuple: the data and True if they have been read from FDB
+        """
+        # If this is an ESM-intake catalog use first dictionary value,
+        # if isinstance(self.esmcat, intake_esm.core.esm_datastore):
+        #    data = self.reader_esm(self.esmcat, loadvar)
+        # If this is an fdb entry
+        if isinstance(self.esmcat, aqua.core.gsv.intake_gsv.GSVSource):
+            with self._temporary_attrs(chunks=chunks):
+                data = self.reader_fdb(self.esmcat, loadvar, startdate, enddate, dask=True, level=level)
+            return data, True
+
+        # catalog chunks are overridden only by autotuned ones, user chunks are passed to the catalog entry
+        chunks = chunks if self.chunks == "auto" else None
+        data = self.reader_intake(self.esmcat, var, loadvar, startdate=startdate, enddate=enddate, chunks=chunks)
+        return data, False
+
+    def _autochunks_key(self, var=None, level=None):
+        """Key of the autotuned chunks of a variable and level"""
+        return (tuple(to_list(var)) if var else None, str(level) if level is not None else None)
+
+    def autotune_chunks(self, var=None, level=None, freq=None, stat=None, chunk_bytes=None):
+        """
+        Tune the time and vertical chunks of a retrieve on the size of the data and on the
+        available memory, see `aqua.core.reader.chunking.autotune_chunks`. The chunks are
+        stored and used by the following retrieves of the same variables with chunks='auto'.
+
+        Arguments:
+            var (str, list): the variable(s) to retrieve. Defaults to None (all variables).
+            level (list, float, int): Levels to be read. Defaults to None.
+            freq (str, optional): the output frequency of the statistic to be computed, to align time chunks to it.
+            stat (str, optional): the statistic to be computed, e.g. 'mean', 'std' or 'histogram'.
+            chunk_bytes (int or str, optional): the target chunk size, e.g. '256MiB'.
+                                                Defaults to the dask 'array.chunk-size' configuration.
+
+        Returns:
+            dict: the chunks, as 'time' and 'vertical' chunking for GSV sources or the size of
+                  each dimension for the other sources. None if the chunks cannot be tuned.
+        """
+        var, loadvar = self._get_loadvar(var)
+        with self._temporary_attrs(aggregation=None, streaming=False):
+            data, ffdb = self._read_source(var, loadvar, self.startdate, self.enddate, level=level, chunks=None)
+        if not ffdb and level:
+            data = self._select_level(data, level=level)
+
+        chunks = autotune_chunks(data, freq=freq, stat=stat, chunk_bytes=chunk_bytes, loglevel=self.loglevel)
+        if chunks is not None:
+            if ffdb:
+                chunks = gsv_chunks(chunks, freq=freq)
+            else:
+                chunks = {dim: size for dim, size in chunks.items() if dim in data.dims or (dim == "time_freq" and size)}
+            self.logger.info("Using chunks %s for variables %s", chunks, var)
+        self.autochunks[self._autochunks_key(var, level)] = chunks
+        return chunks
+
+    def stream_retrieve(self, var=None, level=None, startdate=None, enddate=None, aggregation=None):
+        """
+        Retrieve the data and yield successive streamed chunks of it.
+        The chunk boundaries are computed only once, so that streaming a long dataset
+        has a constant overhead per chunk. Can be used also if the Reader is not in streaming mode.
+
+        Arguments:
+            var (str, list): the variable(s) to retrieve. Defaults to None. If None, all variables are retrieved.
+            level (list, float, int): Levels to be read, overriding default in catalog source.
+            startdate (str): The starting date for streaming the data (e.g. '2020-02-25'). Defaults to None.
+            enddate (str): The final date for streaming the data (e.g. '2020-03-25'). Defaults to None.
+            aggregation (str): the streaming frequency in pandas style (1M, 7D etc. or 'monthly', 'daily' etc.)
+                               Defaults to the Reader aggregation.
+
+        Yields:
+            A xarray.Dataset for each chunk of the retrieved data.
+        """
+        if self.streaming:
+            streamer = self.streamer
+        else:
+            streamer = Streaming(
+                startdate=self.startdate, enddate=self.enddate, aggregation=self.aggregation, loglevel=self.loglevel
+            )
+
+        with self._temporary_attrs(streaming=False):
+            data = self.retrieve(var=var, level=level, startdate=startdate, enddate=enddate)
+
+        yield from streamer.generator(data, startdate=startdate, enddate=enddate, aggregation=aggregation)
+
     # def _add_index(self, data):
 
     #     """
@@ -617,8 +802,7 @@ class Reader:
         if self.regridder is None:
             raise NoRegridError("regrid has not been initialized in the Reader, cannot perform any regrid.")
 
-        data = counter_reverse_coordinate(data)
-
+        # flipped coordinates are handled by the regridder with permuted weights
         out = self.regridder.regrid(data)
 
         # set regridded attribute to 1 for all vars
@@ -799,7 +983,7 @@ class Reader:
                 self.logger.debug("Adding databridge=%s to the filtered kwargs", databridge)
 
         # HACK: Keep chunking info if present as reader kwarg
-        if self.chunks is not None:
+        if self.chunks is not None and self.chunks != "auto":
             self.logger.warning("Keeping chunks=%s in the filtered kwargs", self.chunks)
             filtered_kwargs["chunks"] = self.chunks
 
@@ -827,20 +1011,26 @@ class Reader:
 
         return filtered_kwargs
 
-    def vertinterp(self, data, levels=None, vert_coord="plev", units=None, method="linear"):
+    def vertinterp(self, data, levels=None, vert_coord="plev", units=None, method="linear", log=False, pressure=None):
         """
-        A basic vertical interpolation based on interp function
-        of xarray within AQUA. Given an xarray object, will interpolate the
+        Vertical interpolation within AQUA. Given an xarray object, will interpolate the
         vertical dimension along the vert_coord.
         If it is a Dataset, only variables with the required vertical
         coordinate will be interpolated.
+        Linear and nearest interpolations use weights computed once for each set of levels,
+        the other methods the interp function of xarray.
 
         Args:
             data (DataArray, Dataset): your dataset
             levels (float, or list): The level you want to interpolate the vertical coordinate
             units (str, optional, ): The units of your vertical axis. Default 'Pa'
             vert_coord (str, optional): The name of the vertical coordinate. Default 'plev'
-            method (str, optional): The type of interpolation method supported by interp()
+            method (str, optional): 'linear', 'nearest' or another method supported by interp()
+            log (bool, optional): Interpolate linearly in the logarithm of the levels (e.g. of pressure).
+                                  Default False
+            pressure (DataArray, optional): The levels of each column along vert_coord, e.g. the pressure
+                                            of hybrid levels, in the units of the target levels.
+                                            Default None, using the vert_coord values
 
         Return
             A DataArray or a Dataset with the new interpolated vertical dimension
@@ -853,42 +1043,57 @@ class Reader:
         if vert_coord not in data.coords:
             raise KeyError(f"The vert_coord={vert_coord} is not in the data!")
 
+        if (log or pressure is not None) and method not in VERTINTERP_METHODS:
+            raise ValueError(f"Log and column levels interpolation are supported only with {VERTINTERP_METHODS}")
+
         # if you not specified the units, guessing from the data
-        if units is None:
+        if units is None and pressure is None:
             if hasattr(data[vert_coord], "units"):
                 self.logger.warning("Units of vert_coord=%s has not defined, reading from the data", vert_coord)
                 units = data[vert_coord].units
             else:
                 raise ValueError("Original dataset has not unit on the vertical axis, failing!")
 
+        interp_kwargs = {
+            "levels": levels,
+            "units": units,
+            "vert_coord": vert_coord,
+            "method": method,
+            "log": log,
+            "pressure": pressure,
+        }
         if isinstance(data, xr.DataArray):
-            final = self._vertinterp(data=data, levels=levels, units=units, vert_coord=vert_coord, method=method)
+            final = self._vertinterp(data=data, **interp_kwargs)
 
         elif isinstance(data, xr.Dataset):
             selected_vars = [da for da in data.data_vars if vert_coord in data[da].coords]
-            final = data[selected_vars].map(
-                self._vertinterp, keep_attrs=True, levels=levels, units=units, vert_coord=vert_coord, method=method
-            )
+            final = data[selected_vars].map(self._vertinterp, keep_attrs=True, **interp_kwargs)
         else:
             raise ValueError("This is not an xarray object!")
 
-        final = log_history(
-            final,
-            f"Interpolated from original levels {data[vert_coord].values} "
-            f"{data[vert_coord].units} to level {levels} using {method} method.",
+        original = (
+            "column levels"
+            if pressure is not None
+            else f"original levels {data[vert_coord].values} {data[vert_coord].attrs.get('units')}"
         )
+        final = log_history(final, f"Interpolated from {original} to level {levels} using {method} method.")
 
         final.aqua.set_default(self)  # This links the dataset accessor to this instance of the Reader class
 
         return final
 
-    def _vertinterp(self, data, levels=None, units="Pa", vert_coord="plev", method="linear"):
+    def _vertinterp(self, data, levels=None, units="Pa", vert_coord="plev", method="linear", log=False, pressure=None):
 
         # verify units are good
-        if data[vert_coord].units != units:
+        if pressure is None and data[vert_coord].units != units:
             self.logger.warning("Converting vert_coord units to interpolate from %s to %s", data[vert_coord].units, units)
             data = data.metpy.convert_coordinate_units(vert_coord, units)
 
+        if method in VERTINTERP_METHODS:
+            return vertinterp(
+                data, levels, vert_coord=vert_coord, method=method, log=log, pressure=pressure, loglevel=self.loglevel
+            )
+
         # very simple interpolation
         final = data.interp({vert_coord: levels}, method=method)
 
@@ -1100,12 +1305,19 @@ class Reader:
 
         return data
 
-    def _filter_netcdf_files(self, esmcat, filter_key="year"):
+    def _filter_netcdf_files(self, esmcat, filter_key="year", startdate=None, enddate=None, var=None):
         """
         Filter the esmcat to include only netcdf files based on specific filter_key
         Args:
             esmcat (intake.catalog.Catalog): your catalog
-            filter_key (str): type of filter to apply (default is "year")
+            filter_key (str): type of filter to apply (default is "year").
+                              "year" filters on the years found in the filenames,
+                              "time" filters on a persistent index of the time range and variables of each file
+            startdate (str, optional): the starting date of the selection, used only by the "time" filter.
+                                       Defaults to the Reader startdate.
+            enddate (str, optional): the ending date of the selection, used only by the "time" filter.
+                                     Defaults to the Reader enddate.
+            var (list, optional): the variables to be loaded, used only by the "time" filter
 
         Returns:
             intake.catalog.Catalog: filtered catalog
@@ -1123,6 +1335,16 @@ class Reader:
                 # create regex pattern for each year: only yyyy will be detected
                 pattern = [re.compile(rf"(?<!\d){yr}(?!\d)") for yr in keys]
                 files = [f for f in files if any(p.search(os.path.basename(f)) for p in pattern)]
+        # this will consider only the files intersecting the startdate and enddate range
+        # and containing the variables, based on the file index
+        elif filter_key == "time":
+            if self.file_index is None:  # built only once, with the full list of files
+                index_file = esmcat.metadata.get("file_index") or os.path.join(
+                    self.file_index_dir, f"{self.catalog}_{self.model}_{self.exp}_{self.source}.json"
+                )
+                self.file_index = FileIndex(index_file, loglevel=self.loglevel)
+                self.file_index.update(files)
+            files = self.file_index.select(startdate or self.startdate, enddate or self.enddate, var=var)
         else:
             raise ValueError(f"Filter type {filter_key} not recognized.")
 
@@ -1143,7 +1365,7 @@ class Reader:
 
         return esmcat
 
-    def reader_intake(self, esmcat, var, loadvar, keep="first"):
+    def reader_intake(self, esmcat, var, loadvar, keep="first", startdate=None, enddate=None, chunks=None):
         """
         Read regular intake entry. Returns dataset.
 
@@ -1152,6 +1374,9 @@ class Reader:
             var (list or str): Variable to load
             loadvar (list of str): List of variables to load
             keep (str, optional): which duplicate entry to keep ("first" (default), "last" or None)
+            startdate (str, optional): The starting date of the data, used to filter netcdf files
+            enddate (str, optional): The final date of the data, used to filter netcdf files
+            chunks (dict, optional): The chunks of each dimension, overriding those of the catalog
 
         Returns:
             Dataset
@@ -1161,7 +1386,9 @@ class Reader:
         # speed up for catalogs with many small files
         if "filter_key" in esmcat.metadata and isinstance(self.esmcat, intake_xarray.netcdf.NetCDFSource):
             self.logger.info("Filtering netcdf files in the catalog based on %s", esmcat.metadata.get("filter_key"))
-            esmcat = self._filter_netcdf_files(esmcat, filter_key=esmcat.metadata["filter_key"])
+            esmcat = self._filter_netcdf_files(
+                esmcat, filter_key=esmcat.metadata["filter_key"], startdate=startdate, enddate=enddate, var=loadvar
+            )
 
         # The coder introduces the possibility to specify a time decoder for the time axis.
         # Default is set to default_time_unit (microseconds) if not specified in the esmcat.xarray_kwargs
@@ -1181,6 +1408,9 @@ class Reader:
             read_kwargs.setdefault("engine", "netcdf4")
             self.logger.debug("Forcing netcdf4 engine")
 
+        if chunks:
+            read_kwargs["chunks"] = chunks
+
         data = esmcat.reader.read(**read_kwargs)
 
         if loadvar:
@@ -1391,6 +1621,16 @@ class Reader:
             center_time (bool):  center time for averaging
             kwargs:  additional arguments to be passed to the statistical function
         """
+        # statistics precomputed by a running aqua analysis on the same data
+        cache = ProductCache.from_environ(loglevel=self.loglevel) if not kwargs else None
+        if cache:
+            cached = cache.lookup(
+                data, stat, freq=freq, exclude_incomplete=exclude_incomplete, time_bounds=time_bounds, center_time=center_time
+            )
+            if cached is not None:
+                cached.aqua.set_default(self)
+                return cached
+
         data = self.timemodule.timstat(
             data,
             stat=stat,
@@ -1445,6 +1685,28 @@ class Reader:
         """
         return self.timstat(data, stat="last", **kwargs)
 
+    def climatology(self, data, **kwargs):
+        """
+        Climatology wrapper which is calling the climatology method of the TimStat class.
+        Monthly, seasonal or day-of-year climatologies are computed in a single pass and kept.
+        """
+        data = self.timemodule.climatology(data, **kwargs)
+        if isinstance(data, dict):
+            for clim in data.values():
+                clim.aqua.set_default(self)
+        else:
+            data.aqua.set_default(self)  # accessor linking
+        return data
+
+    def anomalies(self, data, **kwargs):
+        """
+        Anomalies wrapper which is calling the anomalies method of the TimStat class.
+        Anomalies are lazy, the climatology of the base period is computed once and kept.
+        """
+        data = self.timemodule.anomalies(data, **kwargs)
+        data.aqua.set_default(self)  # accessor linking
+        return data
+
     def timhist(self, data, **kwargs):
         """
         Wrapper for the histogram function, with added timstat functionality.
@@ -0,0 +1,150 @@
+"""
+Pool of initialised Readers shared by the callers using the same arguments.
+Building a Reader browses the catalogs, loads the fixes and the grid areas and weights:
+diagnostics building many Readers for the same source (e.g. one per variable or region) pay it once.
+"""
+
+import inspect
+import threading
+from collections import OrderedDict
+
+from aqua.core.logger import log_configure
+
+from .reader import Reader
+
+# arguments which do not change the data provided by the Reader
+IGNORED_ARGS = ["loglevel"]
+
+
+def _freeze(value):
+    """Hashable version of an argument value, with dictionaries made independent of the key order."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class ReaderPool:
+    """Bounded pool of Readers indexed by their normalised constructor arguments."""
+
+    def __init__(self, maxsize=16, loglevel="WARNING"):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of Readers kept, the least recently used are discarded.
+                                     Defaults to 16.
+            loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+        """
+        self.maxsize = maxsize
+        self.logger = log_configure(log_level=loglevel, log_name="ReaderPool")
+        self._readers = OrderedDict()
+        self._lock = threading.RLock()
+        self._signature = inspect.signature(Reader.__init__)
+
+        # lookups served by the pool and Readers built
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._readers)
+
+    def arguments(self, *args, **kwargs):
+        """
+        The constructor arguments of a Reader, with the defaults applied.
+        Extra keyword arguments (e.g. realization or zoom) are merged with the named ones.
+
+        Returns:
+            dict: The arguments, by name.
+        """
+        bound = self._signature.bind(None, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop("self")
+        arguments.update(arguments.pop("kwargs", {}))
+        return arguments
+
+    def key(self, *args, **kwargs):
+        """Key of the Reader built with these arguments."""
+        arguments = self.arguments(*args, **kwargs)
+        return _freeze({name: value for name, value in arguments.items() if name not in IGNORED_ARGS})
+
+    def get(self, *args, **kwargs):
+        """
+        A Reader built with these arguments, shared with the other callers.
+        As a new Reader, it is set as the default of the aqua accessor.
+        Streaming Readers, which keep the position in the stream, and Readers rebuilding
+        areas and weights are never shared.
+
+        Args:
+            *args, **kwargs: Arguments of the Reader.
+
+        Returns:
+            Reader: The Reader.
+        """
+        arguments = self.arguments(*args, **kwargs)
+        if arguments["streaming"] or arguments["rebuild"]:
+            self.logger.debug("Streaming or rebuilding Reader, not pooled")
+            return Reader(*args, **kwargs)
+
+        key = self.key(*args, **kwargs)
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is not None:
+                self._readers.move_to_end(key)
+                self.hits += 1
+                self.logger.debug("Reusing Reader for %s %s %s", reader.model, reader.exp, reader.source)
+                reader.set_default()
+                return reader
+
+            # built under the lock, so that concurrent callers never build the same Reader twice
+            reader = Reader(*args, **kwargs)
+            self.misses += 1
+            self._readers[key] = reader
+            while len(self._readers) > self.maxsize:
+                _, discarded = self._readers.popitem(last=False)
+                self.logger.debug("Discarding Reader for %s %s %s", discarded.model, discarded.exp, discarded.source)
+        return reader
+
+    def invalidate(self, **kwargs):
+        """
+        Discard the Readers built with the given arguments, e.g. invalidate(model='IFS', exp='test').
+        Readers already returned stay valid for their callers.
+
+        Returns:
+            int: Number of Readers discarded.
+        """
+        with self._lock:
+            discarded = [
+                key for key in self._readers if all(dict(key).get(name) == _freeze(value) for name, value in kwargs.items())
+            ]
+            for key in discarded:
+                del self._readers[key]
+        self.logger.debug("Discarded %d Readers matching %s", len(discarded), kwargs)
+        return len(discarded)
+
+    def clear(self):
+        """Discard all the Readers."""
+        with self._lock:
+            self._readers.clear()
+
+
+# pool shared by the process
+reader_pool = ReaderPool()
+
+
+def get_reader(*args, **kwargs):
+    """
+    A Reader built with these arguments, shared in the process through the default ReaderPool.
+    The arguments are those of Reader. Use reader_pool.invalidate() or reader_pool.clear() to
+    build the Readers again, e.g. after changing the catalog or the fixes.
+
+    Returns:
+        Reader: The Reader.
+    """
+    return reader_pool.get(*args, **kwargs)
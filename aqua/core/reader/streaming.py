@@ -45,6 +45,10 @@ class Streaming:
         self.aggregation = aggregation
         self.idx = 0
 
+        # chunk boundaries of the last streamed time axis, computed only once
+        self._boundaries_key = None
+        self._boundaries = None
+
     def stream_chunk(self, data, startdate=None, enddate=None, aggregation=None):
         """
         Compute chunks for a dataset using startdate, enddate and aggregation defined by the constructor.
@@ -106,17 +110,83 @@ class Streaming:
         if reset:
             self.idx = 0
 
-        if not timechunks:
-            timechunks = self.stream_chunk(data, startdate=startdate, enddate=enddate, aggregation=aggregation)
+        if timechunks is not None:
+            first, last = self._chunk_boundaries(timechunks)
+        else:
+            first, last = self.stream_boundaries(data, startdate=startdate, enddate=enddate, aggregation=aggregation)
 
-        if self.idx >= len(timechunks):  # we have consumed all the data
+        if self.idx >= len(first):  # we have consumed all the data
             return None
         else:
-            date1 = timechunks.first()[self.idx]
-            date2 = timechunks.last()[self.idx]
+            date1 = first[self.idx]
+            date2 = last[self.idx]
             self.idx += 1
             return data.sel(time=slice(date1, date2))
 
+    def generator(self, data, startdate=None, enddate=None, aggregation=None):
+        """
+        Generator yielding the successive chunks of a dataset, from the first one to the last one.
+        The chunk boundaries are computed only once, so that each step has a constant overhead.
+        The internal counter used by `stream` is not affected.
+
+        Arguments:
+            data (xr.Dataset):      the input xarray.Dataset
+            startdate (str): the starting date for streaming the data (e.g. '2020-02-25') (None)
+            enddate (str): the ending date for streaming the data (e.g. '2021-01-01') (None)
+            aggregation (str): the streaming frequency in pandas style (1M, 7D etc.)
+
+        Yields:
+            A xarray.Dataset for each chunk of the input data.
+        """
+        first, last = self.stream_boundaries(data, startdate=startdate, enddate=enddate, aggregation=aggregation)
+        for date1, date2 in zip(first, last):
+            yield data.sel(time=slice(date1, date2))
+
+    def stream_boundaries(self, data, startdate=None, enddate=None, aggregation=None):
+        """
+        Compute the first and last date of each chunk of a dataset.
+        The boundaries are cached and reused as long as the time axis and the streaming options do not change.
+
+        Arguments:
+            data (xr.Dataset):      the input xarray.Dataset
+            startdate (str): the starting date for streaming the data (e.g. '2020-02-25') (None)
+            enddate (str): the ending date for streaming the data (e.g. '2021-01-01') (None)
+            aggregation (str): the streaming frequency in pandas style (1M, 7D etc.)
+
+        Returns:
+            A tuple of numpy arrays with the first and the last date of each chunk
+        """
+        time = data.time.values
+        # a new dataset is created at each retrieve, so the key is based on the time axis
+        key = (
+            startdate or self.startdate,
+            enddate or self.enddate,
+            aggregation or self.aggregation,
+            len(time),
+            time[0] if len(time) else None,
+            time[-1] if len(time) else None,
+        )
+
+        if key != self._boundaries_key:
+            timechunks = self.stream_chunk(data, startdate=startdate, enddate=enddate, aggregation=aggregation)
+            self._boundaries = self._chunk_boundaries(timechunks)
+            self._boundaries_key = key
+
+        return self._boundaries
+
+    @staticmethod
+    def _chunk_boundaries(timechunks):
+        """
+        Extract the first and last date of each chunk from a chunked time axis
+
+        Arguments:
+            timechunks (DataArrayResample): a chunked time axis
+
+        Returns:
+            A tuple of numpy arrays with the first and the last date of each chunk
+        """
+        return np.asarray(timechunks.first()), np.asarray(timechunks.last())
+
     def reset(self):
         """
         Reset the state of the streaming process.
@@ -1,11 +1,105 @@
 """Class for handling trend and detrending of xarray objects."""
 
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 import xarray as xr
 
 from aqua.core.logger import log_configure, log_history
 
+# dimensions of the polynomial degree and of the normal equations
+DEGREE_DIM = "degree"
+_GRAM_DIM = "__degree__"
+
+# time scale of the streaming fit, which does not know the whole time axis in advance
+YEAR_NS = 365.25 * 86400e9
+
+
+def _numeric_axis(coord):
+    """
+    Numeric values of the fit axis, nanoseconds since 1970 for datetimes as in xarray polyfit.
+    None if not supported (e.g. cftime).
+    """
+    values = coord.values
+    if np.issubdtype(values.dtype, np.datetime64):
+        return (values - np.datetime64("1970-01-01")).astype("timedelta64[ns]").astype("float64")
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype("float64")
+    return None
+
+
+def _vandermonde(x, degree, origin, scale):
+    """Powers of the scaled axis (x - origin) / scale, from the highest degree as in polyfit."""
+    return np.vander((x - origin) / scale, degree + 1)
+
+
+def _to_raw_basis(degree, origin, scale):
+    """Matrix converting coefficients of the scaled axis into coefficients of the numeric axis."""
+    matrix = np.zeros((degree + 1, degree + 1))
+    for k in range(degree + 1):
+        power = np.polynomial.polynomial.polypow([-origin / scale, 1 / scale], k)
+        matrix[: k + 1, k] = power
+    # from the highest degree, as in polyfit
+    return matrix[::-1, ::-1]
+
+
+@lru_cache(maxsize=32)
+def _design(x_bytes, degree):
+    """
+    Design matrix of a fit axis and its pseudo-inverse, computed once per axis and degree.
+    The axis is centred and scaled, so that the system is well conditioned also for datetimes.
+
+    Returns:
+        tuple: The Vandermonde matrix, its pseudo-inverse, the origin and the scale of the axis.
+    """
+    x = np.frombuffer(x_bytes, dtype="float64")
+    origin = float(x.mean())
+    scale = float(x.std()) or 1.0
+    vander = _vandermonde(x, degree, origin, scale)
+    return vander, np.linalg.pinv(vander), origin, scale
+
+
+def _normal_equations(data, vander, dim):
+    """
+    NaN-aware normal equations of the fit, i.e. sums along dim which can be accumulated chunk by chunk.
+
+    Returns:
+        tuple: The Gram matrices (degree x degree) and the right hand sides (degree) of each point.
+    """
+    nterms = vander.shape[1]
+    valid = data.notnull().astype("float64")
+    # products of each pair of powers, flattened
+    products = (vander[:, :, None] * vander[:, None, :]).reshape(len(vander), nterms * nterms)
+    products = xr.DataArray(products, dims=(dim, _GRAM_DIM))
+    vander = xr.DataArray(vander, dims=(dim, DEGREE_DIM))
+    gram = xr.dot(valid, products, dim=dim)
+    rhs = xr.dot(data.fillna(0), vander, dim=dim)
+    return gram, rhs
+
+
+def _solve_block(gram, rhs):
+    """Solve the normal equations of each point, NaN where the fit is underdetermined."""
+    nterms = rhs.shape[-1]
+    gram = gram.reshape(gram.shape[:-1] + (nterms, nterms))
+    coeffs = (np.linalg.pinv(gram) @ rhs[..., None])[..., 0]
+    # fewer valid points than coefficients
+    coeffs[gram[..., -1, -1] < nterms] = np.nan
+    return coeffs
+
+
+def _solve(gram, rhs):
+    """Solve the normal equations of all the points."""
+    return xr.apply_ufunc(
+        _solve_block,
+        gram,
+        rhs,
+        input_core_dims=[[_GRAM_DIM], [DEGREE_DIM]],
+        output_core_dims=[[DEGREE_DIM]],
+        dask="parallelized",
+        output_dtypes=["float64"],
+    )
+
 
 class Trender:
     """
@@ -88,7 +182,7 @@ class Trender:
         Returns:
             DataArray or Dataset: Coefficients of the polynomial fit adjusted to the input data.
         """
-        coeffs = data.polyfit(dim=dim, deg=degree, skipna=skipna)
+        coeffs = self._polyfit(data, dim=dim, degree=degree, skipna=skipna)
 
         # keep consistency with datasets
         # coeffs.rename_vars({"polyfit_coefficients": data.name})
@@ -123,7 +217,49 @@ class Trender:
             # adjust the coefficients by the factor
             coeffs = coeffs * factor_da
 
-        return coeffs.polyfit_coefficients
+        return coeffs
+
+    def _polyfit(self, data: xr.DataArray, dim: str, degree: int, skipna: bool) -> xr.DataArray:
+        """
+        Polynomial coefficients of the data along dim, as xarray polyfit.
+        The pseudo-inverse of the design matrix is computed once per axis and degree, and applied
+        to all the points with a single tensor product. With skipna, the normal equations of each
+        point are solved over its valid values only.
+
+        Returns:
+            DataArray: The coefficients along the 'degree' dimension, from the highest degree.
+        """
+        x = _numeric_axis(data[dim])
+        if x is None:
+            self.logger.debug("Non numeric '%s' axis, using xarray polyfit", dim)
+            return data.polyfit(dim=dim, deg=degree, skipna=skipna).polyfit_coefficients
+
+        vander, pinv, origin, scale = _design(x.tobytes(), degree)
+        coeffs = self._fit_scaled(data, dim, vander, pinv, skipna)
+        to_raw = xr.DataArray(_to_raw_basis(degree, origin, scale), dims=(DEGREE_DIM, _GRAM_DIM))
+        coeffs = xr.dot(to_raw, coeffs.rename({DEGREE_DIM: _GRAM_DIM}), dim=_GRAM_DIM)
+        coeffs = coeffs.assign_coords({DEGREE_DIM: np.arange(degree, -1, -1)})
+        return coeffs.transpose(DEGREE_DIM, ...).rename("polyfit_coefficients")
+
+    @staticmethod
+    def _fit_scaled(data, dim, vander, pinv, skipna):
+        """Coefficients of the fit on the scaled axis."""
+        if skipna:
+            return _solve(*_normal_equations(data, vander, dim))
+        return xr.dot(data, xr.DataArray(pinv, dims=(DEGREE_DIM, dim)), dim=dim)
+
+    def accumulator(self, dim: str = "time", degree: int = 1) -> "TrendAccumulator":
+        """
+        A fit accumulating the data chunk by chunk along dim, e.g. while streaming.
+
+        Args:
+            dim (str): Dimension to apply fit along. Defaults to 'time'.
+            degree (int): Degree of the polynomial. Defaults to 1.
+
+        Returns:
+            TrendAccumulator: The accumulator, see TrendAccumulator.update().
+        """
+        return TrendAccumulator(dim=dim, degree=degree, loglevel=self.loglevel)
 
     def _apply_trend_or_detrend(self, data, func, dim, degree, skipna, **kwargs):
         """
@@ -147,8 +283,7 @@ class Trender:
     def _trend(self, data: xr.DataArray, dim: str, degree: int, skipna: bool) -> xr.DataArray:
         """
         Compute the trend component using polynomial fit.
-        Taken from https://ncar.github.io/esds/posts/2022/dask-debug-detrend/
-        According to the post, current implementation is not the most efficient one.
+        The fit and its evaluation are done on the scaled axis, with the design matrix computed once.
 
         Args:
             data (DataArray): Input data.
@@ -160,8 +295,15 @@ class Trender:
             DataArray: Trend component.
 
         """
-        coeffs = data.polyfit(dim=dim, deg=degree, skipna=skipna)
-        return xr.polyval(data[dim], coeffs.polyfit_coefficients)
+        x = _numeric_axis(data[dim])
+        if x is None:
+            coeffs = data.polyfit(dim=dim, deg=degree, skipna=skipna)
+            return xr.polyval(data[dim], coeffs.polyfit_coefficients)
+
+        vander, pinv, _, _ = _design(x.tobytes(), degree)
+        coeffs = self._fit_scaled(data, dim, vander, pinv, skipna)
+        trend = xr.dot(xr.DataArray(vander, dims=(dim, DEGREE_DIM), coords={dim: data[dim]}), coeffs, dim=DEGREE_DIM)
+        return trend.transpose(*data.dims)
 
     def _detrend(self, data: xr.DataArray, dim: str, degree: int, skipna: bool) -> xr.DataArray:
         """
@@ -177,3 +319,111 @@ class Trender:
             DataArray: Detrended data.
         """
         return data - self._trend(data, dim=dim, degree=degree, skipna=skipna)
+
+
+class TrendAccumulator:
+    """
+    Polynomial fit accumulating the normal equations chunk by chunk along a dimension,
+    so that the trend of a long dataset is computed with the memory of a single chunk.
+    """
+
+    def __init__(self, dim: str = "time", degree: int = 1, loglevel: str = "WARNING"):
+        """
+        Args:
+            dim (str): Dimension to apply fit along. Defaults to 'time'.
+            degree (int): Degree of the polynomial. Defaults to 1.
+            loglevel (str): Logging level. Default is 'WARNING'.
+        """
+        self.dim = dim
+        self.degree = degree
+        self.logger = log_configure(loglevel, "TrendAccumulator")
+
+        # the axis is scaled from the first value, in years for datetimes
+        self.origin = None
+        self.scale = None
+        self.gram = None
+        self.rhs = None
+
+    def _vandermonde(self, coord):
+        """Design matrix of the chunk axis on the scaled axis of the fit."""
+        x = _numeric_axis(coord)
+        if x is None:
+            raise ValueError(f"The '{self.dim}' axis must be numeric or datetime64 to be accumulated.")
+        if self.origin is None:
+            self.origin = float(x[0])
+            self.scale = YEAR_NS if np.issubdtype(coord.dtype, np.datetime64) else 1.0
+        return _vandermonde(x, self.degree, self.origin, self.scale)
+
+    def update(self, data: xr.DataArray | xr.Dataset):
+        """
+        Accumulate a chunk of data along dim. NaNs are skipped. The chunk is computed.
+
+        Args:
+            data (DataArray or Dataset): The chunk.
+        """
+        vander = self._vandermonde(data[self.dim])
+        if isinstance(data, xr.Dataset):
+            data = data[[var for var in data.data_vars if self.dim in data[var].dims]]
+            equations = {var: _normal_equations(data[var], vander, self.dim) for var in data.data_vars}
+            gram = xr.Dataset({var: eq[0] for var, eq in equations.items()})
+            rhs = xr.Dataset({var: eq[1] for var, eq in equations.items()})
+        else:
+            gram, rhs = _normal_equations(data, vander, self.dim)
+        gram, rhs = gram.compute(), rhs.compute()
+
+        self.gram = gram if self.gram is None else self.gram + gram
+        self.rhs = rhs if self.rhs is None else self.rhs + rhs
+        self.logger.debug("Accumulated %d steps along '%s'", data.sizes[self.dim], self.dim)
+
+    def _coeffs_scaled(self):
+        """Coefficients on the scaled axis of the accumulated data."""
+        if self.gram is None:
+            raise ValueError("No data accumulated, call update() first.")
+        if isinstance(self.gram, xr.Dataset):
+            return xr.Dataset({var: _solve(self.gram[var], self.rhs[var]) for var in self.gram.data_vars})
+        return _solve(self.gram, self.rhs)
+
+    def coeffs(self) -> xr.DataArray | xr.Dataset:
+        """
+        Polynomial coefficients of the accumulated data, as Trender.coeffs (nanoseconds for datetimes).
+
+        Returns:
+            DataArray or Dataset: The coefficients along the 'degree' dimension, from the highest degree.
+        """
+        to_raw = xr.DataArray(_to_raw_basis(self.degree, self.origin, self.scale), dims=(DEGREE_DIM, _GRAM_DIM))
+        coeffs = self._coeffs_scaled().rename({DEGREE_DIM: _GRAM_DIM})
+        coeffs = xr.dot(to_raw, coeffs, dim=_GRAM_DIM).assign_coords({DEGREE_DIM: np.arange(self.degree, -1, -1)})
+        return coeffs.transpose(DEGREE_DIM, ...)
+
+    def trend(self, data: xr.DataArray | xr.Dataset) -> xr.DataArray | xr.Dataset:
+        """
+        Trend of the accumulated fit evaluated on the dim axis of the data, e.g. of a streamed chunk.
+
+        Args:
+            data (DataArray or Dataset): The data providing the axis.
+
+        Returns:
+            DataArray or Dataset: The trend component.
+        """
+        vander = xr.DataArray(
+            self._vandermonde(data[self.dim]), dims=(self.dim, DEGREE_DIM), coords={self.dim: data[self.dim]}
+        )
+        coeffs = self._coeffs_scaled()
+        if isinstance(coeffs, xr.Dataset):
+            return coeffs.map(lambda c: xr.dot(vander, c, dim=DEGREE_DIM))
+        return xr.dot(vander, coeffs, dim=DEGREE_DIM)
+
+    def detrend(self, data: xr.DataArray | xr.Dataset) -> xr.DataArray | xr.Dataset:
+        """
+        Remove the trend of the accumulated fit from the data, e.g. from a streamed chunk.
+
+        Args:
+            data (DataArray or Dataset): The data.
+
+        Returns:
+            DataArray or Dataset: The detrended data.
+        """
+        trend = self.trend(data)
+        if isinstance(data, xr.Dataset):
+            return data[list(trend.data_vars)] - trend
+        return data - trend.transpose(*data.dims)
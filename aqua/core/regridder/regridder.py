@@ -5,16 +5,30 @@ import re
 import shutil
 from tempfile import TemporaryDirectory
 
+import numpy as np
 import xarray as xr
 from smmregrid import CdoGenerate, GridInspector
 from smmregrid import Regridder as SMMRegridder
 from smmregrid.util import check_gridfile
 
+from aqua.core.data_model import counter_reverse_coordinate
 from aqua.core.logger import log_configure
 from aqua.core.util import to_list
 
 from .griddicthandler import GridDictHandler
-from .regridder_util import check_existing_file, validate_reader_kwargs
+from .regridder_util import (
+    OPERATOR_VARS,
+    add_weights_operator,
+    check_existing_file,
+    check_existing_mmap,
+    flip_permutation,
+    mmap_path,
+    open_mmap,
+    open_weights_operator,
+    permute_weights_source,
+    save_mmap,
+    validate_reader_kwargs,
+)
 
 # parameters which will affect the weights and areas name
 DEFAULT_WEIGHTS_AREAS_PARAMETERS = ["zoom"]
@@ -41,6 +55,7 @@ class Regridder:
         src_grid_name: str = None,
         data: xr.Dataset = None,
         cdo: str = None,
+        mmap: bool = None,
         loglevel: str = "WARNING",
     ):
         """
@@ -52,6 +67,9 @@ class Regridder:
             src_grid_name (str, optional): The name of the source grid in the AQUA convention.
             data (xarray.Dataset, optional): The dataset to be regridded if src_grid_name is not provided.
             cdo (str, optional): The path to the CDO executable. If None, guess it from the system.
+            mmap (bool, optional): If True, areas and weights are converted once to memory-mappable stores
+                                   and opened read-only from them, so that processes share them through
+                                   the page cache. If None, the `mmap.enabled` key of cfg_grid_dict is used.
             loglevel (str): The logging level.
 
         Attributes:
@@ -66,7 +84,9 @@ class Regridder:
             tgt_horizontal_dims (str): The target horizontal dimensions.
             error (str): The error message to be used by the Reader.
             cdo (str): The CDO path.
+            mmap (bool): If areas and weights are opened from memory-mappable stores.
             smmregridder (dict): The SMMregrid regridder object for each vertical coordinate.
+            src_weights (dict): The weights used to initialize the SMMregrid regridders.
             src_grid_area (xarray.Dataset): The source grid area.
             tgt_grid_area (xarray.Dataset): The target grid area.
             masked_attrs (dict): The masked attributes.
@@ -83,6 +103,7 @@ class Regridder:
         # define basic attributes:
         self.cfg_grid_dict = cfg_grid_dict if cfg_grid_dict else {}  # full grid dictionary
         self.src_grid_name = src_grid_name  # source grid name
+        self.mmap = bool(mmap if mmap is not None else self.cfg_grid_dict.get("mmap", {}).get("enabled", False))
 
         # we want all the grid dictionary to be real dictionaries
         self.handler = GridDictHandler(cfg_grid_dict, default_dimension=DEFAULT_DIMENSION, loglevel=loglevel)
@@ -124,6 +145,11 @@ class Regridder:
 
         # SMMregridders dictionary for each vertical coordinate
         self.smmregridder = {}
+        self.src_weights = {}
+
+        # SMMregridders with permuted source weights for the latest flipped data layout, built on demand
+        self._flipped_layout = None
+        self._flipped_smmregridder = {}
 
         # source and target areas
         self.src_grid_area = None
@@ -263,13 +289,15 @@ class Regridder:
         # if file exists, load it
         if not rebuild and check_existing_file(area_filename):
             self.logger.info("Loading existing %s area from %s.", area_type, area_filename)
-            return xr.open_dataset(area_filename)
+            return self._open_file(area_filename)
 
         # generate and save the area
         grid_area = self._generate_area(grid_name, grid_dict, area_filename, area_type)
         self._safe_to_netcdf(grid_area, area_filename)
         self.logger.info("Saved %s area to %s.", area_type, area_filename)
 
+        if self.mmap:
+            return self._open_file(area_filename)
         return grid_area
 
     def _generate_area(self, grid_name, grid_dict, area_filename, area_type):
@@ -377,13 +405,61 @@ class Regridder:
                 self.logger.info("Loading existing weights from %s.", weights_filename)
 
             # load the weights
-            weights[mask_dim] = xr.open_dataset(weights_filename)
+            weights[mask_dim] = self._open_file(weights_filename)
 
         if initialize:
             self.initialize(weights)
 
         return weights
 
+    def _open_file(self, filename):
+        """
+        Open an area or weights NetCDF file, from its memory-mappable store if mmap is enabled.
+        The store is created, or updated if older than the NetCDF file.
+
+        Args:
+            filename (str): The NetCDF file.
+
+        Returns:
+            xr.Dataset: The areas or the weights.
+        """
+        if not self.mmap:
+            return xr.open_dataset(filename)
+
+        store = mmap_path(filename)
+        if not check_existing_mmap(store, filename):
+            self.to_mmap(filename, store=store)
+        self.logger.debug("Opening memory-mapped store %s", store)
+        data = open_mmap(store)
+        # weights stores written before the sparse operators were stored
+        if "remap_matrix" in data and not all(name in data for name in OPERATOR_VARS):
+            self.to_mmap(filename, store=store)
+            data = open_mmap(store)
+        return data
+
+    def to_mmap(self, filename, store=None):
+        """
+        Convert an area or weights NetCDF file to a memory-mappable store,
+        i.e. a folder with the raw arrays in .npy format that can be opened read-only
+        by many processes sharing the same memory pages. Weights are stored together with
+        their sparse operators, so that the operators are shared too.
+
+        Args:
+            filename (str): The NetCDF file.
+            store (str, optional): The store folder. Defaults to the filename with the .mmap extension.
+
+        Returns:
+            str: The store folder.
+        """
+        store = store if store else mmap_path(filename)
+        self.logger.info("Converting %s to memory-mapped store %s", filename, store)
+        with xr.open_dataset(filename) as data:
+            data = data.load()
+        if "remap_matrix" in data:
+            data = add_weights_operator(data)
+        save_mmap(data, store)
+        return store
+
     def initialize(self, weights):
         """
         Initialize the SMMRegridder for each vertical coordinate.
@@ -394,17 +470,106 @@ class Regridder:
         Please notice that we cannot use src_grid_path because we might have applied fixer or data model
         """
 
+        # weights are kept to build regridders for flipped data
+        self.src_weights = weights
+        self._flipped_layout = None
+        self._flipped_smmregridder = {}
+
         for mask_dim in weights.keys():
-            # define the vertical coordinate in the smmregrid world
-            smm_mask_dim = None if mask_dim in [DEFAULT_DIMENSION, DEFAULT_DIMENSION_MASK] else mask_dim
+            self.smmregridder[mask_dim] = self._init_smmregridder(weights[mask_dim], mask_dim)
 
-            # initialize the regridder
-            self.smmregridder[mask_dim] = SMMRegridder(
-                weights=weights[mask_dim],
-                horizontal_dims=self.src_horizontal_dims,
-                mask_dim=smm_mask_dim,
-                loglevel=self.loglevel,
-            )
+    def _init_smmregridder(self, weights, mask_dim):
+        """
+        Initialize a single SMMRegridder for a vertical coordinate.
+
+        Args:
+            weights (xr.Dataset): The weights for the vertical coordinate.
+            mask_dim (str): The vertical coordinate in the AQUA convention.
+
+        Returns:
+            SMMRegridder: The initialized regridder.
+        """
+        # define the vertical coordinate in the smmregrid world
+        smm_mask_dim = None if mask_dim in [DEFAULT_DIMENSION, DEFAULT_DIMENSION_MASK] else mask_dim
+
+        operator = None
+        if all(name in weights for name in OPERATOR_VARS):
+            self.logger.debug("Using the stored sparse operators for %s", mask_dim)
+            operator = open_weights_operator(weights)
+            # links are made lazy, so that smmregrid does not copy them to build its own operators
+            weights = weights.assign({name: weights[name].chunk() for name in ["src_address", "dst_address", "remap_matrix"]})
+
+        regridder = SMMRegridder(
+            weights=weights,
+            horizontal_dims=self.src_horizontal_dims,
+            mask_dim=smm_mask_dim,
+            loglevel=self.loglevel,
+        )
+        if operator is not None:
+            for gridtype in regridder.grids:
+                gridtype.weights_matrix = operator
+        return regridder
+
+    def _horizontal_layout(self, data):
+        """
+        Get the order and the sizes of the source horizontal dimensions of the data.
+
+        Args:
+            data (xarray.Dataset, xarray.DataArray): The data to be regridded.
+
+        Returns:
+            tuple: The horizontal dimensions in data order and their sizes,
+                   None if variables have different layouts.
+        """
+        horizontal = to_list(self.src_horizontal_dims)
+        arrays = data.data_vars.values() if isinstance(data, xr.Dataset) else [data]
+        layouts = {tuple(dim for dim in array.dims if dim in horizontal) for array in arrays}
+        layouts.discard(())
+        if len(layouts) != 1:
+            return None
+        dims = layouts.pop()
+        return dims, tuple(data.sizes[dim] for dim in dims)
+
+    def _get_smmregridder(self, data, verticals):
+        """
+        Get the SMMregridders suitable for the data.
+        If some coordinates have been flipped by the data model, the weights are permuted
+        so that the data can be regridded without reversing them back. The permuted regridders
+        are built only for the vertical coordinates in use, and only for the latest flipped layout:
+        each of them takes as much memory as the regridder of the original layout.
+
+        Args:
+            data (xarray.Dataset, xarray.DataArray): The data to be regridded.
+            verticals (list): The vertical coordinates of the variables to be regridded.
+
+        Returns:
+            tuple: The SMMregridders dictionary and the data to be regridded.
+        """
+        flipped = [coord for coord in data.coords if data.coords[coord].attrs.get("flipped")]
+        if not flipped or not self.src_weights:
+            return self.smmregridder, data
+
+        layout = self._horizontal_layout(data)
+        sizes = {weights.sizes.get("src_grid_size") for weights in self.src_weights.values()}
+        if layout is None or not all(coord in layout[0] for coord in flipped) or sizes != {int(np.prod(layout[1]))}:
+            self.logger.info("Cannot permute the weights for flipped coordinates %s, reversing the data", flipped)
+            return self.smmregridder, counter_reverse_coordinate(data)
+
+        dims, shape = layout
+        key = (dims, shape, tuple(sorted(flipped)))
+        if key != self._flipped_layout:
+            self._flipped_layout, self._flipped_smmregridder = key, {}
+        missing = [
+            mask_dim for mask_dim in verticals if mask_dim in self.src_weights and mask_dim not in self._flipped_smmregridder
+        ]
+        if missing:
+            self.logger.info("Permuting weights source grid of %s for flipped coordinates %s", missing, flipped)
+            permutation = flip_permutation(shape, axes=[dims.index(coord) for coord in flipped])
+            for mask_dim in missing:
+                weights = permute_weights_source(self.src_weights[mask_dim], permutation)
+                self._flipped_smmregridder[mask_dim] = self._init_smmregridder(weights, mask_dim)
+
+        return self._flipped_smmregridder, data
 
     def _area_filename(self, tgt_grid_name, reader_kwargs):
         """ "
@@ -572,38 +737,48 @@ class Regridder:
         # get which variables share the same dimensions
         shared_vars = self._group_shared_dims(data)
 
+        # flipped data are regridded with permuted weights
+        smmregridder, data = self._get_smmregridder(data, list(shared_vars))
+
         # apply regridding to each variable using the correct regridder
-        data = self._apply_regrid(data, shared_vars)
+        data = self._apply_regrid(data, shared_vars, smmregridder=smmregridder)
 
         return data
 
-    def _apply_regrid(self, data, shared_vars):
+    def _apply_regrid(self, data, shared_vars, smmregridder=None):
         """
         Core regridding function.
         Apply regridding on the different vertical coordinates, including 2d and 2dm
+
+        Args:
+            data (xarray.Dataset, xarray.DataArray): The data to be regridded.
+            shared_vars (dict): The variables sharing each vertical coordinate.
+            smmregridder (dict, optional): The SMMregridders to be used. Defaults to self.smmregridder.
         """
+        if smmregridder is None:
+            smmregridder = self.smmregridder
 
         if isinstance(data, xr.Dataset):
             datar = []
             for vertical in shared_vars:
-                if not self.smmregridder.get(vertical):
+                if not smmregridder.get(vertical):
                     self.logger.error("Regridder for vertical coordinate %s not found.", vertical)
                     self.logger.error("Cannot regrid variables %s", shared_vars[vertical])
                     continue
                 else:
                     existing_vars = [v for v in shared_vars[vertical] if v in data]
                     if existing_vars:
-                        datar.append(self.smmregridder[vertical].regrid(data[existing_vars]))
+                        datar.append(smmregridder[vertical].regrid(data[existing_vars]))
             data = xr.merge(datar)
         elif isinstance(data, xr.DataArray):
             for vertical, variables in shared_vars.items():
                 if data.name in variables:
-                    if not self.smmregridder.get(vertical):
+                    if not smmregridder.get(vertical):
                         self.logger.error("Regridder for vertical coordinate %s not found.", vertical)
                         self.logger.error("Cannot regrid variable %s", data.name)
                         continue
                     # TODO: if smmregridder is not found, we can call the weights method to generate on the fly
-                    data = self.smmregridder[vertical].regrid(data)
+                    data = smmregridder[vertical].regrid(data)
         else:
             raise ValueError("Data must be an xarray Dataset or DataArray.")
         return data
@@ -1,6 +1,21 @@
 """Regridding utilities."""
 
+import json
 import os
+import shutil
+from tempfile import TemporaryDirectory
+
+import dask
+import dask.array
+import numpy as np
+import sparse
+import xarray as xr
+
+# suffix of the memory-mappable stores replacing the NetCDF extension
+MMAP_SUFFIX = ".mmap"
+MMAP_METADATA = "metadata.json"
+# variables of the sparse operators stored with the CDO weights
+OPERATOR_VARS = ["operator_coords", "operator_data", "operator_nnz"]
 
 
 def check_existing_file(filename):
@@ -21,3 +36,229 @@ def validate_reader_kwargs(reader_kwargs):
         if key not in reader_kwargs:
             raise ValueError(f"reader_kwargs must contain key '{key}'.")
     return reader_kwargs
+
+
+def flip_permutation(shape, axes):
+    """
+    Permutation of the flattened indices of an array reversed along some axes.
+
+    Args:
+        shape (tuple): The shape of the array.
+        axes (list): The axes along which the array is reversed.
+
+    Returns:
+        np.ndarray: The flat index in the original array of each flattened point of the reversed array.
+    """
+    index = np.arange(int(np.prod(shape))).reshape(shape)
+    return np.flip(index, axis=tuple(axes)).ravel()
+
+
+def permute_weights_source(weights, permutation):
+    """
+    Permute the source grid of CDO weights, so that they can be applied to source
+    data whose flattened horizontal points are reordered following the permutation.
+    The data are left untouched, only the source addresses and the source grid fields are changed.
+
+    Args:
+        weights (xr.Dataset): The CDO weights.
+        permutation (np.ndarray): The flat index in the original grid of each point of the reordered grid.
+
+    Returns:
+        xr.Dataset: The weights with permuted source grid.
+    """
+    inverse = np.empty_like(permutation)
+    inverse[permutation] = np.arange(permutation.size)
+
+    # source addresses are 1-based, 0 is used as padding in 3d weights
+    address = weights["src_address"].values
+    valid = address > 0
+    new_address = address.copy()
+    new_address[valid] = inverse[address[valid] - 1] + 1
+
+    weights = weights.assign(src_address=(weights["src_address"].dims, new_address, weights["src_address"].attrs))
+    # the stored sparse operators refer to the original source grid
+    weights = weights.drop_vars(OPERATOR_VARS, errors="ignore")
+    # reorder all the source grid fields (mask, centers, areas...)
+    return weights.isel(src_grid_size=permutation)
+
+
+def mmap_path(filename):
+    """
+    Path of the memory-mappable store associated to an area/weights NetCDF file.
+    """
+    root, ext = os.path.splitext(filename)
+    return (root if ext == ".nc" else filename) + MMAP_SUFFIX
+
+
+def check_existing_mmap(store, filename=None):
+    """
+    Checks if a memory-mappable store exists and is not older than the NetCDF file it is built from.
+    """
+    metadata = os.path.join(store, MMAP_METADATA)
+    if not os.path.exists(metadata):
+        return False
+    if filename and os.path.exists(filename):
+        return os.path.getmtime(metadata) >= os.path.getmtime(filename)
+    return True
+
+
+def _json_attrs(attrs):
+    """
+    Convert attributes to JSON serializable types.
+    """
+    return json.loads(json.dumps(attrs, default=lambda value: value.tolist() if hasattr(value, "tolist") else str(value)))
+
+
+def save_mmap(data, store):
+    """
+    Save a dataset as a memory-mappable store: a folder with one raw .npy array
+    for each variable and coordinate and a JSON file with dimensions and attributes.
+    The store is written in a temporary folder and moved in place, so that concurrent
+    processes never see a partial store.
+
+    Args:
+        data (xr.Dataset): The dataset to be saved, e.g. CDO weights or cell areas.
+        store (str): The store folder.
+    """
+    store = os.path.abspath(store)
+    dest_dir = os.path.dirname(store)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    metadata = {"attrs": _json_attrs(data.attrs), "variables": {}}
+    with TemporaryDirectory(dir=dest_dir) as tmpdirname:
+        tmp_store = os.path.join(tmpdirname, os.path.basename(store))
+        os.makedirs(tmp_store)
+        for index, (name, variable) in enumerate(data.variables.items()):
+            values = np.asarray(variable.values)
+            # strings and objects cannot be memory mapped
+            if values.dtype.kind == "O":
+                values = values.astype(str)
+            filename = f"var{index}.npy"
+            np.save(os.path.join(tmp_store, filename), values, allow_pickle=False)
+            metadata["variables"][str(name)] = {
+                "file": filename,
+                "dims": list(variable.dims),
+                "attrs": _json_attrs(variable.attrs),
+                "coord": name in data.coords,
+            }
+        # metadata is written last, it marks the store as complete
+        with open(os.path.join(tmp_store, MMAP_METADATA), "w") as f:
+            json.dump(metadata, f)
+
+        if os.path.exists(store):
+            shutil.rmtree(store, ignore_errors=True)
+        try:
+            os.replace(tmp_store, store)
+        except OSError:
+            # another process has just written the same store
+            if not check_existing_mmap(store):
+                raise
+
+
+def open_mmap(store):
+    """
+    Open a memory-mappable store as a dataset backed by read-only memory maps.
+    The arrays are shared through the page cache by all the processes opening the same store.
+
+    Args:
+        store (str): The store folder.
+
+    Returns:
+        xr.Dataset: The dataset.
+    """
+    with open(os.path.join(store, MMAP_METADATA)) as f:
+        metadata = json.load(f)
+
+    data_vars, coords = {}, {}
+    for name, info in metadata["variables"].items():
+        values = np.load(os.path.join(store, info["file"]), mmap_mode="r", allow_pickle=False)
+        variable = xr.Variable(info["dims"], values, attrs=info["attrs"])
+        if info["coord"]:
+            coords[name] = variable
+        else:
+            data_vars[name] = variable
+
+    return xr.Dataset(data_vars=data_vars, coords=coords, attrs=metadata["attrs"])
+
+
+def _links(weights, index=None):
+    """
+    Source and destination addresses and weights of the links of CDO weights,
+    of a level of the mask-changing vertical dimension if index is provided.
+    """
+    if index is not None:
+        links_dim = "numLinks" if "numLinks" in weights.dims else "num_links"
+        mask_dim = weights["src_address"].dims[0]
+        weights = weights.isel({mask_dim: index, links_dim: slice(0, int(weights["link_length"].values[index]))})
+    return weights["src_address"].values, weights["dst_address"].values, weights["remap_matrix"].values[:, 0]
+
+
+def add_weights_operator(weights):
+    """
+    Add to CDO weights the sparse operators used by smmregrid, with 0-based
+    coordinates sorted and without duplicates, so that they can be stored and used as they are.
+    The destination mask is computed too, so that smmregrid does not need to apply the operators
+    at initialization. 3d weights have an operator for each level of the mask-changing vertical
+    dimension, padded to the largest number of links.
+
+    Args:
+        weights (xr.Dataset): The CDO weights, loaded in memory.
+
+    Returns:
+        xr.Dataset: The weights with the 'operator_coords', 'operator_data' and 'operator_nnz'
+                    variables and the 'dst_grid_masked' destination mask.
+    """
+    shape = (weights.sizes["src_grid_size"], weights.sizes["dst_grid_size"])
+    levels = [None] if weights["src_address"].ndim == 1 else range(weights["src_address"].shape[0])
+
+    operators, dst_masks = [], []
+    for index in levels:
+        src_address, dst_address, remap_matrix = _links(weights, index)
+        operator = sparse.COO([src_address - 1, dst_address - 1], remap_matrix, shape=shape)
+        operators.append(operator)
+        src_mask = weights["src_grid_imask"].values if index is None else weights["src_grid_imask"].values[index]
+        dst_masks.append(np.where(np.tensordot(src_mask, operator, axes=1) < 0.5, 0, 1))
+
+    nnz = max(operator.nnz for operator in operators)
+    coords = np.zeros((len(operators), 2, nnz), dtype=np.int64)
+    data = np.zeros((len(operators), nnz), dtype=operators[0].dtype)
+    for index, operator in enumerate(operators):
+        coords[index, :, : operator.nnz] = operator.coords
+        data[index, : operator.nnz] = operator.data
+
+    lead = [] if levels == [None] else [weights["src_address"].dims[0]]
+    dst_mask = np.stack(dst_masks).astype(weights["dst_grid_imask"].dtype)
+    return weights.assign(
+        operator_coords=(lead + ["operator_axes", "operator_links"], coords if lead else coords[0]),
+        operator_data=(lead + ["operator_links"], data if lead else data[0]),
+        operator_nnz=(lead, np.array([operator.nnz for operator in operators]) if lead else operators[0].nnz),
+        dst_grid_imask=(weights["dst_grid_imask"].dims, dst_mask if lead else dst_mask[0], weights["dst_grid_imask"].attrs),
+        dst_grid_masked=(lead, ~(dst_mask == 1).all(axis=-1) if lead else ~(dst_mask == 1).all()),
+    )
+
+
+def open_weights_operator(weights):
+    """
+    Sparse operators of weights with stored operators, see ``add_weights_operator()``.
+    The operators are built on the arrays of the weights without copying them, so that
+    memory-mapped weights are shared by all the processes using them.
+
+    Args:
+        weights (xr.Dataset): The weights, with the operator variables.
+
+    Returns:
+        dask.array.Array or list: The operator as a single chunk dask array, as in smmregrid,
+                                  or a list with the operator of each level for 3d weights.
+    """
+    shape = (weights.sizes["src_grid_size"], weights.sizes["dst_grid_size"])
+    # .values of numpy backed variables are views, not copies
+    coords, data, nnz = (weights[name].values for name in OPERATOR_VARS)
+
+    def operator(coords, data, nnz):
+        coo = sparse.COO(coords[:, :nnz], data[:nnz], shape=shape, has_duplicates=False, sorted=True)
+        # not pure: hashing the operator would read all of it
+        return dask.array.from_delayed(dask.delayed(coo, pure=False, traverse=False), shape=shape, dtype=coo.dtype)
+
+    if nnz.ndim == 0:
+        return operator(coords, data, int(nnz))
+    return [operator(coords[index], data[index], int(nnz[index])) for index in range(nnz.size)]
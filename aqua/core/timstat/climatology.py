@@ -0,0 +1,257 @@
+"""
+Climatologies computed in a single pass over the data, and anomalies with respect to them.
+Monthly and seasonal climatologies are built from the same partial reductions of each calendar month,
+and anomalies are computed lazily, block by block, from the climatology held in memory.
+"""
+
+import dask
+import dask.array as da
+import numpy as np
+import xarray as xr
+
+from aqua.core.logger import log_configure
+from aqua.core.util import check_chunk_completeness, check_seasonal_chunk_completeness, to_list
+from aqua.core.util.sci_util import TRIPLET_MONTHS, generate_quarter_months
+
+from .grouped import _finalize, group_codes, group_partials
+
+# climatologies and the dimension of their groups
+CLIMATOLOGIES = {"monthly": "month", "seasonal": "season", "dayofyear": "dayofyear"}
+# statistics of the climatologies
+CLIMATOLOGY_STATS = ["mean", "std", "max", "min"]
+# groups on which each climatology is reduced, seasons are combined from months
+_BASE = {"monthly": "monthly", "seasonal": "monthly", "dayofyear": "dayofyear"}
+
+
+def season_months(anchor="DEC"):
+    """
+    The four seasons starting from the anchor month, as used by check_seasonal_chunk_completeness().
+
+    Args:
+        anchor (str, optional): The month starting the first season. Defaults to 'DEC'.
+
+    Returns:
+        dict: The months of each season, by name (e.g. {'DJF': [12, 1, 2], 'MAM': [3, 4, 5], ...}).
+    """
+    anchor = anchor.upper()
+    names = {tuple(months): name for name, months in TRIPLET_MONTHS.items()}
+    return {names[tuple(months)]: months for months in generate_quarter_months(anchor)[anchor].values()}
+
+
+def climatology_labels(freq, anchor="DEC"):
+    """
+    Labels of the groups of a climatology: months and days of the year from 1, or season names.
+
+    Args:
+        freq (str): One of CLIMATOLOGIES.
+        anchor (str, optional): The month starting the first season. Defaults to 'DEC'.
+
+    Returns:
+        list: The labels.
+    """
+    if freq == "monthly":
+        return list(range(1, 13))
+    if freq == "dayofyear":
+        return list(range(1, 367))
+    if freq == "seasonal":
+        return list(season_months(anchor))
+    raise ValueError(f"Climatology {freq} is not supported, use one of {list(CLIMATOLOGIES)}")
+
+
+def climatology_codes(time, freq, anchor="DEC"):
+    """
+    Climatological group of each time step, the position of its label in climatology_labels().
+
+    Args:
+        time (xr.DataArray): The time coordinate.
+        freq (str): One of CLIMATOLOGIES.
+        anchor (str, optional): The month starting the first season. Defaults to 'DEC'.
+
+    Returns:
+        np.ndarray: The group of each time step.
+    """
+    index = time.to_index()
+    if freq == "monthly":
+        return np.asarray(index.month) - 1
+    if freq == "dayofyear":
+        return np.asarray(index.dayofyear) - 1
+    if freq == "seasonal":
+        lookup = np.empty(12, dtype=int)
+        for code, months in enumerate(season_months(anchor).values()):
+            lookup[np.asarray(months) - 1] = code
+        return lookup[np.asarray(index.month) - 1]
+    raise ValueError(f"Climatology {freq} is not supported, use one of {list(CLIMATOLOGIES)}")
+
+
+def _complete_steps(data, freq, anchor="DEC", loglevel="WARNING"):
+    """Time steps in the complete months, seasons or days, with the masks of timstat exclude_incomplete."""
+    resample_freq = {"monthly": "MS", "seasonal": f"QS-{anchor.upper()}", "dayofyear": "1D"}[freq]
+    if freq == "seasonal":
+        mask = check_seasonal_chunk_completeness(data, resample_frequency=resample_freq, loglevel=loglevel)
+    else:
+        mask = check_chunk_completeness(data, resample_frequency=resample_freq, loglevel=loglevel)
+    grouping = group_codes(data["time"], resample_freq)
+    if grouping is None:
+        raise ValueError("Incomplete periods can be excluded only on an increasing standard time axis")
+    codes, labels = grouping
+    return mask.reindex(time=labels, fill_value=False).values[codes]
+
+
+def _combine_seasons(partials, stat, anchor="DEC"):
+    """Partial reductions of the seasons, from those of the months."""
+    seasons = [np.asarray(months) - 1 for months in season_months(anchor).values()]
+    if stat in ["max", "min"]:
+        ufunc = np.fmax if stat == "max" else np.fmin
+        return np.stack(
+            [
+                np.stack([partials[0][months].sum(axis=0) for months in seasons]),
+                np.stack([ufunc.reduce(partials[1][months], axis=0) for months in seasons]),
+            ]
+        )
+    return np.stack([partials[:, months].sum(axis=1) for months in seasons], axis=1)
+
+
+def climatology(data, freq="monthly", stat="mean", anchor="DEC", exclude_incomplete=False, loglevel="WARNING"):
+    """
+    Climatologies of the data, all computed in a single pass. Seasonal climatologies are combined
+    from the monthly reductions, so that monthly and seasonal climatologies cost as much as one.
+
+    Args:
+        data (xr.DataArray or xr.Dataset): The data, with a time dimension.
+        freq (str or list, optional): One or more of 'monthly', 'seasonal' and 'dayofyear'. Defaults to 'monthly'.
+        stat (str, optional): One of CLIMATOLOGY_STATS. Defaults to 'mean'.
+        anchor (str, optional): The month starting the first season. Defaults to 'DEC' (DJF, MAM, JJA, SON).
+        exclude_incomplete (bool, optional): Exclude the incomplete months, seasons or days, as timstat does.
+                                             Defaults to False.
+        loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+
+    Returns:
+        xr.DataArray or xr.Dataset: The climatology, with a 'month', 'season' or 'dayofyear' dimension
+                                    in place of time. A dictionary of them by freq if freq is a list.
+    """
+    logger = log_configure(log_level=loglevel, log_name="Climatology")
+    kinds = to_list(freq)
+    for kind in kinds:
+        if kind not in CLIMATOLOGIES:
+            raise ValueError(f"Climatology {kind} is not supported, use one of {list(CLIMATOLOGIES)}")
+    if stat not in CLIMATOLOGY_STATS:
+        raise ValueError(f"Statistic {stat} is not supported, use one of {CLIMATOLOGY_STATS}")
+    if "time" not in data.dims:
+        raise ValueError("Time dimension not found in the input data. Cannot compute the climatology")
+    if data.sizes["time"] == 0:
+        raise ValueError("No time steps in the input data. Cannot compute the climatology")
+
+    arrays = data if isinstance(data, xr.Dataset) else {data.name: data}
+    names = [name for name, array in arrays.items() if "time" in array.dims]
+    keep_attrs = xr.get_options()["keep_attrs"] is True
+
+    # one reduction for each base grouping (and mask of the complete periods)
+    passes = {}
+    for kind in kinds:
+        passes.setdefault((_BASE[kind], kind if exclude_incomplete else None), []).append(kind)
+    partials = {}
+    for base, mask_kind in passes:
+        codes = climatology_codes(data["time"], base, anchor=anchor)
+        ngroups = len(climatology_labels(base, anchor=anchor))
+        if mask_kind is not None:
+            # steps of the incomplete periods go to an extra group, which is discarded
+            codes = np.where(_complete_steps(data, mask_kind, anchor=anchor, loglevel=loglevel), codes, ngroups)
+        for name in names:
+            values = arrays[name].transpose("time", ...).data
+            partials[base, mask_kind, name] = group_partials(values, codes, ngroups + 1, stat)[:, :ngroups]
+    logger.info("Computing %s %s climatologies in a single pass", stat, kinds)
+    (partials,) = dask.compute(partials)
+
+    results = {}
+    for (base, mask_kind), group in passes.items():
+        for kind in group:
+            dim = CLIMATOLOGIES[kind]
+            labels = climatology_labels(kind, anchor=anchor)
+            out = {}
+            for name in names:
+                array = arrays[name]
+                reduced = partials[base, mask_kind, name]
+                if kind == "seasonal":
+                    reduced = _combine_seasons(reduced, stat, anchor=anchor)
+                dims = array.transpose("time", ...).dims
+                values = _finalize(reduced, stat, array.dtype)
+                coords = {coord: value for coord, value in array.coords.items() if "time" not in value.dims}
+                result = xr.DataArray(
+                    values,
+                    dims=(dim,) + dims[1:],
+                    coords={**coords, dim: labels},
+                    name=name,
+                    attrs=array.attrs if keep_attrs else {},
+                )
+                out[name] = result.transpose(*[dim if d == "time" else d for d in array.dims])
+            if isinstance(data, xr.Dataset):
+                results[kind] = xr.Dataset(out, attrs=data.attrs if keep_attrs else {})
+            else:
+                results[kind] = out[data.name]
+    return results if isinstance(freq, list) else results[freq]
+
+
+def _anomaly_block(values, codes, clim):
+    """Anomalies of a block with the time axis first, from the climatology of each group."""
+    return values - clim[codes]
+
+
+def _anomalies(array, clim, codes, dim):
+    """Anomalies of a DataArray, lazy if it is a dask array, from the climatology along dim."""
+    dims = array.dims
+    array = array.transpose("time", ...)
+    clim = clim.transpose(dim, *array.dims[1:])
+    values, climv = array.data, np.asarray(clim.values)
+    dtype = np.result_type(values.dtype, climv.dtype)
+    if isinstance(values, da.Array):
+        ndim = values.ndim
+        climv = da.from_array(climv, chunks=((climv.shape[0],),) + values.chunks[1:])
+        result = da.blockwise(
+            _anomaly_block,
+            tuple(range(ndim)),
+            values,
+            tuple(range(ndim)),
+            da.from_array(codes, chunks=(values.chunks[0],)),
+            (0,),
+            climv,
+            (ndim,) + tuple(range(1, ndim)),
+            concatenate=True,
+            dtype=dtype,
+        )
+    else:
+        result = _anomaly_block(values, codes, climv)
+    return array.copy(data=result).transpose(*dims)
+
+
+def anomalies(data, clim, anchor="DEC", loglevel="WARNING"):
+    """
+    Anomalies of the data with respect to a climatology, computed lazily: the climatology of each
+    time step is taken block by block, without broadcasting the climatology on the whole time axis.
+
+    Args:
+        data (xr.DataArray or xr.Dataset): The data, with a time dimension.
+        clim (xr.DataArray or xr.Dataset): The climatology, as returned by climatology(),
+                                           with the variables of the data.
+        anchor (str, optional): The month starting the first season, for seasonal climatologies.
+                                Defaults to 'DEC'.
+        loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+
+    Returns:
+        xr.DataArray or xr.Dataset: The anomalies.
+    """
+    logger = log_configure(log_level=loglevel, log_name="Climatology")
+    dims = [dim for dim in CLIMATOLOGIES.values() if dim in clim.dims]
+    if len(dims) != 1:
+        raise ValueError(f"The climatology must have one of the dimensions {list(CLIMATOLOGIES.values())}")
+    dim = dims[0]
+    kind = next(kind for kind, value in CLIMATOLOGIES.items() if value == dim)
+    codes = climatology_codes(data["time"], kind, anchor=anchor)
+    # groups missing in the climatology have no anomaly
+    clim = clim.reindex({dim: climatology_labels(kind, anchor=anchor)})
+    logger.debug("Computing anomalies from the %s climatology", kind)
+
+    if isinstance(data, xr.DataArray):
+        return _anomalies(data, clim if isinstance(clim, xr.DataArray) else clim[data.name], codes, dim)
+    return data.map(
+        lambda array: _anomalies(array, clim[array.name], codes, dim) if "time" in array.dims else array, keep_attrs=True
+    )
@@ -0,0 +1,439 @@
+"""
+Grouped reductions of the time statistics, over all the resample groups at once.
+The group of each time step is assigned once from the time axis, and the statistic runs
+as a segmented reduction on each block of data instead of a Python call per group.
+"""
+
+import builtins
+from functools import partial
+
+import dask.array as da
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from aqua.core.histogram import bin_edges, bin_index, expand_like, format_histogram, histogram_weights
+from aqua.core.logger import log_configure
+from aqua.core.util import convert_data_units
+
+# statistics with a grouped kernel
+GROUPED_STATS = ["mean", "std", "max", "min", "sum", "histogram"]
+# how the groups are mapped on the dask blocks, see select_strategy()
+STRATEGIES = ["blockwise", "rechunk", "map-reduce"]
+# number of partial reductions of each statistic: steps, then extreme or valid values, sum and sum of squares
+_NPARTS = {"max": 2, "min": 2, "sum": 3, "mean": 3, "std": 4}
+# histogram options supported by the grouped kernel
+HISTOGRAM_KWARGS = ["range", "bins", "units", "weighted", "weights", "density", "dask"]
+
+
+def group_codes(time, resample_freq):
+    """
+    Resample group of each time step, as xarray resample does.
+
+    Args:
+        time (xr.DataArray): The time coordinate, increasing.
+        resample_freq (str): The pandas resample frequency.
+
+    Returns:
+        tuple: The group of each time step and the labels of all the groups, empty ones included.
+               None if the time axis cannot be grouped here (e.g. a non-standard calendar).
+    """
+    index = time.to_index()
+    if not isinstance(index, pd.DatetimeIndex) or not index.is_monotonic_increasing:
+        return None
+    resampler = pd.Series(np.arange(len(index)), index=index).resample(resample_freq)
+    sizes = resampler.count()
+    codes = np.repeat(np.arange(len(sizes)), sizes.to_numpy())
+    return codes, sizes.index
+
+
+def _aligned_chunks(codes, chunks):
+    """Time chunks cut on group boundaries only, close to the original chunk size."""
+    starts = np.flatnonzero(np.diff(codes, prepend=codes[0] - 1))
+    target = max(chunks)
+    aligned, first = [], 0
+    for start in starts[1:]:
+        if start - first >= target:
+            aligned.append(int(start - first))
+            first = start
+    aligned.append(int(len(codes) - first))
+    return tuple(aligned)
+
+
+def select_strategy(codes, chunks):
+    """
+    How the groups are mapped on the time chunks of dask data:
+
+    - 'blockwise' if every chunk holds whole groups, each block is reduced on its own;
+    - 'rechunk' if groups are smaller than the chunks, which are realigned on group boundaries
+      (moving only the steps across them) before the blockwise reduction;
+    - 'map-reduce' if groups span many chunks, partial reductions of each block are combined in a tree.
+
+    Args:
+        codes (np.ndarray): The group of each time step.
+        chunks (tuple): The time chunks of the data.
+
+    Returns:
+        str: The strategy.
+    """
+    bounds = np.cumsum(chunks)[:-1]
+    if np.all(codes[bounds] != codes[bounds - 1]):
+        return "blockwise"
+    largest = np.bincount(codes).max()
+    return "rechunk" if largest <= max(chunks) else "map-reduce"
+
+
+def _segments(codes):
+    """Start of each run of equal codes, and the code of each run."""
+    starts = np.flatnonzero(np.diff(codes, prepend=codes[0] - 1))
+    return starts, codes[starts]
+
+
+def _partials(values, codes, stat, start, size, edges=None, weights=None):
+    """
+    Partial reductions of the groups start to start + size of a block, with the time axis first.
+    Sums and counts are accumulated in float64.
+
+    Returns:
+        np.ndarray: The partials stacked on a leading axis (see _NPARTS), the counts of each bin for histograms.
+    """
+    if stat == "histogram":
+        nbins = len(edges) - 1
+        index = bin_index(values, edges) + (codes - start).reshape((-1,) + (1,) * (values.ndim - 1)) * (nbins + 1)
+        block_weights = None if weights is None else np.broadcast_to(weights, values.shape).ravel()
+        counts = np.bincount(index.ravel(), weights=block_weights, minlength=size * (nbins + 1))
+        return counts.reshape(1, size, nbins + 1)[..., :nbins]
+
+    partials = np.zeros((_NPARTS[stat], size) + values.shape[1:])
+    if stat in ["max", "min"]:
+        partials[1] = np.nan
+    if not len(codes):  # empty blocks, e.g. after a selection
+        return partials
+
+    starts, groups = _segments(codes)
+    groups = groups - start
+    _assign(partials[0], groups, np.diff(np.append(starts, len(codes))).reshape((-1,) + (1,) * (values.ndim - 1)), np.add)
+    if stat in ["max", "min"]:
+        ufunc = np.fmax if stat == "max" else np.fmin
+        _assign(partials[1], groups, ufunc.reduceat(values, starts, axis=0), ufunc)
+        return partials
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0).astype("float64")
+    _assign(partials[1], groups, np.add.reduceat(valid, starts, axis=0, dtype="float64"), np.add)
+    _assign(partials[2], groups, np.add.reduceat(filled, starts, axis=0), np.add)
+    if stat == "std":
+        _assign(partials[3], groups, np.add.reduceat(filled**2, starts, axis=0), np.add)
+    return partials
+
+
+def _assign(out, groups, reduced, ufunc):
+    """
+    Store the reductions of the runs in their groups, combining the runs of the same group
+    (e.g. the same month of different years) with a second segmented reduction.
+    """
+    if len(groups) > 1 and np.any(np.diff(groups) <= 0):
+        order = np.argsort(groups, kind="stable")
+        groups = groups[order]
+        starts = np.flatnonzero(np.diff(groups, prepend=groups[0] - 1))
+        reduced = ufunc.reduceat(reduced[order], starts, axis=0)
+        groups = groups[starts]
+    out[groups] = reduced
+
+
+def _finalize(partials, stat, dtype, density=False, edges=None):
+    """The statistic of each group from its partial reductions, empty groups are NaN."""
+    if stat == "histogram":
+        counts = partials[0]
+        if density:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                counts = counts / (counts.sum(axis=-1, keepdims=True) * np.diff(edges))
+        return counts
+
+    steps = partials[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if stat in ["max", "min"]:
+            result = partials[1]
+        elif stat == "sum":
+            result = np.where(steps > 0, partials[2], np.nan)
+        else:
+            mean = partials[2] / partials[1]
+            result = mean if stat == "mean" else np.sqrt(np.maximum(partials[3] / partials[1] - mean**2, 0))
+    return result.astype(dtype, copy=False)
+
+
+def _std_block(values, codes, start, size):
+    """Standard deviation of the groups of a block, from the deviations to their mean."""
+    starts, groups = _segments(codes)
+    valid = ~np.isnan(values)
+    count = np.add.reduceat(valid, starts, axis=0, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.add.reduceat(np.where(valid, values, 0), starts, axis=0, dtype="float64") / count
+        deviations = np.where(valid, values - np.repeat(mean, np.diff(np.append(starts, len(codes))), axis=0), 0)
+        std = np.sqrt(np.add.reduceat(deviations**2, starts, axis=0) / count)
+    result = np.full((size,) + values.shape[1:], np.nan)
+    result[groups - start] = std
+    return result
+
+
+def _blockwise_kernel(values, codes, *arrays, stat, dtype, edges=None, block_info=None):
+    """Statistic of the groups held by a block, with the time axis first."""
+    size = block_info[None]["chunk-shape"][0]
+    codes = codes.reshape(-1)
+    start = codes[0]
+    if stat == "std":
+        return _std_block(values, codes, start, size).astype(dtype, copy=False)
+    weights = arrays[0] if arrays else None
+    partials = _partials(values, codes, stat, start, size, edges=edges, weights=weights)
+    result = _finalize(partials, stat, dtype, edges=edges)
+    if stat == "histogram":
+        # the spatial axes of the block are kept with size one, to be summed over the blocks
+        result = result.reshape((size,) + (1,) * (values.ndim - 1) + result.shape[-1:])
+    return result
+
+
+def _map_kernel(values, codes, *arrays, stat, ngroups, edges=None):
+    """Partial reductions of all the groups in a block, with a leading axis for the block."""
+    weights = arrays[0] if arrays else None
+    partials = _partials(values, codes.reshape(-1), stat, 0, ngroups, edges=edges, weights=weights)
+    if stat == "histogram":
+        partials = partials.reshape(partials.shape[:2] + (1,) * (values.ndim - 1) + partials.shape[-1:])
+    return partials[:, None]
+
+
+def _block_arrays(values, codes, weights=None):
+    """
+    The group codes chunked as the time axis of dask data, of size one on the other axes,
+    and the weights chunked as the data where they are defined.
+    """
+    ndim = values.ndim
+    blocks = da.from_array(codes.reshape((-1,) + (1,) * (ndim - 1)), chunks=(values.chunks[0],) + ((1,),) * (ndim - 1))
+    arrays = []
+    if weights is not None:
+        chunks = tuple(c if n > 1 else (1,) for c, n in zip(values.chunks, np.shape(weights)))
+        arrays = [da.asarray(weights).rechunk(chunks)]
+    return blocks, arrays
+
+
+def _reduce(values, codes, ngroups, stat, strategy=None, edges=None, weights=None, density=False, logger=None):
+    """
+    The statistic of each group, with the time axis first.
+
+    Returns:
+        np.ndarray or da.Array: The statistic, with the groups on the first axis and, for histograms,
+                                the bins on the last axis in place of the other dimensions.
+    """
+    dtype = "float64" if stat == "histogram" else values.dtype
+    if not isinstance(values, da.Array):
+        if stat == "std":
+            return _std_block(values, codes, 0, ngroups).astype(dtype, copy=False)
+        partials = group_partials(values, codes, ngroups, stat, edges=edges, weights=weights)
+        return _finalize(partials, stat, dtype, density=density, edges=edges)
+
+    if strategy is not None and strategy not in STRATEGIES:
+        raise ValueError(f"Strategy {strategy} is not supported, use one of {STRATEGIES}")
+    selected = select_strategy(codes, values.chunks[0])
+    if strategy == "blockwise" and selected != "blockwise":
+        raise ValueError(f"Strategy blockwise needs time chunks holding whole groups, use {selected} for these chunks")
+    strategy = strategy or selected
+    if strategy == "rechunk":
+        values = values.rechunk({0: _aligned_chunks(codes, values.chunks[0])})
+        strategy = "blockwise"
+    if logger:
+        logger.debug("Reducing %d groups in %d time chunks with the %s strategy", ngroups, values.numblocks[0], strategy)
+
+    ndim = values.ndim
+    space = builtins.range(1, ndim)
+
+    if strategy == "blockwise":
+        blocks, arrays = _block_arrays(values, codes, weights)
+        # each block holds the groups from its first one to the first one of the next block
+        firsts = codes[np.cumsum((0,) + values.chunks[0])[:-1]]
+        sizes = tuple(int(n) for n in np.diff(np.append(firsts, ngroups)))
+        if stat == "histogram":
+            chunks = (sizes,) + tuple((1,) * n for n in values.numblocks[1:]) + ((len(edges) - 1,),)
+            new_axis = [ndim]
+        else:
+            chunks = (sizes,) + values.chunks[1:]
+            new_axis = None
+        result = da.map_blocks(
+            partial(_blockwise_kernel, stat=stat, dtype=dtype, edges=edges),
+            values,
+            blocks,
+            *arrays,
+            chunks=chunks,
+            new_axis=new_axis,
+            meta=np.empty((0,) * len(chunks), dtype=dtype),
+        )
+        if stat == "histogram":
+            # normalised once the blocks of each group are summed
+            result = _finalize(result.sum(axis=tuple(space))[None], stat, dtype, density=density, edges=edges)
+        return result
+
+    partials = group_partials(values, codes, ngroups, stat, edges=edges, weights=weights)
+    return da.map_blocks(
+        partial(_finalize, stat=stat, dtype=dtype, density=density, edges=edges),
+        partials,
+        drop_axis=0,
+        meta=np.empty((0,) * (partials.ndim - 1), dtype=dtype),
+    )
+
+
+def group_partials(values, codes, ngroups, stat, edges=None, weights=None):
+    """
+    Partial reductions of each group, combined over all the blocks of the data in a tree.
+    The groups can be scattered in time, e.g. the months of a climatology.
+
+    Args:
+        values (np.ndarray or da.Array): The data, with the time axis first.
+        codes (np.ndarray): The group of each time step.
+        ngroups (int): The number of groups.
+        stat (str): One of GROUPED_STATS.
+        edges (np.ndarray, optional): The edges of the bins, for histograms.
+        weights (np.ndarray or da.Array, optional): The weights broadcastable against the data, for histograms.
+
+    Returns:
+        np.ndarray or da.Array: The partials, stacked on the first axis, with the groups on the second.
+    """
+    if not isinstance(values, da.Array):
+        return _partials(values, codes, stat, 0, ngroups, edges=edges, weights=weights)
+
+    ndim = values.ndim
+    blocks, arrays = _block_arrays(values, codes, weights)
+
+    nblocks = values.numblocks[0]
+    if stat == "histogram":
+        chunks = ((1,), (1,) * nblocks, (ngroups,)) + tuple((1,) * n for n in values.numblocks[1:]) + ((len(edges) - 1,),)
+        new_axis = [0, 2, ndim + 2]
+    else:
+        chunks = ((_NPARTS[stat],), (1,) * nblocks, (ngroups,)) + values.chunks[1:]
+        new_axis = [0, 2]
+    partials = da.map_blocks(
+        _map_kernel,
+        values,
+        blocks,
+        *arrays,
+        stat=stat,
+        ngroups=ngroups,
+        edges=edges,
+        chunks=chunks,
+        new_axis=new_axis,
+        dtype="float64",
+        meta=np.empty((0,) * len(chunks)),
+    )
+    if stat in ["max", "min"]:
+        steps = partials[0].sum(axis=0)
+        extreme = (da.nanmax if stat == "max" else da.nanmin)(partials[1], axis=0)
+        partials = da.stack([steps, extreme]).rechunk({0: -1})
+    else:
+        partials = partials.sum(axis=1)
+    if stat == "histogram":
+        partials = partials.sum(axis=tuple(builtins.range(2, ndim + 1)))
+    return partials
+
+
+def supported(data, stat, kwargs=None):
+    """
+    Whether the grouped engine can compute the statistic on the data.
+
+    Args:
+        data (xr.DataArray or xr.Dataset): The data.
+        stat (str): The statistic.
+        kwargs (dict, optional): The options of the statistic.
+
+    Returns:
+        bool: True if supported.
+    """
+    kwargs = kwargs or {}
+    if stat not in GROUPED_STATS:
+        return False
+    if stat == "histogram":
+        if not set(kwargs) <= set(HISTOGRAM_KWARGS):
+            return False
+        if np.ndim(kwargs.get("bins", 10)) == 0 and kwargs.get("range") is None:
+            return False
+        if isinstance(data, xr.Dataset):
+            data = data[list(data.data_vars)[0]]
+    elif kwargs:
+        return False
+    arrays = data.data_vars.values() if isinstance(data, xr.Dataset) else [data]
+    return all("time" in array.dims and np.issubdtype(array.dtype, np.floating) for array in arrays)
+
+
+def grouped_stat(data, stat, resample_freq, strategy=None, loglevel="WARNING", **kwargs):
+    """
+    Time statistic of each resample group, computed for all the groups in a single pass.
+    The result is the same as the xarray resample reduction (or as a histogram of each group).
+
+    Args:
+        data (xr.DataArray or xr.Dataset): The data, with an increasing standard time axis.
+        stat (str): One of GROUPED_STATS.
+        resample_freq (str): The pandas resample frequency.
+        strategy (str, optional): One of STRATEGIES, chosen on the chunks of the data by default.
+        loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+        **kwargs: Options of the histogram, see aqua.core.histogram.histogram().
+
+    Returns:
+        xr.DataArray or xr.Dataset: The statistic, or None if the time axis cannot be grouped here.
+    """
+    logger = log_configure(log_level=loglevel, log_name="GroupedStat")
+    grouping = group_codes(data["time"], resample_freq)
+    if grouping is None:
+        logger.debug("Time axis cannot be grouped, falling back to xarray")
+        return None
+    codes, labels = grouping
+    keep_attrs = xr.get_options()["keep_attrs"] is True
+
+    if stat == "histogram":
+        if isinstance(data, xr.Dataset):
+            data = data[list(data.data_vars)[0]]
+        if kwargs.get("units") is not None:
+            data = convert_data_units(data, var=data.name, units=kwargs["units"], loglevel=loglevel)
+        edges = bin_edges(kwargs.get("bins", 10), kwargs.get("range"))
+        weights = histogram_weights(data, weights=kwargs.get("weights"), weighted=kwargs.get("weighted", True))
+        data = data.transpose("time", ...)
+        values = data.data if kwargs.get("dask", True) else np.asarray(data.values)
+        weights = None if weights is None else expand_like(weights, data)
+        if not isinstance(values, da.Array) and weights is not None:
+            weights = np.asarray(weights)
+        density = kwargs.get("density", False)
+        counts = _reduce(
+            values, codes, len(labels), stat, strategy=strategy, edges=edges, weights=weights, density=density, logger=logger
+        )
+        # empty groups have no histogram, as with a call per group
+        empty = np.bincount(codes, minlength=len(labels)) == 0
+        if empty.any():
+            counts = counts * np.where(empty, np.nan, 1)[:, None]
+        # metadata of the first group, as when the histograms of the groups are concatenated
+        size = np.count_nonzero(codes == 0) * data.size // data.sizes["time"]
+        template = format_histogram(np.zeros(len(edges) - 1), edges, data.attrs, size)
+        if density:  # not normalised by format_histogram, since the template has no counts
+            template.name = "pdf"
+            template.attrs["units"] = "probability density"
+            if "long_name" in data.attrs:
+                template.attrs["long_name"] = f"Pdf of {data.attrs['long_name']}"
+        return xr.DataArray(
+            counts,
+            dims=("time",) + template.dims,
+            name=template.name,
+            attrs=template.attrs,
+            coords={**template.coords, "time": labels},
+        )
+
+    def reduce(array):
+        dims = array.dims
+        array = array.transpose("time", ...)
+        result = _reduce(array.data, codes, len(labels), stat, strategy=strategy, logger=logger)
+        coords = {name: coord for name, coord in array.coords.items() if "time" not in coord.dims}
+        result = xr.DataArray(
+            result,
+            dims=array.dims,
+            coords={**coords, "time": labels},
+            name=array.name,
+            attrs=array.attrs if keep_attrs else {},
+        )
+        return result.transpose(*dims)
+
+    if isinstance(data, xr.Dataset):
+        return data.map(reduce, keep_attrs=keep_attrs)
+    return reduce(data)
@@ -1,10 +1,12 @@
 """Timmean mixin for the Reader class"""
 
+from collections import OrderedDict
 from functools import partial
 
 import numpy as np
 import pandas as pd
 import xarray as xr
+from dask.base import tokenize
 
 from aqua.core.histogram import histogram
 from aqua.core.logger import log_configure, log_history
@@ -14,18 +16,33 @@ from aqua.core.util import (
     extract_literal_and_numeric,
     fix_calendar,
     frequency_string_to_pandas,
+    to_list,
 )
 
+from .climatology import anomalies, climatology
+from .grouped import grouped_stat, supported
+
+# number of climatologies kept by TimStat
+CLIMATOLOGY_CACHE = 8
+
 
 class TimStat:
     """
     Time statistic AQUA module
     """
 
-    def __init__(self, loglevel="WARNING"):
+    def __init__(self, loglevel="WARNING", grouped=True):
+        """
+        Args:
+            loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+            grouped (bool, optional): Compute the statistics supported by the grouped engine
+                                      for all the resample groups at once. Defaults to True.
+        """
         self.loglevel = loglevel
+        self.grouped = grouped
         self.orig_freq = None
         self.logger = log_configure(loglevel, "TimStat")
+        self._climatologies = OrderedDict()  # latest climatologies, by data and options
 
     @property
     def available_stats(self):
@@ -121,8 +138,16 @@ class TimStat:
         else:
             resample_data = data
 
+        # grouped reduction of all the resample groups at once, if supported
+        out = None
+        name = "histogram" if stat is histogram else stat
+        options = {**func_kwargs, **kwargs} if name == "histogram" else {}
+        if resample_freq is not None and self.grouped and isinstance(name, str) and supported(data, name, options):
+            self.logger.info("Computing grouped %s at %s frequency...", name, str(resample_freq))
+            out = grouped_stat(data, name, resample_freq, loglevel=self.loglevel, **options)
+
         # compact call, equivalent of "out = resample_data.mean()""
-        if isinstance(stat, str):  # we already checked if it is one of the allowable stats
+        if out is None and isinstance(stat, str):  # we already checked if it is one of the allowable stats
             self.logger.info(f"Resampling to %s frequency and computing {stat}...", str(resample_freq))
             # use the kwargs to feed the time dimension to define the method and its options
             extra_kwargs = {} if resample_freq is not None else {"dim": "time"}
@@ -133,7 +158,7 @@ class TimStat:
                 resampled_times = getattr(data.time.resample(time=resample_freq), stat)(**extra_kwargs)
                 out = out.assign_coords(time=resampled_times)
 
-        else:  # we can safely assume that it is a callable function now
+        elif out is None:  # we can safely assume that it is a callable function now
             self.logger.info("Resampling to %s frequency and computing custom function...", str(resample_freq))
             if resample_freq is not None:
                 out = resample_data.map(partial(stat, **func_kwargs, **kwargs))
@@ -176,6 +201,73 @@ class TimStat:
 
         return out
 
+    def climatology(self, data, freq="monthly", stat="mean", exclude_incomplete=False, season_anchor="DEC"):
+        """
+        Compute monthly, seasonal or day-of-year climatologies in a single pass over the data.
+        Seasons are the quarters starting from season_anchor, as for timstat with freq='QS-DEC'.
+        The latest climatologies are kept, so that computing them again on the same data is free.
+
+        Args:
+            data (xarray.DataArray or xarray.Dataset): Input data, with a time dimension.
+            freq (str or list): 'monthly', 'seasonal' or 'dayofyear', or a list of them computed together.
+            stat (str): Statistic of the climatology, one of 'mean', 'std', 'max' or 'min'.
+            exclude_incomplete (bool): If True, exclude the incomplete months, seasons or days.
+            season_anchor (str): The month starting the first season.
+
+        Returns:
+            xarray.DataArray or xarray.Dataset: The climatology, with a 'month', 'season' or 'dayofyear'
+            dimension in place of time. A dictionary of them by freq if freq is a list.
+        """
+        data = fix_calendar(data, loglevel=self.loglevel)
+        options = (stat, exclude_incomplete, season_anchor)
+        token = tokenize(data)
+
+        missing = [kind for kind in to_list(freq) if (token, kind, options) not in self._climatologies]
+        if missing:
+            computed = climatology(
+                data,
+                freq=missing,
+                stat=stat,
+                anchor=season_anchor,
+                exclude_incomplete=exclude_incomplete,
+                loglevel=self.loglevel,
+            )
+            for kind, clim in computed.items():
+                clim = log_history(clim, f"{kind} climatology of {stat} by AQUA climatology")
+                self._climatologies[token, kind, options] = clim
+                while len(self._climatologies) > CLIMATOLOGY_CACHE:
+                    self._climatologies.popitem(last=False)
+
+        results = {}
+        for kind in to_list(freq):
+            self._climatologies.move_to_end((token, kind, options))
+            results[kind] = self._climatologies[token, kind, options].copy()
+        return results if isinstance(freq, list) else results[freq]
+
+    def anomalies(self, data, freq="monthly", clim=None, base_period=None, season_anchor="DEC"):
+        """
+        Compute lazily the anomalies of the data with respect to a mean climatology.
+        The climatology is computed on the base period (and kept, see climatology()) if it is not given,
+        so that anomalies of many periods never read the base period again.
+
+        Args:
+            data (xarray.DataArray or xarray.Dataset): Input data, with a time dimension.
+            freq (str): 'monthly', 'seasonal' or 'dayofyear', if the climatology is not given.
+            clim (xarray.DataArray or xarray.Dataset): The climatology, as returned by climatology().
+            base_period (tuple): The start and end dates of the base period, e.g. ('1991-01-01', '2020-12-31').
+                                 Defaults to the whole data.
+            season_anchor (str): The month starting the first season.
+
+        Returns:
+            xarray.DataArray or xarray.Dataset: The anomalies.
+        """
+        data = fix_calendar(data, loglevel=self.loglevel)
+        if clim is None:
+            base = data if base_period is None else data.sel(time=slice(*base_period))
+            clim = self.climatology(base, freq=freq, season_anchor=season_anchor)
+        out = anomalies(data, clim, anchor=season_anchor, loglevel=self.loglevel)
+        return log_history(out, "anomalies with respect to the climatology by AQUA anomalies")
+
     # this is not yet a great solution, but is more general than the previous one
     def center_time_axis(self, avg_data: xr.Dataset, resample_freq: str) -> xr.Dataset:
         """
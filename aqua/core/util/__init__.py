@@ -1,29 +1,37 @@
 """Utilities module"""
 
-from .catalog_entry import replace_intake_vars, replace_urlpath_jinja, replace_urlpath_wildcard
-from .cli_util import template_parse_arguments
-from .eccodes import get_eccodes_attr
-from .graphics import add_cyclic_lon, plot_box, minmax_maps
-from .graphics import evaluate_colorbar_limits, cbar_get_label, set_map_title
-from .graphics import coord_names, ticks_round, set_ticks, generate_colorbar_ticks
-from .graphics import apply_circular_window
-from .graphics import get_nside, get_npix, healpix_resample
-from .graphics import prettify_levels, get_decimals
-from .io_util import files_exist, create_folder, file_is_complete
-from .io_util import update_metadata
-from .projections import get_projection
-from .realizations import format_realization, get_realizations, DEFAULT_REALIZATION
-from .sci_util import lon_to_180, lon_to_360, check_coordinates
-from .sci_util import select_season, merge_attrs, find_vert_coord
-from .string import generate_random_string, strlist_to_phrase, lat_to_phrase
-from .string import clean_filename, extract_literal_and_numeric, unit_to_latex
-from .units import multiply_units, normalize_units, convert_units, convert_data_units
-from .util import expand_env_vars, extract_attrs, get_arg, to_list
-from .yaml import load_yaml, dump_yaml, load_multi_yaml
-from .time import check_chunk_completeness, frequency_string_to_pandas, pandas_freq_to_string
-from .time import time_to_string, int_month_name, xarray_to_pandas_freq, check_seasonal_chunk_completeness
-from .time import fix_calendar, default_time_unit
-from .zarr import create_zarr_reference
+from .lazy import lazy_attributes
+
+# Utilities are imported on first access: some of them (graphics, projections)
+# pull in heavy dependencies that most callers do not need.
+_LAZY_ATTRIBUTES = {
+    "replace_intake_vars": ".catalog_entry", "replace_urlpath_jinja": ".catalog_entry", "replace_urlpath_wildcard": ".catalog_entry",
+    "template_parse_arguments": ".cli_util",
+    "get_eccodes_attr": ".eccodes",
+    "add_cyclic_lon": ".graphics", "plot_box": ".graphics", "minmax_maps": ".graphics",
+    "evaluate_colorbar_limits": ".graphics", "cbar_get_label": ".graphics", "set_map_title": ".graphics",
+    "coord_names": ".graphics", "ticks_round": ".graphics", "set_ticks": ".graphics", "generate_colorbar_ticks": ".graphics",
+    "apply_circular_window": ".graphics",
+    "get_nside": ".graphics", "get_npix": ".graphics", "healpix_resample": ".graphics",
+    "prettify_levels": ".graphics", "get_decimals": ".graphics",
+    "files_exist": ".io_util", "create_folder": ".io_util", "file_is_complete": ".io_util",
+    "update_metadata": ".io_util",
+    "get_projection": ".projections",
+    "format_realization": ".realizations", "get_realizations": ".realizations", "DEFAULT_REALIZATION": ".realizations",
+    "lon_to_180": ".sci_util", "lon_to_360": ".sci_util", "check_coordinates": ".sci_util",
+    "select_season": ".sci_util", "merge_attrs": ".sci_util", "find_vert_coord": ".sci_util",
+    "generate_random_string": ".string", "strlist_to_phrase": ".string", "lat_to_phrase": ".string",
+    "clean_filename": ".string", "extract_literal_and_numeric": ".string", "unit_to_latex": ".string",
+    "multiply_units": ".units", "normalize_units": ".units", "convert_units": ".units", "convert_data_units": ".units",
+    "expand_env_vars": ".util", "extract_attrs": ".util", "get_arg": ".util", "to_list": ".util",
+    "load_yaml": ".yaml", "dump_yaml": ".yaml", "load_multi_yaml": ".yaml",
+    "check_chunk_completeness": ".time", "frequency_string_to_pandas": ".time", "pandas_freq_to_string": ".time",
+    "time_to_string": ".time", "int_month_name": ".time", "xarray_to_pandas_freq": ".time", "check_seasonal_chunk_completeness": ".time",
+    "fix_calendar": ".time", "default_time_unit": ".time",
+    "create_zarr_reference": ".zarr",
+}
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES)
 
 __all__ = ['replace_intake_vars', 'replace_urlpath_jinja', 'replace_urlpath_wildcard',
            'template_parse_arguments',
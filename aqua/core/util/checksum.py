@@ -1,84 +1,229 @@
 """checksum verification module"""
 
 import hashlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
 from aqua.core.util import to_list
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
-def compute_md5(file_path):
-    """Compute the MD5 checksum of a file."""
-    hash_md5 = hashlib.md5()
+BUFFER_SIZE = 8 * 1024 * 1024  # large reads, hashing releases the GIL on them
+DEFAULT_ALGORITHM = "md5"
+CACHE_FILE = ".checksum_cache.json"
+
+
+def _new_hash(algorithm):
+    """Return a new hash object for the selected algorithm."""
+    if algorithm == "xxh64":
+        if xxhash is None:
+            raise ImportError("The xxh64 algorithm requires the xxhash package")
+        return xxhash.xxh64()
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.new(algorithm)
+
+
+def compute_hash(file_path, algorithm=DEFAULT_ALGORITHM):
+    """Compute the checksum of a file with the selected algorithm (md5, sha1, sha256, blake2b or xxh64)."""
+    file_hash = _new_hash(algorithm)
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(BUFFER_SIZE), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
     except FileNotFoundError:
         return None
 
 
-def generate_checksums(folder, grids, output_file):
+def compute_md5(file_path):
+    """Compute the MD5 checksum of a file."""
+    return compute_hash(file_path, algorithm="md5")
+
+
+class ChecksumCache:
+    """
+    Sidecar cache of checksums, keyed by path, size, modification time and inode,
+    so that unchanged files are not hashed again.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.entries = {}
+        self.changed = False
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r", encoding="utf8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                print(f"Cannot read checksum cache {cache_file}, ignoring it")
+
+    @staticmethod
+    def _key(file_path, algorithm):
+        stat = os.stat(file_path)
+        return f"{os.path.realpath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{stat.st_ino}|{algorithm}"
+
+    def get(self, file_path, algorithm):
+        """Return the cached checksum of a file, None if missing or outdated."""
+        return self.entries.get(self._key(file_path, algorithm))
+
+    def set(self, file_path, algorithm, checksum):
+        """Store the checksum of a file."""
+        self.entries[self._key(file_path, algorithm)] = checksum
+        self.changed = True
+
+    def save(self):
+        """Write the cache to disk, if changed. A non writable cache is not an error."""
+        if not self.cache_file or not self.changed:
+            return
+        try:
+            tmpfile = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmpfile, "w", encoding="utf8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmpfile, self.cache_file)
+        except OSError as e:
+            print(f"Cannot write checksum cache {self.cache_file}: {e}")
+
+
+def compute_checksums(file_paths, algorithm=DEFAULT_ALGORITHM, nworkers=4, cache_file=None):
     """
-    Generate MD5 checksums for all files in a folder.
+    Compute the checksums of a list of files with a thread pool, skipping the files found in the cache.
+
+    Args:
+        file_paths (list): the files to be hashed
+        algorithm (str): the hash algorithm. Defaults to 'md5'.
+        nworkers (int): the number of threads. Defaults to 4.
+        cache_file (str, optional): the sidecar cache file. Defaults to None, no cache.
+
+    Returns:
+        dict: the checksum of each file, None for missing files
+    """
+    cache = ChecksumCache(cache_file)
+    checksums = {}
+    to_hash = []
+    for file_path in file_paths:
+        cached = cache.get(file_path, algorithm) if os.path.exists(file_path) else None
+        if cached:
+            checksums[file_path] = cached
+        else:
+            to_hash.append(file_path)
+
+    def _hash(file_path):
+        print(f"Computing checksum for {file_path}")
+        return compute_hash(file_path, algorithm=algorithm)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=nworkers) as executor:
+        for file_path, checksum in zip(to_hash, executor.map(_hash, to_hash)):
+            checksums[file_path] = checksum
+            if checksum:
+                cache.set(file_path, algorithm, checksum)
+    elapsed = time.perf_counter() - start
+
+    size = sum(os.path.getsize(file_path) for file_path in to_hash if checksums[file_path])
+    print(
+        f"Hashed {len(to_hash)} files ({size / 2**30:.2f} GiB) in {elapsed:.1f}s "
+        f"({size / 2**20 / max(elapsed, 1e-6):.1f} MiB/s), {len(file_paths) - len(to_hash)} files from cache"
+    )
+
+    cache.save()
+    return checksums
+
+
+def generate_checksums(folder, grids, output_file, algorithm=DEFAULT_ALGORITHM, nworkers=4, cache_file=None):
+    """
+    Generate checksums for all files in a folder.
     Will scan the main folder and the subfolder list and will store the data
-    in a output_file
+    in a output_file. Unchanged files are read from the cache (by default in the folder).
     """
 
     print(f"Generating datachecker to {output_file}...")
+    if cache_file is None:
+        cache_file = os.path.join(folder, CACHE_FILE)
+
+    file_paths = []
+    for grid_path in sorted(grids):
+        subdir_path = os.path.join(folder, grid_path)
+        if os.path.isdir(subdir_path):
+            for root, _, files in os.walk(subdir_path):
+                for file in sorted(files):
+                    if file.startswith(CACHE_FILE):
+                        continue
+                    file_paths.append(os.path.join(root, file))
+
+    checksums = compute_checksums(file_paths, algorithm=algorithm, nworkers=nworkers, cache_file=cache_file)
+
     current_date = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
     with open(output_file, "w", encoding="utf8") as f:
-        f.write("# MD5 checksum file for AQUA\n")
+        f.write(f"# {algorithm.upper()} checksum file for AQUA\n")
         f.write(f"# Folder: {folder}\n")
+        f.write(f"# Algorithm: {algorithm}\n")
         f.write(f"# Generated by AQUA checksum checker on {current_date} \n\n")
 
-        for grid_path in sorted(grids):
-            subdir_path = os.path.join(folder, grid_path)
-            if os.path.isdir(subdir_path):
-                for root, _, files in os.walk(subdir_path):
-                    for file in sorted(files):
-                        file_path = os.path.join(root, file)
-                        print(f"Computing checksum for {file_path}")
-                        md5_checksum = compute_md5(file_path)
-                        if md5_checksum:
-                            relative_path = os.path.relpath(file_path, folder)
-                            f.write(f"{md5_checksum} {relative_path}\n")
+        for file_path in file_paths:
+            if checksums[file_path]:
+                relative_path = os.path.relpath(file_path, folder)
+                f.write(f"{checksums[file_path]} {relative_path}\n")
     print(f"Checksum file created at {output_file}")
 
 
-def verify_checksums(folder, grids, checksum_file):
-    """Verify files against MD5 checksums in the checksum file."""
+def verify_checksums(folder, grids, checksum_file, nworkers=4, cache_file=None):
+    """
+    Verify files against checksums in the checksum file.
+    The algorithm is read from the file header (MD5 if not specified).
+    Unchanged files are read from the cache (by default in the folder).
+    """
 
     if isinstance(grids, str):
         if not os.path.exists(os.path.join(folder, grids)):
             raise FileNotFoundError(f"No {grids} directory found in {folder}!")
+    if cache_file is None:
+        cache_file = os.path.join(folder, CACHE_FILE)
 
     try:
         with open(checksum_file, "r", encoding="utf8") as f:
-            print(f"Starting verification against {checksum_file}. It will take a while...")
-            all_good = True
-            for line in f:
-                if line.startswith("#") or not line.strip():
-                    continue
-                md5_checksum, relative_path = line.strip().split(" ", 1)
-                relative_dir = os.path.dirname(relative_path)
-                if relative_dir in to_list(grids):
-                    file_path = os.path.join(folder, relative_path)
-                    print(file_path)
-                    if not os.path.exists(file_path):
-                        print(f"Missing file: {relative_path}!!")
-                        all_good = False
-                    else:
-                        computed_md5 = compute_md5(file_path)
-                        if computed_md5 != md5_checksum:
-                            print(f"Checksum mismatch for {relative_path}")
-                            all_good = False
-            if all_good:
-                print("All files are verified successfully.")
-            else:
-                sys.exit("Verification failed.")
+            lines = f.readlines()
     except FileNotFoundError:
         sys.exit(f"Checksum file {checksum_file} not found.")
+
+    print(f"Starting verification against {checksum_file}...")
+    algorithm = DEFAULT_ALGORITHM
+    expected = {}
+    for line in lines:
+        if line.startswith("# Algorithm:"):
+            algorithm = line.split(":", 1)[1].strip()
+        if line.startswith("#") or not line.strip():
+            continue
+        checksum, relative_path = line.strip().split(" ", 1)
+        relative_dir = os.path.dirname(relative_path)
+        if relative_dir in to_list(grids):
+            expected[relative_path] = checksum
+
+    all_good = True
+    existing = {}
+    for relative_path in expected:
+        file_path = os.path.join(folder, relative_path)
+        if not os.path.exists(file_path):
+            print(f"Missing file: {relative_path}!!")
+            all_good = False
+        else:
+            existing[file_path] = relative_path
+
+    checksums = compute_checksums(list(existing), algorithm=algorithm, nworkers=nworkers, cache_file=cache_file)
+    for file_path, relative_path in existing.items():
+        if checksums[file_path] != expected[relative_path]:
+            print(f"Checksum mismatch for {relative_path}")
+            all_good = False
+
+    if all_good:
+        print("All files are verified successfully.")
+    else:
+        sys.exit("Verification failed.")
@@ -0,0 +1,31 @@
+"""Module level lazy attributes (PEP 562)"""
+
+import importlib
+
+
+def lazy_attributes(package, attributes):
+    """
+    Build the module level ``__getattr__`` and ``__dir__`` functions
+    to import the public attributes of a package only on first access.
+
+    Args:
+        package (str): The name of the package defining the attributes, i.e. ``__name__``.
+        attributes (dict): Mapping from the attribute name to the (relative) module defining it.
+
+    Returns:
+        tuple: The ``__getattr__`` and ``__dir__`` functions to be bound in the package namespace.
+    """
+    module = importlib.import_module(package)
+
+    def _getattr(name):
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name], package), name)
+        # cache the attribute so that _getattr is not called again
+        setattr(module, name, value)
+        return value
+
+    def _dir():
+        return sorted(set(vars(module)) | set(attributes))
+
+    return _getattr, _dir
@@ -1,13 +1,18 @@
+import logging
 import os
+from functools import cache, lru_cache
 
 import xarray as xr
 from metpy.units import units
 
-from aqua.core.configurer import ConfigPath
+from aqua.core.configurer import ConfigLocator
 from aqua.core.logger import log_configure, log_history
 
 from .yaml import load_yaml
 
+# maximum number of unit strings and conversion plans kept in memory
+UNITS_CACHE_SIZE = 512
+
 
 def normalize_units(src, loglevel="WARNING"):
     """
@@ -19,29 +24,56 @@ def normalize_units(src, loglevel="WARNING"):
     logger = log_configure(loglevel, "normalize_units")
     src = str(src)
 
-    config_folder = ConfigPath().get_config_dir()
+    # the locator only resolves the configuration folder, without loading the config file
+    config_folder = ConfigLocator().configdir
     config_folder = os.path.join(config_folder, "fixes")
     default_file = os.path.join(config_folder, "default.yaml")
 
-    if not os.path.exists(default_file):
-        raise FileNotFoundError(f"Cannot find default.yaml in {config_folder}")
+    fixed = _normalize_units(src, default_file)
+    if fixed != src:
+        logger.info("Replacing non-metpy unit %s with %s", src, fixed)
+    return fixed
 
-    default_dict = load_yaml(default_file)
-    fix_units = default_dict["defaults"]["units"]["fix"]
+
+@lru_cache(maxsize=UNITS_CACHE_SIZE)
+def _normalize_units(src, default_file):
+    """
+    Cached replacement of a unit string with the one defined in the default.yaml fix file
+
+    Arguments:
+        src (str): input unit to be fixed
+        default_file (str): path to the default.yaml fix file
+    """
+    fix_units = _load_fix_units(default_file)
     for key in fix_units:
         if key == src:
             # return fixed
-            logger.info("Replacing non-metpy unit %s with %s", key, fix_units[key])
             return src.replace(key, fix_units[key])
 
     # return original
     return src
 
 
+@cache
+def _load_fix_units(default_file):
+    """
+    Load the unit fixes from the default.yaml fix file (cached once per file).
+
+    Arguments:
+        default_file (str): path to the default.yaml fix file
+    """
+    if not os.path.exists(default_file):
+        raise FileNotFoundError(f"Cannot find default.yaml in {os.path.dirname(default_file)}")
+
+    default_dict = load_yaml(default_file)
+    return default_dict["defaults"]["units"]["fix"]
+
+
 def convert_units(src, dst, deltat=None, var="input var", loglevel="WARNING"):
     """
     Converts source to destination units using metpy.
     Returns a dictionary with conversion factors and offsets.
+    The conversion plan is computed once for each (src, dst, deltat) and then cached.
 
     Arguments:
         src (str): Source units.
@@ -57,41 +89,60 @@ def convert_units(src, dst, deltat=None, var="input var", loglevel="WARNING"):
     logger = log_configure(loglevel, "convert_units")
     src = normalize_units(src, loglevel)
     dst = normalize_units(dst, loglevel)
+
+    conversion, notes = _conversion_plan(src, dst, deltat)
+    for level, msg, args in notes:
+        logger.log(level, msg, var, *args)
+
+    # a copy is returned since the plan is cached
+    return dict(conversion)
+
+
+@lru_cache(maxsize=UNITS_CACHE_SIZE)
+def _conversion_plan(src, dst, deltat=None):
+    """
+    Compute the conversion plan between two normalized units.
+
+    Arguments:
+        src (str): Normalized source units.
+        dst (str): Normalized destination units.
+        deltat (float, optional): Time delta in seconds (needed for some unit conversions).
+
+    Returns:
+        tuple: The conversion dictionary and a tuple of (loglevel, message, args) notes,
+               each message being formatted with the variable name followed by args.
+    """
     factor = units(src).to_base_units() / units(dst).to_base_units()
 
     # Dictionary for storing conversion attributes
     conversion = {}
+    notes = []
 
     # Flag for time-dependent conversions
     if "second" in str(factor.units) and deltat is not None:
         conversion["time_conversion_flag"] = 1
         conversion["deltat"] = str(deltat)
     elif "second" in str(factor.units) and deltat is None:
-        logger.warning("Time-dependent conversion factor detected, but no accumulation time provided")
+        notes.append((logging.WARNING, "%s: time-dependent conversion factor detected, but no accumulation time provided", ()))
 
     if factor.units == units("dimensionless"):
         offset = (0 * units(src)).to(units(dst)) - (0 * units(dst))
     else:
         if factor.units == "meter ** 3 / kilogram":
             factor *= 1000 * units("kg m-3")
-            if logger:
-                logger.debug("%s: corrected multiplying by density of water 1000 kg m-3", var)
+            notes.append((logging.DEBUG, "%s: corrected multiplying by density of water 1000 kg m-3", ()))
         elif factor.units == "meter ** 3 * second / kilogram":
             factor *= 1000 * units("kg m-3") / (deltat * units("s"))
-            if logger:
-                logger.debug("%s: corrected multiplying by density of water 1000 kg m-3", var)
-                logger.info("%s: corrected dividing by accumulation time %s s", var, deltat)
+            notes.append((logging.DEBUG, "%s: corrected multiplying by density of water 1000 kg m-3", ()))
+            notes.append((logging.INFO, "%s: corrected dividing by accumulation time %s s", (deltat,)))
         elif factor.units == "second":
             factor /= deltat * units("s")
-            if logger:
-                logger.debug("%s: corrected dividing by accumulation time %s s", var, deltat)
+            notes.append((logging.DEBUG, "%s: corrected dividing by accumulation time %s s", (deltat,)))
         elif factor.units == "kilogram / meter ** 3":
             factor /= 1000 * units("kg m-3")
-            if logger:
-                logger.debug("%s: corrected dividing by density of water 1000 kg m-3", var)
+            notes.append((logging.DEBUG, "%s: corrected dividing by density of water 1000 kg m-3", ()))
         else:
-            if logger:
-                logger.debug("%s: incommensurate units converting %s to %s --> %s", var, src, dst, factor.units)
+            notes.append((logging.DEBUG, "%s: incommensurate units converting %s to %s --> %s", (src, dst, str(factor.units))))
         offset = 0 * units(dst)
 
     # Store non-default conversion factors and offsets
@@ -100,7 +151,7 @@ def convert_units(src, dst, deltat=None, var="input var", loglevel="WARNING"):
     elif factor.magnitude != 1:
         conversion["factor"] = factor.magnitude
 
-    return conversion
+    return conversion, tuple(notes)
 
 
 def convert_data_units(data, var: str, units: str, loglevel: str = "WARNING"):
@@ -166,6 +217,12 @@ def multiply_units(unit1: str, unit2: str, normalise_units=True, to_base_units=T
     unit1 = normalize_units(unit1, loglevel) if normalise_units else unit1
     unit2 = normalize_units(unit2, loglevel) if normalise_units else unit2
 
+    return _multiply_units(unit1, unit2, to_base_units)
+
+
+@lru_cache(maxsize=UNITS_CACHE_SIZE)
+def _multiply_units(unit1: str, unit2: str, to_base_units=True) -> str:
+    """Cached product of two (already normalized) unit strings."""
     result = units(unit1) * units(unit2)
 
     result = result.to_base_units() if to_base_units else result
@@ -2,15 +2,20 @@
 
 import json
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 
+import fsspec
 import xarray as xr
+from fsspec.implementations.reference import LazyReferenceMapper
 from kerchunk.combine import MultiZarrToZarr
+from kerchunk.df import refs_to_dataframe
 from kerchunk.hdf import SingleHdf5ToZarr
 
 from aqua.core.logger import log_configure
 
 
-def create_zarr_reference(filelist, outfile, loglevel="WARNING"):
+def create_zarr_reference(filelist, outfile, loglevel="WARNING", nprocs=1, update=False, parquet=False):
     """
     Create a Zarr file from a list of HDF5/NetCDF files.
 
@@ -18,24 +23,51 @@ def create_zarr_reference(filelist, outfile, loglevel="WARNING"):
         filelist (list): A list of file paths to HDF5 files.
         outfile (str): The path to the output Zarr file.
         loglevel (str, optional): The log level for logging. Defaults to 'WARNING'.
+        nprocs (int, optional): Number of processes used to translate the files. Defaults to 1.
+        update (bool, optional): If True and outfile exists, translate only the files which are not
+                                 yet referenced and merge them into the existing reference. Defaults to False.
+        parquet (bool, optional): If True, write the reference in the compact Parquet format
+                                  (outfile is a directory) instead of JSON. Defaults to False.
 
     Returns:
-        None
+        The path to the output file, None if the reference cannot be created
     """
 
     logger = log_configure(log_level=loglevel, log_name="Zarr reference creator")
-    data = xr.open_mfdataset(filelist, combine="by_coords")
-    identical_coords = [coord for coord in data.coords if coord != "time"]
+    filelist = sorted(filelist)
+
+    existing = None
+    if update and os.path.exists(outfile):
+        existing = _load_reference(outfile, parquet=parquet)
+        referenced = _referenced_files(existing)
+        filelist = [filepath for filepath in filelist if filepath not in referenced]
+        logger.info("Updating Zarr reference %s with %d new files", outfile, len(filelist))
+        if not filelist:
+            return outfile
+
+    # coordinates are taken from a single file, the time axis is the only one to be concatenated
+    with xr.open_dataset(filelist[0]) as data:
+        identical_coords = [coord for coord in data.coords if coord != "time"]
     logger.debug("Common coordinates: %s", identical_coords)
 
     logger.debug("Creating Zarr file from %s", filelist)
-    singles = [SingleHdf5ToZarr(filepath, inline_threshold=0).translate() for filepath in sorted(filelist)]
+    if nprocs > 1 and len(filelist) > 1:
+        with ProcessPoolExecutor(max_workers=nprocs) as executor:
+            singles = list(executor.map(_translate_file, filelist))
+    else:
+        singles = [_translate_file(filepath) for filepath in filelist]
+
+    if existing is not None:
+        singles.insert(0, existing)
 
     logger.debug("Combining Zarr files")
+    # data are never inlined, so that the referenced files can be found for incremental updates
     mzz = MultiZarrToZarr(
         singles,
         concat_dims=["time"],
         identical_dims=identical_coords,
+        coo_map={"time": "cf:time"},
+        inline_threshold=0,
     )
 
     logger.debug("Translating Zarr files to json")
@@ -46,11 +78,37 @@ def create_zarr_reference(filelist, outfile, loglevel="WARNING"):
         logger.error(e)
         return None
 
-    # Dump to file
-    logger.info("Dumping to file JSON %s", outfile)
-    if os.path.exists(outfile):
-        os.remove(outfile)
-    with open(outfile, "w") as file:
-        json.dump(out, file)
+    # Dump to a temporary file and then replace the old one, so that readers never see a partial reference
+    tmpfile = f"{outfile}.{os.getpid()}.tmp"
+    if parquet:
+        logger.info("Dumping to Parquet %s", outfile)
+        refs_to_dataframe(out, tmpfile)
+        if os.path.exists(outfile):
+            shutil.rmtree(outfile)
+        os.rename(tmpfile, outfile)
+    else:
+        logger.info("Dumping to file JSON %s", outfile)
+        with open(tmpfile, "w") as file:
+            json.dump(out, file)
+        os.replace(tmpfile, outfile)
 
     return outfile
+
+
+def _translate_file(filepath):
+    """Translate a single HDF5/NetCDF file to Zarr references"""
+    return SingleHdf5ToZarr(filepath, inline_threshold=0).translate()
+
+
+def _load_reference(outfile, parquet=False):
+    """Load an existing JSON or Parquet reference as a dictionary"""
+    if parquet:
+        mapper = LazyReferenceMapper(outfile, fs=fsspec.filesystem("file"))
+        return {"version": 1, "refs": {key: mapper[key] for key in mapper if key != ".zmetadata"}}
+    with open(outfile, "r") as file:
+        return json.load(file)
+
+
+def _referenced_files(reference):
+    """Return the set of files referenced by a Zarr reference"""
+    return {value[0] for value in reference["refs"].values() if isinstance(value, list)}
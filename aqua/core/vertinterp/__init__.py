@@ -0,0 +1,4 @@
+"""Vertical interpolation module."""
+from .vertinterp import METHODS, level_weights, vertinterp
+
+__all__ = ['METHODS', 'level_weights', 'vertinterp']
@@ -0,0 +1,193 @@
+"""
+Vertical interpolation by gather and blend of the bracketing levels.
+The bracketing indices and weights are computed once for each pair of source and target levels,
+and applied blockwise along the vertical axis to all the variables.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import xarray as xr
+
+from aqua.core.logger import log_configure
+
+# methods supported by the gather and blend engine
+METHODS = ["linear", "nearest"]
+
+# name of the vertical dimension while it is interpolated
+_TARGET_DIM = "__target_level__"
+
+
+def _column_weights(levels, targets, method="linear", log=False):
+    """
+    Bracketing indices and weights of the target levels in monotonic columns of levels.
+
+    Args:
+        levels (np.ndarray): The source levels, with the vertical axis last.
+                             Each column has to be monotonic, increasing or decreasing.
+        targets (np.ndarray): The target levels, 1D.
+        method (str, optional): 'linear' or 'nearest'. Defaults to 'linear'.
+        log (bool, optional): Interpolate in the logarithm of the levels (e.g. of pressure). Defaults to False.
+
+    Returns:
+        tuple: The lower and upper indices, the weight of the upper level and a mask of the targets
+               within the levels, each with the shape of the columns and the target levels last.
+    """
+    levels = np.asarray(levels, dtype="float64")
+    targets = np.asarray(targets, dtype="float64")
+    if log:
+        levels, targets = np.log(levels), np.log(targets)
+    nlev = levels.shape[-1]
+
+    # decreasing columns are flipped in sign, so that their indices are kept
+    sign = np.where(levels[..., :1] > levels[..., -1:], -1.0, 1.0)
+    levels = levels * sign
+    targets = targets * sign
+
+    # number of levels below each target, i.e. the index of the upper bracketing level
+    upper = (levels[..., None, :] <= targets[..., :, None]).sum(axis=-1)
+    lower = np.clip(upper - 1, 0, max(nlev - 2, 0))
+    upper = np.minimum(lower + 1, nlev - 1)
+
+    lower_levels = np.take_along_axis(levels, lower, axis=-1)
+    upper_levels = np.take_along_axis(levels, upper, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.nan_to_num((targets - lower_levels) / (upper_levels - lower_levels))
+    if method == "nearest":
+        # ties to the lower level, as scipy does
+        weight = (weight > 0.5).astype("float64")
+
+    valid = (targets >= levels[..., :1]) & (targets <= levels[..., -1:])
+    return lower, upper, weight, valid
+
+
+@lru_cache(maxsize=64)
+def level_weights(levels, targets, method="linear", log=False):
+    """
+    Bracketing indices and weights of the target levels in 1D source levels, cached.
+
+    Args:
+        levels (tuple): The source levels, in any order.
+        targets (tuple): The target levels.
+        method (str, optional): 'linear' or 'nearest'. Defaults to 'linear'.
+        log (bool, optional): Interpolate in the logarithm of the levels. Defaults to False.
+
+    Returns:
+        tuple: The lower and upper indices in the source levels, the weight of the upper level
+               and a mask of the targets within the source levels.
+    """
+    levels = np.asarray(levels, dtype="float64")
+    order = np.argsort(levels, kind="stable")
+    lower, upper, weight, valid = _column_weights(levels[order], targets, method=method, log=log)
+    return order[lower], order[upper], weight, valid
+
+
+def _blend(values, lower, upper, weight, valid):
+    """Gather the bracketing levels along the last axis and blend them."""
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype("float64")
+    weight = weight.astype(values.dtype)
+    if lower.ndim == 1:
+        # the vertical axis is moved last as a view: gathering whole levels is much faster
+        levels = np.moveaxis(values, -1, 0)
+        shape = (-1,) + (1,) * (levels.ndim - 1)
+        result = levels[lower] * (1 - weight).reshape(shape) + levels[upper] * weight.reshape(shape)
+        result[~valid] = np.nan
+        return np.moveaxis(result, 0, -1)
+    result = np.take_along_axis(values, lower, axis=-1) * (1 - weight)
+    result += np.take_along_axis(values, upper, axis=-1) * weight
+    return np.where(valid, result, np.nan).astype(values.dtype, copy=False)
+
+
+def _interp_block(values, lower, upper, weight, valid):
+    """Interpolate a block with the vertical axis last, with precomputed weights."""
+    return _blend(values, lower, upper, weight, valid)
+
+
+def _interp_columns_block(values, levels, targets, method, log):
+    """Interpolate a block with the vertical axis last, on the levels of each column."""
+    lower, upper, weight, valid = _column_weights(levels, targets, method=method, log=log)
+    if levels.ndim > 1:
+        # levels may lack some dimensions of the data (e.g. time), or the other way round:
+        # the weights are computed once and broadcast
+        shape = np.broadcast_shapes(values.shape[:-1], levels.shape[:-1])
+        values = np.broadcast_to(values, shape + values.shape[-1:])
+        lower, upper, weight, valid = (
+            np.broadcast_to(array, shape + array.shape[-1:]) for array in (lower, upper, weight, valid)
+        )
+    return _blend(values, lower, upper, weight, valid)
+
+
+def vertinterp(data, levels, vert_coord="plev", method="linear", log=False, pressure=None, loglevel="WARNING"):
+    """
+    Interpolate data on the target vertical levels, gathering and blending the bracketing levels.
+    Values outside the source levels are NaN.
+
+    Args:
+        data (xr.DataArray or xr.Dataset): The data, only the variables with vert_coord are interpolated.
+        levels (float or list): The target levels, in the units of the vertical coordinate (or of pressure).
+        vert_coord (str, optional): The vertical dimension. Defaults to 'plev'.
+        method (str, optional): 'linear' or 'nearest'. Defaults to 'linear'.
+        log (bool, optional): Interpolate in the logarithm of the levels, e.g. log-pressure. Defaults to False.
+        pressure (xr.DataArray, optional): The levels of each column (e.g. the pressure of hybrid levels),
+                                           along vert_coord and broadcastable against the data.
+                                           Defaults to None, using the vert_coord values.
+        loglevel (str, optional): Logging level. Defaults to 'WARNING'.
+
+    Returns:
+        xr.DataArray or xr.Dataset: The interpolated data, with vert_coord holding the target levels.
+    """
+    logger = log_configure(log_level=loglevel, log_name="VertInterp")
+    if method not in METHODS:
+        raise ValueError(f"Method {method} is not supported, use one of {METHODS}")
+
+    if isinstance(data, xr.Dataset):
+        selected = [var for var in data.data_vars if vert_coord in data[var].dims]
+        return data[selected].map(
+            vertinterp,
+            keep_attrs=True,
+            levels=levels,
+            vert_coord=vert_coord,
+            method=method,
+            log=log,
+            pressure=pressure,
+            loglevel=loglevel,
+        )
+
+    scalar = np.ndim(levels) == 0
+    targets = np.atleast_1d(np.asarray(levels, dtype="float64"))
+    dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.dtype("float64")
+
+    # auxiliary coordinates along the vertical cannot be kept
+    dropped = [coord for coord in data.coords if coord != vert_coord and vert_coord in data[coord].dims]
+    data = data.drop_vars(dropped)
+    coord = data[vert_coord]
+
+    common = {
+        "input_core_dims": [[vert_coord]],
+        "output_core_dims": [[_TARGET_DIM]],
+        "dask": "parallelized",
+        "output_dtypes": [dtype],
+        "dask_gufunc_kwargs": {"output_sizes": {_TARGET_DIM: len(targets)}, "allow_rechunk": True},
+        "keep_attrs": True,
+    }
+    if pressure is None:
+        lower, upper, weight, valid = level_weights(
+            tuple(coord.values.tolist()), tuple(targets.tolist()), method=method, log=log
+        )
+        logger.debug("Interpolating %s from %d to %d levels", data.name, coord.size, len(targets))
+        result = xr.apply_ufunc(
+            _interp_block, data, kwargs={"lower": lower, "upper": upper, "weight": weight, "valid": valid}, **common
+        )
+    else:
+        logger.debug("Interpolating %s on the levels of each column to %d levels", data.name, len(targets))
+        common["input_core_dims"] = [[vert_coord], [vert_coord]]
+        result = xr.apply_ufunc(
+            _interp_columns_block, data, pressure, kwargs={"targets": targets, "method": method, "log": log}, **common
+        )
+
+    result = result.rename({_TARGET_DIM: vert_coord}).assign_coords({vert_coord: (vert_coord, targets, coord.attrs)})
+    result = result.transpose(*data.dims, ...)
+    if scalar:
+        result = result.isel({vert_coord: 0})
+    return result
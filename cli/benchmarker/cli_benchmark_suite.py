@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AQUA offline benchmark suite.
+
+Synthetic regular, HEALPix and curvilinear datasets are generated in a work folder
+together with a local catalog, and the core pipeline (Reader initialization, fixer,
+data model, regridding, field and time statistics, histogram, vertical interpolation,
+streaming and DROP writers) is timed across dataset sizes and dask worker counts.
+Results are written as JSON and can be compared against a stored baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import dask
+import synthetic
+
+LOGLEVEL = "ERROR"
+DROP_FORMATS = ["netcdf", "zarr"]
+
+
+def parse_arguments(arguments):
+    """
+    Parse command line arguments for the benchmark suite
+    """
+
+    parser = argparse.ArgumentParser(description="AQUA offline benchmark suite")
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=str,
+        default="small",
+        help=f"comma separated dataset sizes among {list(synthetic.SIZES)} [default: small]",
+    )
+    parser.add_argument(
+        "-g", "--grids", type=str, default=",".join(synthetic.GRIDS), help="comma separated grids [default: all]"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=str,
+        default="1",
+        help="comma separated numbers of dask workers, 1 uses the synchronous scheduler [default: 1]",
+    )
+    parser.add_argument("-b", "--benchmarks", type=str, default=None, help="comma separated benchmarks to run [default: all]")
+    parser.add_argument("-n", "--nrepeat", type=int, default=3, help="number of repetitions [default: 3]")
+    parser.add_argument("-o", "--output", type=str, default="benchmark.json", help="output JSON file")
+    parser.add_argument("--baseline", type=str, default=None, help="baseline JSON file to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="relative slowdown with respect to the baseline flagged as regression [default: 0.2]",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=str,
+        default=None,
+        help="folder for synthetic data and configuration, reused across runs [default: temporary]",
+    )
+    parser.add_argument("-l", "--loglevel", type=str, default="WARNING", help="log level [default: WARNING]")
+
+    return parser.parse_args(arguments)
+
+
+class SkipBenchmark(Exception):  # noqa: N818 - a signal, not an error
+    """Raised when preparing a benchmark that cannot run here, e.g. without CDO"""
+
+
+def time_function(func, nrepeat):
+    """Run a function nrepeat times and return the elapsed times in seconds"""
+    times = []
+    for _ in range(nrepeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+class BenchmarkSuite:
+    """
+    Run the AQUA benchmarks on the synthetic datasets of a given grid and size.
+
+    Attributes:
+        grid (str): the synthetic grid
+        size (str): the dataset size
+        workdir (str): the folder with synthetic data, used for DROP outputs
+        nrepeat (int): the number of repetitions of each benchmark
+        regrid (bool): whether regridding benchmarks can be run (CDO is available)
+    """
+
+    def __init__(self, grid, size, workdir, nrepeat=3, regrid=False, loglevel="WARNING"):
+        # imported here so that AQUA_CONFIG is set before any configuration is read
+        from aqua.core.logger import log_configure
+
+        self.grid = grid
+        self.size = size
+        self.workdir = workdir
+        self.nrepeat = nrepeat
+        self.regrid = regrid
+        self.source = synthetic.source_name(grid, size)
+        self.logger = log_configure(loglevel, "Benchmark")
+
+    @property
+    def benchmarks(self):
+        """Available benchmarks and the method preparing them"""
+        benchmarks = {
+            "reader_init": self.bench_reader_init,
+            "retrieve": self.bench_retrieve,
+            "retrieve_cached": self.bench_retrieve_cached,
+            "fixer": self.bench_fixer,
+            "datamodel": self.bench_datamodel,
+            "regrid_weights": self.bench_regrid_weights,
+            "regrid": self.bench_regrid,
+            "fldmean": self.bench_fldmean,
+            "timmean": self.bench_timmean,
+            "timmean_exclude_incomplete": self.bench_timmean_exclude_incomplete,
+            "histogram": self.bench_histogram,
+            "vertinterp": self.bench_vertinterp,
+            "vertinterp_xarray": self.bench_vertinterp_xarray,
+            "streaming": self.bench_streaming,
+        }
+        for output_format in DROP_FORMATS:
+            benchmarks[f"drop_{output_format}"] = self.bench_drop
+        return benchmarks
+
+    def reader(self, **kwargs):
+        """Create a Reader on the synthetic source"""
+        from aqua import Reader
+
+        return Reader(model=synthetic.MODEL, exp=synthetic.EXP, source=self.source, loglevel=LOGLEVEL, **kwargs)
+
+    def run(self, name, workers):
+        """
+        Run a single benchmark.
+
+        Returns:
+            dict: the benchmark result, with status 'skipped' if the benchmark cannot run here
+        """
+        result = {"benchmark": name, "grid": self.grid, "size": self.size, "workers": workers}
+        try:
+            func = self.benchmarks[name](name=name, workers=workers)
+        except SkipBenchmark as e:
+            self.logger.warning("Skipping %s on %s: %s", name, self.source, e)
+            return {**result, "status": "skipped", "reason": str(e)}
+
+        # a first untimed call, so that imports and caches are not part of the measure
+        func()
+        times = time_function(func, self.nrepeat)
+        self.logger.info("%s on %s with %d workers: %.3fs", name, self.source, workers, statistics.median(times))
+        return {
+            **result,
+            "status": "ok",
+            "nrepeat": self.nrepeat,
+            "median": statistics.median(times),
+            "min": min(times),
+            "times": times,
+        }
+
+    def bench_reader_init(self, **kwargs):
+        return self.reader
+
+    def bench_retrieve(self, **kwargs):
+        # without the retrieve cache, otherwise every repetition after the warm-up is a cache hit
+        reader = self.reader(retrieve_cache=0)
+        return reader.retrieve
+
+    def bench_retrieve_cached(self, **kwargs):
+        reader = self.reader()
+        return reader.retrieve
+
+    def bench_fixer(self, **kwargs):
+        reader = self.reader()
+        raw = self.reader(fix=False, datamodel=False).retrieve().load()
+        return lambda: reader.fixer.fixer(raw, None)
+
+    def bench_datamodel(self, **kwargs):
+        reader = self.reader()
+        raw = self.reader(fix=False, datamodel=False).retrieve().load()
+        return lambda: reader.datamodel.apply(raw)
+
+    def bench_regrid_weights(self, **kwargs):
+        if not self.regrid:
+            raise SkipBenchmark("CDO is not available")
+        return lambda: self.reader(regrid="r200", rebuild=True)
+
+    def bench_regrid(self, **kwargs):
+        if not self.regrid:
+            raise SkipBenchmark("CDO is not available")
+        reader = self.reader(regrid="r200")
+        data = reader.retrieve(var="2t")
+        return lambda: reader.regrid(data).compute()
+
+    def bench_fldmean(self, **kwargs):
+        from aqua import FldStat
+
+        _, dims, _ = synthetic.grid_coords(self.grid, self.size)
+        fldstat = FldStat(area=synthetic.grid_area(self.grid, self.size), horizontal_dims=list(dims), loglevel=LOGLEVEL)
+        data = self.reader().retrieve(var="2t")
+        return lambda: fldstat.fldstat(data, stat="mean").compute()
+
+    def bench_timmean(self, **kwargs):
+        reader = self.reader()
+        data = reader.retrieve(var="2t")
+        return lambda: reader.timstat(data, stat="mean", freq="monthly").compute()
+
+    def bench_timmean_exclude_incomplete(self, **kwargs):
+        reader = self.reader()
+        # the first month is incomplete and will be dropped
+        data = reader.retrieve(var="2t").isel(time=slice(10, None))
+        return lambda: reader.timstat(data, stat="mean", freq="monthly", exclude_incomplete=True).compute()
+
+    def bench_histogram(self, **kwargs):
+        reader = self.reader()
+        data = reader.retrieve(var="2t")["2t"]
+        return lambda: reader.histogram(data, bins=100, range=(200, 330), weighted=False).compute()
+
+    def bench_vertinterp(self, **kwargs):
+        reader = self.reader()
+        data = reader.retrieve(var="t")["t"]
+        return lambda: reader.vertinterp(data, levels=[60000, 40000], units="Pa").compute()
+
+    def bench_vertinterp_xarray(self, **kwargs):
+        """Reference for vertinterp: the xarray interp used for the methods without precomputed weights"""
+        data = self.reader().retrieve(var="t")["t"]
+        return lambda: data.interp(plev=[60000, 40000], method="linear").compute()
+
+    def bench_streaming(self, **kwargs):
+        from aqua import Streaming
+
+        data = self.reader().retrieve(var="2t")
+        streaming = Streaming(aggregation="monthly", loglevel=LOGLEVEL)
+
+        def stream():
+            for chunk in streaming.generator(data):
+                chunk["2t"].mean().compute()
+
+        return stream
+
+    def bench_drop(self, name, workers, **kwargs):
+        from aqua import Drop
+
+        output_format = name.removeprefix("drop_")
+        outdir = os.path.join(self.workdir, "drop", f"{self.source}_{output_format}_{workers}")
+
+        def drop():
+            shutil.rmtree(outdir, ignore_errors=True)
+            worker = Drop(
+                catalog=synthetic.CATALOG,
+                model=synthetic.MODEL,
+                exp=synthetic.EXP,
+                source=self.source,
+                var="2t",
+                resolution="native",
+                frequency="monthly",
+                outdir=outdir,
+                tmpdir=os.path.join(outdir, "tmp"),
+                definitive=True,
+                nproc=workers,
+                output_format=output_format,
+                engine="netcdf",
+                loglevel=LOGLEVEL,
+            )
+            worker.retrieve()
+            worker.drop_generator()
+
+        return drop
+
+
+def set_dask(workers):
+    """Set up a dask cluster, or the synchronous scheduler for a single worker"""
+    if workers > 1:
+        from dask.distributed import Client, LocalCluster
+
+        cluster = LocalCluster(n_workers=workers, threads_per_worker=1)
+        return cluster, Client(cluster)
+    dask.config.set(scheduler="synchronous")
+    return None, None
+
+
+def close_dask(cluster, client):
+    """Close the dask cluster, if any"""
+    if cluster is not None:
+        client.shutdown()
+        cluster.close()
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compare the results with a baseline, printing a summary table.
+
+    Returns:
+        list: the results slower than the baseline by more than the tolerance
+    """
+
+    def key(result):
+        return (result["benchmark"], result["grid"], result["size"], result["workers"])
+
+    reference = {key(result): result for result in baseline["results"] if result["status"] == "ok"}
+    regressions = []
+    print(f"{'benchmark':<28} {'grid':<12} {'size':<7} {'workers':>7} {'baseline':>9} {'current':>9} {'ratio':>6}")
+    for result in results:
+        if result["status"] != "ok" or key(result) not in reference:
+            continue
+        ratio = result["median"] / reference[key(result)]["median"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(result)
+            flag = "  REGRESSION"
+        print(
+            f"{result['benchmark']:<28} {result['grid']:<12} {result['size']:<7} {result['workers']:>7} "
+            f"{reference[key(result)]['median']:>9.3f} {result['median']:>9.3f} {ratio:>6.2f}{flag}"
+        )
+    return regressions
+
+
+def main(arguments):
+    """Run the benchmark suite"""
+    args = parse_arguments(arguments)
+    sizes = args.sizes.split(",")
+    grids = args.grids.split(",")
+    workers_list = [int(workers) for workers in args.workers.split(",")]
+    regrid = shutil.which("cdo") is not None
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="aqua-benchmark-")
+    print(f"Generating synthetic data and configuration in {workdir}")
+    os.environ["AQUA_CONFIG"] = synthetic.build_config(workdir, grids=grids, sizes=sizes, regrid=regrid)
+
+    from aqua import __version__ as version
+
+    suites = [
+        BenchmarkSuite(grid, size, workdir, nrepeat=args.nrepeat, regrid=regrid, loglevel=args.loglevel)
+        for grid in grids
+        for size in sizes
+    ]
+    names = args.benchmarks.split(",") if args.benchmarks else list(suites[0].benchmarks)
+
+    results = []
+    for workers in workers_list:
+        cluster, client = set_dask(workers)
+        for suite in suites:
+            results.extend(suite.run(name, workers) for name in names if not name.startswith("drop_"))
+        close_dask(cluster, client)
+
+        # DROP sets up its own dask cluster with the requested number of workers
+        for suite in suites:
+            results.extend(suite.run(name, workers) for name in names if name.startswith("drop_"))
+
+    output = {
+        "aqua_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "config": {"sizes": sizes, "grids": grids, "workers": workers_list, "nrepeat": args.nrepeat, "regrid": regrid},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmarks slower than the baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
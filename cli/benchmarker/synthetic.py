@@ -0,0 +1,224 @@
+"""
+Synthetic datasets and self-contained AQUA configuration for the benchmark suite.
+
+The datasets mimic the three families of grids AQUA deals with (regular lon-lat,
+HEALPix and curvilinear), are written as monthly NetCDF files and are exposed
+through a local intake catalog, so that no HPC data or installed catalog is needed.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+import aqua.core
+from aqua.core.util import dump_yaml
+
+CATALOG = "bench"
+MODEL = "SYNTHETIC"
+EXP = "bench"
+FIXER_NAME = "synthetic-bench"
+PLEVS = [100000, 92500, 85000, 70000, 50000, 30000, 20000, 10000]  # Pa
+
+# Horizontal resolution and number of daily timesteps for each size
+SIZES = {
+    "small": {"regular": (90, 45), "healpix": 16, "curvilinear": (60, 40), "ntime": 365},
+    "medium": {"regular": (360, 180), "healpix": 64, "curvilinear": (240, 160), "ntime": 730},
+    "large": {"regular": (720, 360), "healpix": 128, "curvilinear": (480, 320), "ntime": 730},
+}
+GRIDS = ["regular", "healpix", "curvilinear"]
+
+
+def source_name(grid, size):
+    """Name of the catalog source of a grid and size"""
+    return f"{grid}-{size}"
+
+
+def _regular_coords(size):
+    nlon, nlat = SIZES[size]["regular"]
+    lon = np.linspace(0, 360, nlon, endpoint=False) + 180 / nlon
+    lat = np.linspace(-90, 90, nlat, endpoint=False) + 90 / nlat
+    coords = {
+        "lon": ("lon", lon, {"units": "degrees_east", "standard_name": "longitude"}),
+        "lat": ("lat", lat, {"units": "degrees_north", "standard_name": "latitude"}),
+    }
+    return coords, ("lat", "lon"), np.broadcast_to(lat[:, None], (nlat, nlon))
+
+
+def _healpix_coords(size):
+    nside = SIZES[size]["healpix"]
+    ncell = 12 * nside**2
+    # equal area grid: latitudes of the cells are uniformly distributed in sin(lat)
+    lat = np.rad2deg(np.arcsin(np.linspace(-1, 1, ncell, endpoint=False) + 1 / ncell))
+    coords = {"cell": ("cell", np.arange(ncell))}
+    return coords, ("cell",), lat
+
+
+def _curvilinear_coords(size):
+    nx, ny = SIZES[size]["curvilinear"]
+    x, y = np.meshgrid(np.linspace(0, 360, nx, endpoint=False), np.linspace(-80, 80, ny))
+    # a smooth distortion of a lon-lat grid, as in tripolar ocean grids
+    lon = (x + 10 * np.sin(np.deg2rad(y))) % 360
+    lat = y + 5 * np.cos(np.deg2rad(x))
+    coords = {
+        "lon": (("y", "x"), lon, {"units": "degrees_east", "standard_name": "longitude"}),
+        "lat": (("y", "x"), lat, {"units": "degrees_north", "standard_name": "latitude"}),
+    }
+    return coords, ("y", "x"), lat
+
+
+def grid_coords(grid, size):
+    """
+    Return the horizontal coordinates, the horizontal dimensions and the
+    latitude of each point of a synthetic grid.
+    """
+    builders = {"regular": _regular_coords, "healpix": _healpix_coords, "curvilinear": _curvilinear_coords}
+    return builders[grid](size)
+
+
+def grid_area(grid, size):
+    """Approximate cell areas (cosine of latitude weights) of a synthetic grid"""
+    coords, dims, lat = grid_coords(grid, size)
+    return xr.DataArray(np.cos(np.deg2rad(lat)), dims=dims, coords=coords, name="cell_area", attrs={"units": "m2"})
+
+
+def synthetic_dataset(grid, size, time, seed=42):
+    """
+    Create a synthetic daily dataset with a 2D temperature in Celsius (to be fixed)
+    and a 3D temperature on pressure levels.
+
+    Args:
+        grid (str): one of 'regular', 'healpix' or 'curvilinear'
+        size (str): one of the keys of SIZES
+        time (pd.DatetimeIndex): the timesteps of the dataset
+        seed (int): the seed of the random noise
+
+    Returns:
+        xr.Dataset: the synthetic dataset
+    """
+    coords, dims, lat = grid_coords(grid, size)
+    rng = np.random.default_rng(seed)
+
+    seasonal = np.cos(2 * np.pi * time.dayofyear.values / 365.25)
+    climate = 30 * np.cos(np.deg2rad(lat)) - 10
+    t2m = climate[None] + 5 * seasonal.reshape((-1,) + (1,) * len(dims)) * np.sign(lat)[None]
+    t2m = (t2m + rng.normal(scale=2, size=t2m.shape)).astype(np.float32)
+
+    plev = np.array(PLEVS, dtype=float)
+    profile = (np.log(plev / plev[0]) * 40).reshape((1, -1) + (1,) * len(dims))
+    t = (t2m[:, None] + 273.15 + profile).astype(np.float32)
+
+    data = xr.Dataset(
+        {
+            "t2m": (("time",) + dims, t2m, {"units": "degC", "long_name": "2 metre temperature"}),
+            "t": (("time", "plev") + dims, t, {"units": "K", "long_name": "Temperature"}),
+        },
+        coords={
+            "time": time,
+            "plev": ("plev", plev, {"units": "Pa", "standard_name": "air_pressure", "positive": "down"}),
+            **coords,
+        },
+    )
+
+    if grid == "healpix":
+        # CF description of the HEALPix grid, needed by CDO
+        data["crs"] = xr.DataArray(
+            np.int32(0),
+            attrs={"grid_mapping_name": "healpix", "healpix_nside": SIZES[size]["healpix"], "healpix_order": "nest"},
+        )
+        for var in ["t2m", "t"]:
+            data[var].attrs["grid_mapping"] = "crs"
+
+    return data
+
+
+def write_dataset(grid, size, outdir):
+    """
+    Write the synthetic dataset of a grid and size as monthly NetCDF files,
+    generating one month at a time to keep the memory footprint low.
+
+    Returns:
+        list: the files written
+    """
+    os.makedirs(outdir, exist_ok=True)
+    time = pd.date_range("2000-01-01", periods=SIZES[size]["ntime"], freq="D")
+    files = []
+    for i, month in enumerate(time.to_period("M").unique()):
+        path = os.path.join(outdir, f"{month.strftime('%Y%m')}.nc")
+        if not os.path.exists(path):
+            data = synthetic_dataset(grid, size, time[time.to_period("M") == month], seed=i)
+            data.to_netcdf(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        files.append(path)
+    return files
+
+
+def build_config(workdir, grids=GRIDS, sizes=("small",), regrid=False):
+    """
+    Build a self-contained AQUA configuration folder with a local catalog
+    exposing the synthetic datasets. Data are generated only if missing,
+    so the same workdir can be reused across runs.
+
+    Args:
+        workdir (str): the folder where data and configuration are stored
+        grids (list): the synthetic grids to be generated
+        sizes (list): the sizes to be generated
+        regrid (bool): if True, define the source grids in the catalog to enable
+                       regridding and areas (requires CDO). Defaults to False.
+
+    Returns:
+        str: the configuration folder, to be used as AQUA_CONFIG
+    """
+    package_config = os.path.join(os.path.dirname(aqua.core.__file__), "config")
+    configdir = os.path.join(workdir, "config")
+    catalogdir = os.path.join(configdir, "catalogs", CATALOG)
+    os.makedirs(os.path.join(catalogdir, "catalog", MODEL), exist_ok=True)
+    for folder in ["fixes", "grids", "data_model"]:
+        shutil.copytree(os.path.join(package_config, folder), os.path.join(configdir, folder), dirs_exist_ok=True)
+
+    paths = {name: os.path.join(workdir, name) for name in ["areas", "weights", "grids"]}
+    for path in paths.values():
+        os.makedirs(path, exist_ok=True)
+
+    with open(os.path.join(package_config, "config-aqua.tmpl"), "r", encoding="utf-8") as f:
+        template = f.read()
+    with open(os.path.join(configdir, "config-aqua.yaml"), "w", encoding="utf-8") as f:
+        f.write(template.replace("catalog: null", f"catalog: [{CATALOG}]").replace("machine: auto", f"machine: {CATALOG}"))
+    dump_yaml(os.path.join(catalogdir, "machine.yaml"), {CATALOG: {"paths": paths}})
+
+    # the fixer converts the 2D temperature to Kelvin, as done for most model outputs
+    fixes = {"fixer_name": {FIXER_NAME: {"vars": {"2t": {"source": "t2m", "src_units": "degC", "units": "K"}}}}}
+    dump_yaml(os.path.join(configdir, "fixes", "synthetic-bench.yaml"), fixes)
+
+    sources = {}
+    grid_entries = {}
+    for grid in grids:
+        for size in sizes:
+            name = source_name(grid, size)
+            files = write_dataset(grid, size, os.path.join(workdir, "data", name))
+            grid_entries[f"bench-{name}"] = {"path": files[0], "space_coord": list(grid_coords(grid, size)[1])}
+            if grid == "healpix":
+                grid_entries[f"bench-{name}"]["cdo_options"] = "--force"
+            sources[name] = {
+                "description": f"Synthetic daily data on a {size} {grid} grid",
+                "driver": "netcdf",
+                "args": {"urlpath": os.path.join(workdir, "data", name, "*.nc"), "chunks": {"time": 31}},
+                "metadata": {"fixer_name": FIXER_NAME, "source_grid_name": f"bench-{name}" if regrid else False},
+            }
+    dump_yaml(os.path.join(configdir, "grids", "synthetic-bench.yaml"), {"grids": grid_entries})
+
+    dump_yaml(
+        os.path.join(catalogdir, "catalog.yaml"),
+        {"sources": {MODEL: {"driver": "yaml_file_cat", "args": {"path": f"{{{{CATALOG_DIR}}}}/catalog/{MODEL}/main.yaml"}}}},
+    )
+    dump_yaml(
+        os.path.join(catalogdir, "catalog", MODEL, "main.yaml"),
+        {"sources": {EXP: {"driver": "yaml_file_cat", "args": {"path": f"{{{{CATALOG_DIR}}}}/{EXP}.yaml"}}}},
+    )
+    dump_yaml(
+        os.path.join(catalogdir, "catalog", MODEL, f"{EXP}.yaml"),
+        {"plugins": {"source": [{"module": "intake_xarray"}]}, "sources": sources},
+    )
+    return configdir
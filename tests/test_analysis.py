@@ -12,12 +12,18 @@ Organized into focused test classes covering:
 
 import argparse
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import MagicMock, patch
 
 import pytest
 from jinja2 import UndefinedError
 
 from aqua.core.analysis import Analysis
+from aqua.core.analysis.scheduler import AnalysisJob, JobScheduler, load_durations
+from aqua.core.analysis.workerpool import WarmWorkerPool
 from aqua.core.console.analysis import analysis_parser
 from aqua.core.util import dump_yaml, load_yaml
 
@@ -521,6 +527,218 @@ class TestIntegrationFlow:
         mock_tool.assert_not_called()
 
 
+# ============================================================================
+# TestScheduler: jobs and their concurrent execution
+# ============================================================================
+class TestScheduler:
+    """Tests for build_jobs, run_jobs and the JobScheduler."""
+
+    def test_build_jobs_footprint(self, analysis, temp_env):
+        """Jobs have one entry per config, with nworkers x nthreads CPUs and their dependencies."""
+        analysis.model = "IFS"
+        analysis.exp = "test-tco79"
+        analysis.source = "short"
+        analysis.catalog = "test_catalog"
+        analysis.realization = "r1"
+        analysis.output_dir = temp_env["outdir"]
+
+        cfg_file2 = temp_env["config"] + "/config2.yaml"
+        dump_yaml(cfg_file2, {"key": "value2"})
+        config = {
+            "biases": {"config": [temp_env["cfg_biases"], cfg_file2], "nworkers": 4, "nthreads": 2, "memory": "8GiB"},
+            "ecmean": {"config": temp_env["cfg_ecmean"], "depends_on": "atm.biases", "duration": 60},
+        }
+
+        jobs = analysis.build_jobs("atm", cli=temp_env["cli"], diag_config=config, after=["ocean"])
+
+        assert [job.name for job in jobs] == ["atm.biases.1", "atm.biases.2", "atm.ecmean"]
+        assert jobs[0].cpus == 8
+        assert jobs[0].memory == 8 * 2**30
+        assert jobs[2].cpus == 1
+        assert jobs[2].duration == 60
+        assert jobs[2].depends_on == ["atm.biases"]
+        assert all(job.after == ["ocean"] for job in jobs)
+        assert jobs[1].kwargs["logfile"].endswith("atm-biases-2.log")
+
+    def test_cluster_footprint(self, analysis, temp_env, tmp_path):
+        """Tools on the shared cluster take a single CPU, the cluster workers are taken out of the node budget."""
+        analysis.model = "IFS"
+        analysis.exp = "test-tco79"
+        analysis.source = "short"
+        analysis.catalog = "test_catalog"
+        analysis.realization = "r1"
+        analysis.output_dir = temp_env["outdir"]
+        analysis.cluster = MagicMock(address="tcp://127.0.0.1:8786", footprint={"cpus": 6, "memory": 12 * 2**30})
+
+        config = {
+            "biases": {"config": temp_env["cfg_biases"], "nworkers": 4, "nthreads": 2},
+            "ecmean": {"config": temp_env["cfg_ecmean"], "nworkers": 4, "nthreads": 2, "nocluster": True},
+        }
+        jobs = analysis.build_jobs("atm", cli=temp_env["cli"], diag_config=config)
+        assert [job.cpus for job in jobs] == [1, 8]
+
+        analysis.output_dir = str(tmp_path)
+        node = {"cpus": 16, "memory": 32 * 2**30}
+        with (
+            patch("aqua.core.analysis.analysis.detect_resources", return_value=node),
+            patch("aqua.core.analysis.analysis.JobScheduler", wraps=JobScheduler) as scheduler,
+            patch.object(analysis, "run_diagnostic_tool", return_value=0),
+        ):
+            analysis.run_jobs(jobs)
+        assert scheduler.call_args.kwargs["cpus"] == 10
+        assert scheduler.call_args.kwargs["memory"] == 20 * 2**30
+
+    def test_scheduler_budget_and_order(self):
+        """Jobs run longest first and never exceed the CPU budget."""
+        started, running, peak = [], [], []
+
+        def runner(job):
+            started.append(job.name)
+            running.append(job.cpus)
+            peak.append(sum(running))
+            time.sleep(0.05)
+            running.remove(job.cpus)
+            return 0
+
+        jobs = [
+            AnalysisJob("a.short", "a", "short", {}, cpus=2, duration=1),
+            AnalysisJob("a.long", "a", "long", {}, cpus=2, duration=100),
+            AnalysisJob("a.medium", "a", "medium", {}, cpus=2, duration=10),
+        ]
+        results = JobScheduler(cpus=4).run(jobs, runner)
+
+        assert results == {"a.long": 0, "a.medium": 0, "a.short": 0}
+        assert set(started[:2]) == {"a.long", "a.medium"}
+        assert started[2] == "a.short"
+        assert max(peak) <= 4
+
+    def test_scheduler_dependencies(self):
+        """Dependencies are honoured, failed dependencies skip the job, after-only ones do not."""
+        order = []
+
+        def runner(job):
+            order.append(job.name)
+            return 1 if job.tool == "broken" else 0
+
+        jobs = [
+            AnalysisJob("b.plot", "b", "plot", {}, depends_on="a.broken"),
+            AnalysisJob("b.other", "b", "other", {}, after="a"),
+            AnalysisJob("a.broken", "a", "broken", {}),
+            AnalysisJob("a.fine", "a", "fine", {}),
+        ]
+        results = JobScheduler(cpus=8).run(jobs, runner)
+
+        assert results["a.broken"] == 1
+        assert results["b.plot"] is None
+        assert results["b.other"] == 0
+        assert order.index("b.other") > max(order.index("a.broken"), order.index("a.fine"))
+
+        with pytest.raises(ValueError, match="Circular"):
+            JobScheduler(cpus=1).resolve(
+                [AnalysisJob("x.a", "x", "a", {}, depends_on="x.b"), AnalysisJob("x.b", "x", "b", {}, depends_on="x.a")]
+            )
+
+    def test_run_jobs_records_durations(self, analysis, tmp_path):
+        """Measured durations are stored in the output directory."""
+        analysis.output_dir = str(tmp_path)
+        jobs = [AnalysisJob("atm.biases", "atm", "biases", {"collection": "atm", "tool": "biases"})]
+
+        with patch.object(analysis, "run_diagnostic_tool", return_value=0) as mock_tool:
+            results = analysis.run_jobs(jobs, cpus=2, memory="4GiB")
+
+        mock_tool.assert_called_once_with(collection="atm", tool="biases")
+        assert results == {"atm.biases": 0}
+        assert "atm.biases" in load_durations(str(tmp_path))
+
+
+# ============================================================================
+# TestWarmBackend: diagnostic tools run in the warm worker pool
+# ============================================================================
+class TestWarmBackend:
+    """Tests for the warm worker pool backend."""
+
+    @pytest.fixture
+    def script(self, tmp_path):
+        """A tool printing its arguments and exiting with the code given as last argument."""
+        script = tmp_path / "cli_tool.py"
+        script.write_text(
+            "import os, sys\n"
+            "print('arguments', sys.argv[1:], os.environ.get('AQUA_TEST_MARK'))\n"
+            "os.system('echo from the child process')\n"
+            "if __name__ == '__main__':\n"
+            "    sys.exit(int(sys.argv[-1]))\n"
+        )
+        return str(script)
+
+    def test_pool_run_captures_output(self, script, tmp_path, monkeypatch):
+        """Exit code, arguments, environment and output of the child processes are captured."""
+        monkeypatch.setenv("AQUA_TEST_MARK", "warm")
+        pool = WarmWorkerPool(max_workers=2, preload=["numpy"])
+        try:
+            assert pool.run(script, "--title 'a b' 0", str(tmp_path / "ok.log")) == 0
+            assert pool.run(script, "3", str(tmp_path / "fail.log")) == 3
+            assert pool.run(str(tmp_path / "missing.py"), "", str(tmp_path / "missing.log")) == 1
+        finally:
+            pool.close()
+
+        log = (tmp_path / "ok.log").read_text()
+        assert "arguments ['--title', 'a b', '0'] warm" in log
+        assert "from the child process" in log
+        assert "FileNotFoundError" in (tmp_path / "missing.log").read_text()
+
+    def test_set_backend(self, analysis):
+        """Backend is read from the command line, then from the job config."""
+        analysis.set_backend(argparse.Namespace(backend=None), {"backend": "warm", "preload": ["numpy"]})
+        assert analysis.backend == "warm"
+        assert analysis.preload == ["numpy"]
+
+        analysis.set_backend(argparse.Namespace(backend=None), {})
+        assert analysis.backend == "subprocess"
+
+        with pytest.raises(SystemExit):
+            analysis.set_backend(argparse.Namespace(backend="threads"), {})
+
+    def test_run_diagnostic_tool_uses_pool(self, analysis, tmp_path):
+        """Tools run in the pool unless they require a subprocess."""
+        analysis.pool = MagicMock()
+        analysis.pool.run.return_value = 0
+        logfile = str(tmp_path / "tool.log")
+
+        with patch.object(analysis, "run_command", return_value=0) as mock_command:
+            assert analysis.run_diagnostic_tool("atm", "biases", "cli.py", "--model IFS", logfile=logfile) == 0
+            mock_command.assert_not_called()
+            analysis.pool.run.assert_called_once_with("cli.py", "--model IFS -l DEBUG", logfile)
+
+            analysis.run_diagnostic_tool("atm", "ecmean", "cli.py", "--model IFS", logfile=logfile, backend="subprocess")
+            mock_command.assert_called_once()
+
+    def test_broken_pool_falls_back_to_subprocess(self, analysis, tmp_path):
+        """Tools whose warm worker died in concurrent threads all run in a subprocess, and the pool is closed once."""
+        pool = MagicMock()
+        barrier = threading.Barrier(4)
+
+        def broken(*args):
+            barrier.wait()  # all the threads see the pool broken at the same time
+            raise BrokenProcessPool("worker died")
+
+        pool.run.side_effect = broken
+        analysis.pool = pool
+        logfile = str(tmp_path / "tool.log")
+
+        with patch.object(analysis, "run_command", return_value=0) as mock_command:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(
+                        lambda i: analysis.run_diagnostic_tool("atm", f"tool{i}", "cli.py", "", logfile=logfile), range(4)
+                    )
+                )
+
+        assert results == [0] * 4
+        assert mock_command.call_count == 4
+        pool.close.assert_called_once()
+        assert analysis.pool is None
+
+
 # ============================================================================
 # TestUtilities: Helpers and utility methods
 # ============================================================================
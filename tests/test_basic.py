@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import numpy as np
 import pytest
 from conftest import APPROX_REL, LOGLEVEL
@@ -39,6 +42,26 @@ class TestAqua:
         except ImportError:
             assert False, "Module {} could not be imported".format(module_name)
 
+    @pytest.mark.parametrize("module_name", ["aqua", "aqua.core.console.main"])
+    def test_aqua_lazy_import(self, module_name):
+        """
+        Test that importing aqua or its console does not load the heavy dependencies,
+        which are imported only when the public API is accessed
+        """
+        heavy = ["matplotlib", "cartopy", "smmregrid", "metpy", "dask.distributed", "aqua.core.reader"]
+        code = f"import sys, {module_name}; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""
+
+        code = "import sys, aqua; aqua.Reader; print('aqua.core.reader' in sys.modules, hasattr(aqua, 'Streaming'))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.split() == ["True", "True"]
+
+        # the xarray accessor is registered by importing aqua alone
+        code = "import aqua, xarray as xr; print(hasattr(xr.DataArray([0]), 'aqua'))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "True"
+
     def test_reader_init(self):
         """
         Test the initialization of the Reader class
@@ -90,6 +113,26 @@ class TestAqua:
         data = reader.retrieve()
         assert set(data["2t"].chunksizes["time"]) == {1}
 
+    def test_retrieve_cache(self):
+        """
+        Test that identical and subset retrieves reuse the lazy data, without sharing changes
+        """
+        reader = Reader(model="IFS", exp="test-tco79", source="long", loglevel=loglevel)
+        data = reader.retrieve(var=["2t", "ttr"])
+        data["extra"] = data["2t"] * 2
+        again = reader.retrieve(var=["2t", "ttr"])
+        assert "extra" not in again
+        assert again["2t"].data.name == data["2t"].data.name  # same dask graph
+        assert reader.retrieve(var="ttr")["ttr"].data.name == data["ttr"].data.name
+        assert reader.retrieve(var="2t", startdate="2020-03-01")["2t"].data.name != data["2t"].data.name
+        assert len(reader._retrieved) == 2
+
+        reader.clear_retrieve_cache()
+        assert len(reader._retrieved) == 0
+
+        reader = Reader(model="IFS", exp="test-tco79", source="long", retrieve_cache=0, loglevel=loglevel)
+        assert reader.retrieve(var="2t")["2t"].data.name != reader.retrieve(var="2t")["2t"].data.name
+
     def test_catalog_override(self):
         """
         Test the compact catalog override functionality
@@ -42,3 +42,29 @@ class TestChecksumModule:
         assert "All files are verified successfully" in captured.out
 
         os.remove(checksum_file)
+
+    @pytest.mark.parametrize("algorithm", ["md5", "blake2b"])
+    def test_checksums_cache(self, tmp_path, capsys, algorithm):
+        """Test that unchanged files are read from the cache and modified ones are hashed again."""
+        grid = tmp_path / "grid"
+        grid.mkdir()
+        (grid / "file1.nc").write_text("Sample content 1")
+        (grid / "file2.nc").write_text("Sample content 2")
+        checksum_file = str(tmp_path / "checksums.txt")
+
+        generate_checksums(str(tmp_path), ["grid"], checksum_file, algorithm=algorithm, nworkers=2)
+        assert os.path.exists(tmp_path / ".checksum_cache.json")
+        capsys.readouterr()
+
+        verify_checksums(str(tmp_path), ["grid"], checksum_file)
+        captured = capsys.readouterr()
+        assert "Hashed 0 files" in captured.out
+        assert "2 files from cache" in captured.out
+        assert "All files are verified successfully" in captured.out
+
+        (grid / "file2.nc").write_text("Modified content 2")
+        with pytest.raises(SystemExit):
+            verify_checksums(str(tmp_path), ["grid"], checksum_file)
+        captured = capsys.readouterr()
+        assert "Hashed 1 files" in captured.out
+        assert "Checksum mismatch for grid/file2.nc" in captured.out
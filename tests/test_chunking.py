@@ -0,0 +1,97 @@
+"""Tests for the chunks autotuner"""
+
+import dask.array as da
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from aqua.core.reader.chunking import autotune_chunks, calendar_chunks, gsv_chunks
+
+loglevel = "DEBUG"
+MiB = 2**20
+
+
+def synthetic_data(freq="h", ntime=2000, nlev=8, nlat=180, nlon=360):
+    """Lazy 2D and 3D float32 variables on a regular grid"""
+    time = pd.date_range("2000-01-01", periods=ntime, freq=freq)
+    return xr.Dataset(
+        {
+            "t": (("time", "plev", "lat", "lon"), da.zeros((ntime, nlev, nlat, nlon), dtype="float32")),
+            "tas": (("time", "lat", "lon"), da.zeros((ntime, nlat, nlon), dtype="float32")),
+        },
+        coords={"time": time, "plev": range(nlev), "lat": range(nlat), "lon": range(nlon)},
+    )
+
+
+@pytest.mark.aqua
+def test_autotune_chunks():
+    """Chunks fit the target, keep full levels and horizontal dims, and are aligned to the output frequency"""
+    data = synthetic_data()  # one level is 253KiB, a timestep is about 2MiB
+    chunks = autotune_chunks(data, chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert chunks["plev"] == chunks["lat"] == chunks["lon"] == -1
+    assert chunks["vertical_dims"] == ["plev"]
+    assert chunks["time_step"] == pd.Timedelta("1h")
+    assert chunks["time"] == 24  # 32 steps fit, aligned to days for sub-daily data
+
+    chunks = autotune_chunks(data, freq="6hourly", chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert chunks["time"] == 30
+
+    # smaller than an output period: a divisor of it
+    chunks = autotune_chunks(data, freq="daily", chunk_bytes="20MiB", memory=2**34, loglevel=loglevel)
+    assert chunks["time"] == 8
+
+    # the worker memory caps the target, more for memory hungry statistics
+    mean = autotune_chunks(data, freq="daily", stat="mean", chunk_bytes="1GiB", memory=160 * MiB, loglevel=loglevel)
+    std = autotune_chunks(data, freq="daily", stat="std", chunk_bytes="1GiB", memory=160 * MiB, loglevel=loglevel)
+    assert mean["time"] == 12
+    assert std["time"] == 8
+
+    # levels are split if a single timestep does not fit
+    chunks = autotune_chunks(data, chunk_bytes="1MiB", memory=2**34, loglevel=loglevel)
+    assert chunks["time"] == 1
+    assert chunks["plev"] == 4
+
+    assert autotune_chunks(data.isel(time=0), loglevel=loglevel) is None
+
+
+@pytest.mark.aqua
+def test_calendar_chunks():
+    """Time chunks are aligned to months and seasons, the calendar periods of the statistics"""
+    data = synthetic_data(freq="D", ntime=400)
+    chunks = autotune_chunks(data, freq="monthly", chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert chunks["time_freq"] == "monthly"
+    assert chunks["time"][:3] == (31, 29, 31)  # 32 steps fit, a single month per chunk
+    bounds = data["time"].values[np.cumsum(chunks["time"])[:-1]]
+    assert all(pd.DatetimeIndex(bounds).is_month_start)
+    assert sum(chunks["time"]) == data.sizes["time"]
+
+    # whole periods are packed together, longer periods are split in days
+    assert calendar_chunks(data["time"], "monthly", 70)[:3] == (60, 61, 61)
+    assert calendar_chunks(data["time"], "seasonal", 100)[:2] == (60, 92)
+    hourly = synthetic_data(ntime=24 * 45)
+    assert calendar_chunks(hourly["time"], "monthly", 50) == (48,) * 15 + (24,) + (48,) * 7
+
+    # no alignment for fixed frequencies or non-standard time axes
+    assert autotune_chunks(data, freq="daily", chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)["time_freq"] is None
+    assert calendar_chunks(data["time"].isel(time=slice(None, None, -1)), "monthly", 70) is None
+
+
+@pytest.mark.aqua
+def test_gsv_chunks():
+    """Conversion to the time and vertical chunking of GSV sources"""
+    hourly = autotune_chunks(synthetic_data(), chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert gsv_chunks(hourly) == {"time": "D", "vertical": None}
+
+    daily = autotune_chunks(synthetic_data(freq="D"), chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert gsv_chunks(daily) == {"time": "M", "vertical": None}
+
+    sixhourly = autotune_chunks(synthetic_data(freq="6h"), chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert gsv_chunks(sixhourly) == {"time": "W", "vertical": None}
+    # weeks are not aligned with months
+    assert gsv_chunks(sixhourly, freq="monthly") == {"time": "D", "vertical": None}
+    monthly = autotune_chunks(synthetic_data(freq="D"), freq="monthly", chunk_bytes="64MiB", memory=2**34, loglevel=loglevel)
+    assert gsv_chunks(monthly, freq="monthly") == {"time": "M", "vertical": None}
+
+    split = autotune_chunks(synthetic_data(), chunk_bytes="1MiB", memory=2**34, loglevel=loglevel)
+    assert gsv_chunks(split) == {"time": "S", "vertical": 4}
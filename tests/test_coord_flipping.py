@@ -4,7 +4,8 @@ import xarray as xr
 from conftest import LOGLEVEL
 
 from aqua import Reader
-from aqua.core.data_model import CoordTransformer
+from aqua.core.data_model import CoordTransformer, counter_reverse_coordinate
+from aqua.core.regridder.regridder_util import flip_permutation, permute_weights_source
 
 loglevel = LOGLEVEL
 pytestmark = pytest.mark.aqua
@@ -189,10 +190,45 @@ def test_reader_regrid_flipped():
 
     # Latitude should be marked as flipped by the data model
     assert da.lat.attrs.get("flipped", None) == 1
+    # permuted regridders are built only when flipped data are regridded
+    assert not reader.regridder._flipped_smmregridder
 
     # After regridding, the 'flipped' attribute must be consistently removed from the latitude
     da_regrid = reader.regrid(da)
     assert da_regrid.lat.attrs.get("flipped", None) is None
+    assert len(reader.regridder._flipped_smmregridder) == 1
 
     # Latitude should remain strictly increasing after regridding
     assert np.all(np.diff(da_regrid.lat.values) > 0)
+
+    # Permuted weights on flipped data give the same result of reversing the data back
+    da_reversed = reader.regridder.regrid(counter_reverse_coordinate(da.isel(time=0)))
+    np.testing.assert_allclose(da_regrid.isel(time=0).values, da_reversed.values, equal_nan=True)
+
+
+def test_permute_weights_source():
+    """Test that permuted weights applied to flipped data match the original weights on original data."""
+    rng = np.random.default_rng(42)
+    nlat, nlon, ndst, nlinks = 5, 4, 6, 40
+    weights = xr.Dataset(
+        {
+            "src_address": ("num_links", rng.integers(1, nlat * nlon + 1, nlinks).astype("int32")),
+            "dst_address": ("num_links", rng.integers(1, ndst + 1, nlinks).astype("int32")),
+            "remap_matrix": (("num_links", "num_wgts"), rng.random((nlinks, 1))),
+            "src_grid_imask": ("src_grid_size", rng.integers(0, 2, nlat * nlon)),
+        }
+    )
+    data = rng.random((nlat, nlon))
+
+    def apply(wgt, values):
+        out = np.zeros(ndst)
+        np.add.at(out, wgt.dst_address.values - 1, wgt.remap_matrix.values[:, 0] * values.ravel()[wgt.src_address.values - 1])
+        return out
+
+    permutation = flip_permutation(data.shape, axes=[0])
+    permuted = permute_weights_source(weights, permutation)
+
+    np.testing.assert_allclose(apply(weights, data), apply(permuted, data[::-1]))
+    np.testing.assert_array_equal(
+        permuted.src_grid_imask.values.reshape(nlat, nlon), weights.src_grid_imask.values.reshape(nlat, nlon)[::-1]
+    )
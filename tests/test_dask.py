@@ -0,0 +1,47 @@
+"""Tests for the dask cluster resources and layout"""
+
+import pytest
+
+from aqua.core.dask import cluster_layout, detect_resources
+from aqua.core.dask.resources import check_layout
+
+GiB = 2**30
+NODE = {"cpus": 128, "memory": 256 * GiB, "source": "system"}
+
+
+@pytest.mark.aqua
+def test_detect_resources_slurm():
+    """SLURM allocations restrict the resources of the node"""
+    system = detect_resources(environ={})
+    assert system["cpus"] >= 1 and system["memory"] > 0
+
+    slurm = detect_resources(environ={"SLURM_JOB_CPUS_PER_NODE": "1(x2)", "SLURM_MEM_PER_CPU": "1024"})
+    assert slurm == {"cpus": 1, "memory": GiB, "source": "slurm"}
+
+    slurm = detect_resources(environ={"SLURM_CPUS_PER_TASK": "1", "SLURM_MEM_PER_NODE": "512"})
+    assert slurm == {"cpus": 1, "memory": GiB // 2, "source": "slurm"}
+
+
+@pytest.mark.aqua
+def test_cluster_layout():
+    """Layouts fill the node according to the profile, keeping user settings"""
+    layout = cluster_layout(profile="compute", resources=NODE)
+    assert (layout["nworkers"], layout["nthreads"]) == (32, 4)
+    assert layout["mem_limit"] == int(256 * GiB * 0.9 / 32)
+
+    layout = cluster_layout(profile="io", resources=NODE)
+    assert (layout["nworkers"], layout["nthreads"]) == (128, 1)
+
+    # no idle cores when the CPUs are not a multiple of the maximum threads
+    layout = cluster_layout(profile="compute", resources={**NODE, "cpus": 6})
+    assert (layout["nworkers"], layout["nthreads"]) == (2, 3)
+
+    layout = cluster_layout(profile="compute", nworkers=16, mem_limit="8GiB", resources=NODE)
+    assert (layout["nworkers"], layout["nthreads"], layout["mem_limit"]) == (16, 4, 8 * GiB)
+    assert not check_layout(layout)
+
+    layout = cluster_layout(nworkers=64, nthreads=4, mem_limit="8GiB", resources=NODE)
+    assert len(check_layout(layout)) == 2
+
+    with pytest.raises(ValueError):
+        cluster_layout(profile="gpu", resources=NODE)
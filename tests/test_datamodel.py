@@ -5,7 +5,8 @@ import pytest
 import xarray as xr
 
 from aqua import Reader
-from aqua.core.data_model import CoordIdentifier, CoordTransformer
+from aqua.core.data_model import CoordIdentifier, CoordTransformer, DataModel
+from aqua.core.data_model.coord_utils import coord_signature
 
 
 @pytest.mark.aqua
@@ -166,3 +167,33 @@ class TestDataModel:
         # No coordinate should be identified due to same score
         assert coord_dict["longitude"] is None
         assert coord_dict["latitude"] is None
+
+    def test_plan_cache(self, data):
+        """Identical coordinate layouts reuse the identified coordinates"""
+
+        DataModel.clear_cache()
+        datamodel = DataModel(loglevel="debug")
+        # deep copies since the data model can update the attributes in place
+        first = datamodel.apply(data.copy(deep=True))
+        assert len(DataModel._plan_cache) == 1
+
+        second = DataModel(loglevel="debug").apply(data.copy(deep=True))
+        assert len(DataModel._plan_cache) == 1
+        assert first.coords.keys() == second.coords.keys()
+        for coord in first.coords:
+            assert first[coord].attrs == second[coord].attrs
+
+        # a different layout is identified again
+        datamodel.apply(data.isel(longi=slice(0, 2)).copy(deep=True))
+        assert len(DataModel._plan_cache) == 2
+
+    def test_coord_signature(self, data):
+        """Signatures depend on the range of the values, and are not built for 2D or dask coordinates"""
+        lon = data.coords["longi"]
+        # same endpoints, different interior crossing the zero
+        other = data.assign_coords(longi=[100, -10, 120, 130])
+        assert coord_signature(lon.coords) != coord_signature(other["longi"].coords)
+
+        curvilinear = xr.Dataset(coords={"lat2d": (("y", "x"), np.zeros((2, 3)))})
+        assert coord_signature(curvilinear.coords) is None
+        assert coord_signature(data.assign_coords(lon2=("longi", lon.values)).chunk().coords) is None
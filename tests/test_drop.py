@@ -3,6 +3,7 @@ import re
 import shutil
 
 import icechunk
+import numpy as np
 import pandas as pd
 import pytest
 import xarray as xr
@@ -11,6 +12,7 @@ from conftest import LOGLEVEL
 from aqua import Drop
 from aqua.core.drop.catalog_entry_builder import CatalogEntryBuilder
 from aqua.core.drop.drop import available_stats
+from aqua.core.drop.drop_telemetry import load_telemetry
 from aqua.core.drop.drop_writer_icechunk import IcechunkWriter
 from aqua.core.drop.drop_writer_zarr import ZarrWriter
 from aqua.core.drop.output_path_builder import OutputPathBuilder
@@ -783,6 +785,27 @@ class TestIcechunkWriter:
 
         assert writer.validate(path) is expected
 
+    def test_failed_chunk_telemetry(self, tmp_path):
+        """Failed months are recorded in the stats and telemetry, with their status."""
+        writer = IcechunkWriter(tmpdir=str(tmp_path), outdir=str(tmp_path), loglevel=LOGLEVEL)
+        data = xr.DataArray(
+            np.arange(3.0), dims=["time"], coords={"time": pd.date_range("2020-01-01", periods=3, freq="MS")}, name="foo"
+        )
+        write = writer._write_to_icechunk_session
+
+        def failing_write(month_data, session, **kwargs):
+            if pd.Timestamp(month_data.time.values[0]).month == 2:
+                return False
+            return write(month_data, session, **kwargs)
+
+        writer._write_to_icechunk_session = failing_write
+        telemetry_file = str(tmp_path / "telemetry.jsonl")
+        writer.write_variable(data, "foo", telemetry_file=telemetry_file)
+
+        assert writer._telemetry is None
+        assert len(writer._chunk_stats) == 3
+        assert list(load_telemetry(telemetry_file)["status"]) == ["ok", "failed", "ok"]
+
     def test_garbage_collect_yearly(self, tmp_path):
         """concat_year_files() triggers GC when garbage_collect_yearly=True without corrupting the store."""
         writer = IcechunkWriter(
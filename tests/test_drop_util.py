@@ -3,6 +3,7 @@ import os
 import pytest
 
 from aqua.core.drop import drop_util
+from aqua.core.drop.drop_telemetry import ChunkTelemetry, load_telemetry, telemetry_report
 from aqua.core.drop.drop_util import estimate_time_chunk_size
 from aqua.core.util import replace_intake_vars
 
@@ -110,6 +111,35 @@ def test_estimate_time_chunk_size():
     assert estimate_time_chunk_size("foobar") > 0  # fallback exception path
 
 
+def write_file(path):
+    """Write 1 MiB to a file, returning the number of characters written."""
+    with open(path, "w") as f:
+        return f.write("x" * 2**20)
+
+
+@pytest.mark.aqua
+def test_chunk_telemetry(tmp_path):
+    """Telemetry records are appended as JSON lines and summarized by variable."""
+    telemetry_file = str(tmp_path / "drop_telemetry.jsonl")
+    for month in [1, 2]:
+        telemetry = ChunkTelemetry()
+        telemetry.tasks = 10
+        result = telemetry.phase("write", write_file, str(tmp_path / f"{month}.bin"))
+        assert result == 2**20
+        record = telemetry.finish(telemetry_file, var="2t", year=2020, month=month, status="ok", data_bytes=2**20)
+        assert record["write_time"] > 0 and record["compute_time"] == 0
+        assert record["total_time"] >= record["write_time"]
+        assert record["peak_worker_memory"] > 0
+
+    data = load_telemetry(telemetry_file)
+    assert len(data) == 2
+    assert list(data["month"]) == [1, 2]
+
+    report = telemetry_report([telemetry_file])
+    assert "2 chunks from 1 files" in report
+    assert "Variable 2t: 2 chunks (0 failed)" in report
+
+
 # Test replace_intake_vars
 @pytest.mark.aqua
 def test_replace_intake_vars():
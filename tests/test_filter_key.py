@@ -1,9 +1,14 @@
+import os
+
 import numpy as np
+import pandas as pd
 import pytest
+import xarray as xr
 from conftest import LOGLEVEL
 
 from aqua import Reader
 from aqua.core.exceptions import NoDataError
+from aqua.core.reader.file_index import FileIndex
 
 
 @pytest.mark.aqua
@@ -38,3 +43,41 @@ class TestFilterKey:
         reader = Reader(model="FESOM", exp="test-pi", source="original_2d_filter", LOGLEVEL=LOGLEVEL)
         data = reader.retrieve()
         assert data.time.size == 2  # Expecting multiple years of data
+
+
+@pytest.mark.aqua
+def test_file_index(tmp_path):
+    """Test the persistent time index of netcdf files"""
+    files = []
+    for year, var in [(1990, "tas"), (1991, "tas"), (1992, "pr")]:
+        time = pd.date_range(f"{year}-01-01", periods=12, freq="MS")
+        ds = xr.Dataset({var: ("time", np.arange(12.0))}, coords={"time": time})
+        files.append(str(tmp_path / f"{var}_{year}.nc"))
+        ds.to_netcdf(files[-1])
+
+    index_file = str(tmp_path / "index" / "source.json")
+    index = FileIndex(index_file, loglevel=LOGLEVEL)
+    index.update(files)
+    assert os.path.exists(index_file)
+
+    assert index.select("1991-03-01", "1991-05-01") == [files[1]]
+    assert index.select("1990-12", "1991") == files[:2]
+    assert index.select(var=["pr"]) == [files[2]]
+    assert index.select("1990", "1992", var=[["pr", "precip"]]) == [files[2]]
+    assert index.select() == files
+
+    # a new index is read from disk, and only the modified files are scanned again
+    time = pd.date_range("1993-01-01", periods=3, freq="MS")
+    xr.Dataset({"pr": ("time", np.arange(3.0))}, coords={"time": time}).to_netcdf(files[2])
+    index = FileIndex(index_file, loglevel=LOGLEVEL)
+    assert index.entries[files[0]]["end"].startswith("1990-12-01")
+    index.update(files[1:])
+    assert files[0] not in index.entries
+    assert index.select("1993-02-01") == [files[2]]
+
+    # an index which cannot be written is kept in memory only
+    (tmp_path / "readonly").write_text("not a folder")
+    index = FileIndex(str(tmp_path / "readonly" / "source.json"), loglevel=LOGLEVEL)
+    index.update(files)
+    assert not os.path.exists(index.index_file)
+    assert index.select("1993-02-01") == [files[2]]
@@ -5,6 +5,7 @@ import pytest
 
 from aqua import Reader
 from aqua.core.fixer import EvaluateFormula
+from aqua.core.fixer.evaluate_formula import compile_formula, parse_formula
 
 LOGLEVEL = "DEBUG"
 
@@ -155,6 +156,22 @@ def test_fixer_fesom_names():
     assert data["mlotst125"].attrs["uncle"] == "scrooge"
 
 
+@pytest.mark.aqua
+def test_fixer_plan_cache():
+    """Check that fix plans are computed once per set of requested variables"""
+
+    reader = Reader(model="IFS", exp="test-tco79", source="long", loglevel=LOGLEVEL)
+    data1 = reader.retrieve(var=["tnlwrf", "mtntrf"])
+    assert ("mtntrf", "tnlwrf") in reader.fixer._fix_plans
+    plan = reader.fixer._fix_plans[("mtntrf", "tnlwrf")]
+
+    data2 = reader.retrieve(var=["mtntrf", "tnlwrf"])
+    assert reader.fixer._fix_plans[("mtntrf", "tnlwrf")] is plan
+    assert "units" not in plan[1]["mtntrf"]["attributes"]
+    assert data1["mtntrf"].attrs["units"] == data2["mtntrf"].attrs["units"] == "W m**-2"
+    assert data1["mtntrf"].isel(time=5).equals(data2["mtntrf"].isel(time=5))
+
+
 @pytest.mark.aqua
 def test_fixer_deltat():
     """Check that output for deltat read from metadata and from fixes are the same"""
@@ -233,3 +250,24 @@ class TestEvaluateFormula:
             EvaluateFormula(data=data_2t_tp, formula=formula).evaluate()
         with pytest.raises(KeyError):
             EvaluateFormula(data=data_2t_tp, formula="2t ++ tprate").evaluate()
+
+    def test_parsed_formula_cache(self, data_2t_tp):
+        """Test that formulas are parsed once and evaluated as a single kernel"""
+        formula = EvaluateFormula.consolidate_formula("-(2t - 273.15) * 2 + tprate")
+        tree = parse_formula(formula)
+        assert tree == (
+            "op",
+            "+",
+            ("op", "*", ("neg", ("op", "-", ("var", "2t"), ("const", 273.15))), ("const", 2.0)),
+            ("var", "tprate"),
+        )
+        assert parse_formula(formula) is tree
+        kernel, variables = compile_formula(formula)
+        assert variables == ("2t", "tprate")
+        assert kernel(300.0, 1.0) == pytest.approx(-(300.0 - 273.15) * 2 + 1.0)
+
+        convert = EvaluateFormula(data=data_2t_tp, formula=formula).evaluate()
+        expected = (-(data_2t_tp["2t"].isel(time=0) - 273.15) * 2 + data_2t_tp["tprate"].isel(time=0)).mean()
+        assert np.allclose(convert.isel(time=0).mean().values, expected.values)
+        # no temporary variables are added to the input dataset
+        assert not [var for var in data_2t_tp.data_vars if str(var).startswith("_temp")]
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import xarray as xr
 from conftest import LOGLEVEL
@@ -424,3 +425,68 @@ def test_fdb_home_bridge_logs(capsys):
 
     source.chk_type = [0]
     source._get_partition(ii=0)
+
+
+def blocks_source():
+    """A GSVSource with the state read by get_blocks_dask(), and partitions filled with their time and level index"""
+    source = GSVSource.__new__(GSVSource)
+    source._request = DEFAULT_GSV_PARAMS["request"]
+    source.chk_start_date = source.chk_end_date = ["20080101", "20080102", "20080103"]
+    source.chk_start_idx = source.chk_end_idx = [0, 1, 2]
+    source.chk_size = [2, 2, 1]
+    source.chk_type = [0, 0, 0]
+    source.ntimechunks = 3
+    source.chunking_vertical = True
+    source.chk_vert = [["1000", "900"], ["800"]]
+    source.data_startdate, source.data_starttime = "20080101", "1200"
+    source.timestyle = "date"
+    source.fdbhome = source.fdbpath = source.fdbhome_bridge = source.fdbpath_bridge = None
+    source.databridge = source.hpc_expver = source.eccodes_path = source._var = None
+    source.engine = "fdb"
+    source.timeshift = False
+    source.gsv_log_level = source.logger = None
+    source.itime, source.ilevel = 0, 1
+
+    def fake_partition(ii, var=None):
+        i, j = source._index_to_timelevel(ii)
+        shape = (source.chk_size[i], len(source.chk_vert[j]), 4)
+        return xr.Dataset({var: (("time", "level", "values"), np.full(shape, 10 * i + j))})
+
+    source._get_partition = fake_partition
+    return source
+
+
+def test_get_blocks_dask():
+    """Test that the dask array has a single layer with one task per partition"""
+
+    source = blocks_source()
+    darr = source.get_blocks_dask("130", (5, 3, 4), "float64")
+    assert len(darr.dask.layers) == 1
+    assert len(darr.dask) == 6
+    values = darr.compute()
+    assert values[:, 0, 0].tolist() == [0, 0, 10, 10, 20]
+    assert values[0, :, 0].tolist() == [0, 0, 1]
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("timestyle", "step"),
+        ("chk_start_idx", [0, 2, 4]),
+        ("data_startdate", "20080102"),
+        ("data_starttime", "0000"),
+        ("chk_type", [1, 0, 0]),
+        ("fdbhome_bridge", "/bridge/home"),
+        ("fdbpath_bridge", "/bridge/config.yaml"),
+        ("hpc_expver", "0002"),
+        ("engine", "polytope"),
+    ],
+)
+def test_get_blocks_dask_name(field, value):
+    """Test that sources differing in any state read by the partitions give different dask arrays"""
+
+    source, other = blocks_source(), blocks_source()
+    assert source.get_blocks_dask("130", (5, 3, 4), "float64").name == other.get_blocks_dask("130", (5, 3, 4), "float64").name
+
+    setattr(other, field, value)
+    assert source.get_blocks_dask("130", (5, 3, 4), "float64").name != other.get_blocks_dask("130", (5, 3, 4), "float64").name
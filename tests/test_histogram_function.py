@@ -3,7 +3,7 @@ import numpy as np
 import pytest
 import xarray as xr
 
-from aqua import histogram
+from aqua import HistogramAccumulator, histogram
 
 
 @pytest.fixture
@@ -137,3 +137,50 @@ def test_histogram_weighted_no_lat():
     data.attrs["long_name"] = "Test Data"
     with pytest.raises(ValueError):
         histogram(data, weighted=True)
+
+
+@pytest.mark.aqua
+def test_histogram_dask_weighted(sample_data):
+    """
+    Test that the weighted histogram of chunked data matches numpy.
+    """
+    weights = np.cos(np.radians(xr.ones_like(sample_data) * sample_data.lat))
+    expected, _ = np.histogram(sample_data.values, bins=5, range=(0, 1), weights=weights.values)
+    hist = histogram(sample_data.chunk({"lat": 3, "lon": 4}), bins=5, range=(0, 1))
+    assert np.allclose(hist.values, expected)
+
+
+@pytest.mark.aqua
+def test_histogram_regions(sample_data):
+    """
+    Test the histograms of several regions computed together.
+    """
+    regions = {"south": {"lat": [0, 4]}, "box": {"lat": [2, 6], "lon": [8, 1]}, "all": xr.DataArray(True)}
+    hist = histogram(sample_data, bins=5, range=(0, 1), weighted=False, regions=regions)
+    assert hist.dims == ("region", "center_of_bin")
+    assert list(hist.region.values) == ["south", "box", "all"]
+    assert int(hist.sel(region="south").sum()) == 50
+    assert int(hist.sel(region="box").sum()) == 5 * 4  # longitudes across the wrap: 8, 9, 0, 1
+    assert np.array_equal(hist.sel(region="all").values, histogram(sample_data, bins=5, range=(0, 1), weighted=False).values)
+
+
+@pytest.mark.aqua
+def test_histogram_accumulator(sample_dataset):
+    """
+    Test that accumulated and merged histograms match the histogram of the whole data.
+    """
+    accumulator = HistogramAccumulator(range=(0, 1), bins=5)
+    accumulator.update(sample_dataset.isel(lat=slice(0, 4)))
+    other = HistogramAccumulator(range=(0, 1), bins=5)
+    other.update(sample_dataset.isel(lat=slice(4, None)).chunk({"lat": 2}))
+    accumulator.merge(other)
+
+    result = accumulator.result()
+    assert set(result.data_vars) == {"test_data", "second_var"}
+    for var in result.data_vars:
+        expected = histogram(sample_dataset[var], bins=5, range=(0, 1))
+        assert np.allclose(result[var].values, expected.values)
+        assert result[var].attrs["size_of_the_data"] == sample_dataset[var].size
+
+    with pytest.raises(ValueError):
+        accumulator.merge(HistogramAccumulator(range=(0, 2), bins=5))
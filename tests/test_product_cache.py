@@ -0,0 +1,78 @@
+"""Tests for the cache of time statistics shared by the diagnostics of an analysis"""
+
+import os
+
+import dask.array as da
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from aqua.core.reader.product_cache import CACHE_ENV, ProductCache
+from aqua.core.util import load_yaml
+
+loglevel = "DEBUG"
+
+
+def synthetic_data():
+    """Lazy variables with the attributes set by the Reader"""
+    time = pd.date_range("2000-01-01", periods=90, freq="D")
+    attrs = {"AQUA_model": "IFS", "AQUA_exp": "test-tco79", "AQUA_source": "long", "units": "K"}
+    data = xr.Dataset(
+        {
+            "2t": (("time", "lat", "lon"), da.random.random((90, 4, 8), chunks=(30, 4, 8))),
+            "skt": (("time", "lat", "lon"), da.random.random((90, 4, 8), chunks=(30, 4, 8))),
+        },
+        coords={"time": time, "lat": range(4), "lon": range(8)},
+    )
+    for var in data.data_vars:
+        data[var].attrs.update(attrs)
+    return data
+
+
+@pytest.mark.aqua
+def test_product_cache(tmp_path, monkeypatch):
+    """Products are returned for the same data only, and listed in the catalog"""
+    data = synthetic_data()
+    product = data.resample(time="MS").mean()
+
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "cache"))
+    assert ProductCache.from_environ() is None
+
+    cache = ProductCache(tmp_path / "cache", loglevel=loglevel)
+    keys = cache.store(data, product, "mean", freq="monthly")
+    assert len(keys) == 2
+    assert ProductCache.from_environ(loglevel=loglevel) is not None
+
+    cached = cache.lookup(data["2t"], "mean", freq="MS")
+    np.testing.assert_allclose(cached.values, product["2t"].values)
+    assert cache.lookup(data, "mean", freq="monthly")["skt"].shape == (3, 4, 8)
+
+    # different statistic, options, selection or values
+    assert cache.lookup(data["2t"], "max", freq="monthly") is None
+    assert cache.lookup(data["2t"], "mean", freq="monthly", time_bounds=True) is None
+    assert cache.lookup(data["2t"].isel(time=slice(0, 60)), "mean", freq="monthly") is None
+    assert cache.lookup(data["2t"] - 273.15, "mean", freq="monthly") is None
+
+    catalog = load_yaml(cache.write_catalog())
+    assert set(catalog["sources"]) == {"2t-native-MS-mean", "skt-native-MS-mean"}
+    assert os.path.exists(catalog["sources"]["2t-native-MS-mean"]["args"]["urlpath"])
+
+    cache.clear()
+    assert not os.path.exists(cache.path)
+    assert ProductCache.from_environ() is None
+
+
+@pytest.mark.aqua
+def test_product_cache_in_memory(tmp_path):
+    """In-memory data match only if their values are the same"""
+    data = synthetic_data()["2t"].load()
+    product = data.resample(time="MS").mean()
+
+    cache = ProductCache(tmp_path / "cache", loglevel=loglevel)
+    cache.store(data, product, "mean", freq="monthly")
+    assert cache.lookup(data.copy(deep=True), "mean", freq="monthly") is not None
+
+    masked = data.where(data > 0.5)
+    masked.attrs.update(data.attrs)
+    assert cache.lookup(masked, "mean", freq="monthly") is None
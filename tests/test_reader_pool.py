@@ -0,0 +1,46 @@
+"""Tests for the pool of shared Readers"""
+
+import pytest
+from conftest import LOGLEVEL
+
+from aqua import Reader
+from aqua.core.reader import ReaderPool
+
+pytestmark = pytest.mark.aqua
+
+ARGS = {"model": "IFS", "exp": "test-tco79", "source": "short"}
+
+
+def test_reader_pool_key():
+    """Arguments are normalised, extra and ignored arguments included"""
+    pool = ReaderPool(loglevel=LOGLEVEL)
+    assert pool.key("IFS", "test-tco79", "short") == pool.key(**ARGS, fix=True, loglevel="DEBUG")
+    assert pool.key(**ARGS, chunks={"time": 4, "vertical": 2}) == pool.key(**ARGS, chunks={"vertical": 2, "time": 4})
+    assert pool.key(**ARGS) != pool.key(**ARGS, regrid="r100")
+    assert pool.key(**ARGS) != pool.key(**ARGS, realization=1)
+
+
+def test_reader_pool():
+    """Readers are shared, bounded and invalidated"""
+    pool = ReaderPool(maxsize=2, loglevel=LOGLEVEL)
+    reader = pool.get(**ARGS, loglevel=LOGLEVEL)
+    assert isinstance(reader, Reader)
+
+    other = Reader(**ARGS, loglevel=LOGLEVEL)
+    assert Reader.instance is other
+    assert pool.get(**ARGS) is reader
+    assert Reader.instance is reader  # the shared Reader is the accessor default again
+    assert (pool.hits, pool.misses) == (1, 1)
+
+    # streaming Readers are never shared
+    assert pool.get(**ARGS, streaming=True) is not pool.get(**ARGS, streaming=True)
+    assert len(pool) == 1
+
+    pool.get(**ARGS, fix=False)
+    pool.get(**ARGS, areas=False)
+    assert len(pool) == 2
+    assert pool.get(**ARGS) is not reader  # least recently used, discarded
+
+    assert pool.invalidate(model="IFS", areas=False) == 1
+    assert pool.invalidate(model="IFS") == 1
+    assert len(pool) == 0
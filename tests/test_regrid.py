@@ -1,14 +1,26 @@
 """Test regridding from Reader"""
 
+import os
 from unittest.mock import MagicMock
 
+import dask
 import numpy as np
 import pytest
 import xarray as xr
 from conftest import APPROX_REL, LOGLEVEL
 
+import aqua.core
 from aqua import Reader, Regridder
 from aqua.core.regridder.griddicthandler import GridDictHandler
+from aqua.core.regridder.regridder_util import (
+    add_weights_operator,
+    check_existing_mmap,
+    mmap_path,
+    open_mmap,
+    open_weights_operator,
+    save_mmap,
+)
+from aqua.core.util import load_multi_yaml
 
 
 @pytest.fixture(
@@ -406,4 +418,115 @@ def test_regrid_method():
     assert data.values[0, 0] == pytest.approx(252.35510736926696)
 
 
+@pytest.mark.aqua
+def test_mmap_config():
+    """The mmap option of the grids configuration is merged with the grid files and read by the Regridder"""
+    folder = os.path.join(os.path.dirname(aqua.core.__file__), "config", "grids")
+    cfg = load_multi_yaml(folder_path=folder, definitions={"grids": "/grids", "weights": "/weights", "areas": "/areas"})
+    assert Regridder(cfg, src_grid_name="lon-lat", loglevel=LOGLEVEL).mmap is False
+
+    cfg["mmap"]["enabled"] = True
+    assert Regridder(cfg, src_grid_name="lon-lat", loglevel=LOGLEVEL).mmap is True
+
+
+@pytest.mark.aqua
+def test_mmap_store(tmp_path):
+    """Test the round trip of the memory-mappable store"""
+    data = xr.Dataset(
+        {"remap_matrix": (("num_links", "num_wgts"), np.random.rand(10, 1)), "src_address": ("num_links", np.arange(1, 11))},
+        coords={"lat": ("src_grid_size", np.linspace(-90, 90, 5))},
+        attrs={"title": "weights", "version": np.int32(2)},
+    )
+    data["remap_matrix"].attrs["units"] = "1"
+
+    assert mmap_path("/tmp/weights_r100.nc") == "/tmp/weights_r100.mmap"
+    store = str(tmp_path / "weights.mmap")
+    assert not check_existing_mmap(store)
+    save_mmap(data, store)
+    assert check_existing_mmap(store)
+
+    loaded = open_mmap(store)
+    xr.testing.assert_identical(loaded, data)
+    assert not loaded["src_address"].values.flags.writeable
+    with pytest.raises(ValueError):
+        loaded["src_address"].values[0] = 0
+
+
+def _is_memmap(array):
+    """True if the array is a view of a memory map"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def _operator(weights_matrix):
+    """The sparse operator of a single chunk weights matrix, as seen by the tasks (compute() copies it)"""
+    return dask.get(weights_matrix.__dask_graph__(), (weights_matrix.name, 0, 0))
+
+
+@pytest.mark.aqua
+def test_mmap_operator(tmp_path):
+    """The sparse operators of memory-mapped weights are built on the memory maps"""
+    rng = np.random.default_rng(42)
+    src_address, dst_address = np.tile(np.arange(1, 9), 2), np.repeat(np.arange(1, 5), 4)
+    weights = xr.Dataset(
+        {
+            "src_address": ("num_links", src_address.astype("int32")),
+            "dst_address": ("num_links", dst_address.astype("int32")),
+            "remap_matrix": (("num_links", "num_wgts"), rng.random((16, 1))),
+            "src_grid_dims": ("src_grid_rank", np.array([4, 2], dtype="int32")),
+            "dst_grid_dims": ("dst_grid_rank", np.array([4], dtype="int32")),
+            "src_grid_imask": ("src_grid_size", np.ones(8, dtype="int32")),
+            "dst_grid_imask": ("dst_grid_size", np.ones(4, dtype="int32")),
+            "dst_grid_frac": ("dst_grid_size", np.ones(4)),
+            "dst_grid_center_lat": ("dst_grid_size", np.radians([-45.0, -15.0, 15.0, 45.0])),
+            "dst_grid_center_lon": ("dst_grid_size", np.radians([0.0, 90.0, 180.0, 270.0])),
+        },
+        attrs={"source_grid": "lonlat", "dest_grid": "unstructured"},
+    )
+    store = str(tmp_path / "weights.mmap")
+    save_mmap(add_weights_operator(weights), store)
+    loaded = open_mmap(store)
+
+    operator = _operator(open_weights_operator(loaded))
+    assert _is_memmap(operator.coords) and _is_memmap(operator.data)
+    expected = np.zeros((8, 4))
+    np.add.at(expected, (src_address - 1, dst_address - 1), weights["remap_matrix"].values[:, 0])
+    np.testing.assert_allclose(operator.todense(), expected)
+    assert not loaded["dst_grid_masked"].values
+
+    data = xr.DataArray(
+        rng.random((3, 2, 4)),
+        coords={"time": range(3), "lat": [-45.0, 45.0], "lon": [0.0, 90.0, 180.0, 270.0]},
+        dims=("time", "lat", "lon"),
+        name="tas",
+    )
+    data.lat.attrs.update({"standard_name": "latitude", "units": "degrees_north"})
+    data.lon.attrs.update({"standard_name": "longitude", "units": "degrees_east"})
+    regridder = Regridder(data=data, loglevel=LOGLEVEL)
+    smmregridder = regridder._init_smmregridder(loaded, "2d")
+    assert _is_memmap(_operator(smmregridder.grids[0].weights_matrix).data)
+    expected = regridder._init_smmregridder(weights, "2d").regrid(data)
+    xr.testing.assert_allclose(smmregridder.regrid(data), expected)
+
+
+@pytest.mark.aqua
+def test_regrid_mmap():
+    """Test regridding with weights and areas opened from memory-mappable stores"""
+    reader = Reader(model="IFS", exp="test-tco79", source="short", regrid="r100", loglevel=LOGLEVEL)
+    data = reader.retrieve(var="2t")["2t"].isel(time=0)
+    expected = reader.regrid(data)
+
+    regridder = reader.regridder
+    regridder.mmap = True
+    weights = regridder.weights(tgt_grid_name="r100")
+    assert all(not w["remap_matrix"].values.flags.writeable for w in weights.values())
+    areas = regridder.areas()
+    assert "cell_area" in areas
+
+    xr.testing.assert_allclose(regridder.regrid(data), expected)
+
+
 # missing test for ICON-Healpix
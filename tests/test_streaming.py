@@ -1,10 +1,12 @@
 """Tests for streaming"""
 
+import numpy as np
 import pandas as pd
 import pytest
+import xarray as xr
 from conftest import APPROX_REL, LOGLEVEL
 
-from aqua import Reader
+from aqua import Reader, Streaming
 
 # pytest approximation, to bear with different machines
 approx_rel = APPROX_REL
@@ -76,3 +78,39 @@ class TestAquaStreaming:
         reader.reset_stream()
         data = reader.retrieve()
         assert data.time.values[0] == start_date
+
+    def test_stream_retrieve(self, reader_instance_with_args):
+        """
+        Test that the streaming generator yields the same chunks as successive retrieves
+        """
+        reader = reader_instance_with_args
+
+        chunks = list(reader.stream_retrieve())
+        assert len(chunks) >= 1
+
+        reader.reset_stream()
+        for chunk in chunks[:3]:
+            data = reader.retrieve()
+            assert (data.time.values == chunk.time.values).all()
+
+
+@pytest.mark.aqua
+def test_stream_boundaries_cached():
+    """
+    Test that the chunk boundaries are computed once and that
+    the generator covers the whole time axis
+    """
+    time = pd.date_range("2000-01-01", periods=24 * 365, freq="h")
+    data = xr.Dataset({"a": ("time", np.arange(len(time)))}, coords={"time": time})
+    streamer = Streaming(aggregation="monthly")
+
+    first = streamer.stream(data)
+    boundaries = streamer._boundaries
+    second = streamer.stream(data.copy())  # same time axis, new dataset
+    assert streamer._boundaries is boundaries
+    assert first.time.values[-1] < second.time.values[0]
+
+    chunks = list(streamer.generator(data))
+    assert len(chunks) == 12
+    assert sum(chunk.sizes["time"] for chunk in chunks) == len(time)
+    assert streamer.idx == 2
@@ -1,9 +1,16 @@
 """Test for timmean method"""
 
+import warnings
+
 import numpy as np
+import pandas as pd
 import pytest
+import xarray as xr
 
 from aqua.core.histogram import histogram
+from aqua.core.timstat import TimStat
+from aqua.core.timstat.climatology import CLIMATOLOGIES, anomalies, climatology_labels
+from aqua.core.timstat.grouped import group_codes, grouped_stat, select_strategy
 
 
 @pytest.fixture(scope="module", params=["long", "long400"])
@@ -234,3 +241,126 @@ class TestTimmean:
             assert len(aligned) == len(avg_with_mask)
         except KeyError as e:
             pytest.fail(f"Coordinate alignment failed: {e}")
+
+
+def timeseries(time, seed=42):
+    """Synthetic 2t on a small grid for the given times, with missing values at a grid point"""
+    values = 280 + np.random.default_rng(seed).standard_normal((len(time), 4, 5))
+    values[10:40, 0, 0] = np.nan
+    return xr.DataArray(
+        values,
+        dims=["time", "lat", "lon"],
+        name="2t",
+        attrs={"units": "K"},
+        coords={"time": time, "lat": [-45.0, -15.0, 15.0, 45.0], "lon": np.arange(5.0)},
+    )
+
+
+@pytest.fixture(scope="module")
+def hourly():
+    """Hourly data with a gap of a few days"""
+    return timeseries(pd.date_range("2020-01-01", periods=24 * 100, freq="h").delete(range(24 * 40, 24 * 45)))
+
+
+@pytest.fixture(scope="module")
+def daily():
+    """Daily data over a few years, starting and ending within a season"""
+    return timeseries(pd.date_range("2000-01-15", "2003-10-20", freq="D"), seed=7)
+
+
+@pytest.mark.aqua
+class TestGroupedStat:
+    """Grouped statistics against the xarray resampling"""
+
+    @pytest.mark.parametrize("stat", ["mean", "std", "max", "min", "sum"])
+    @pytest.mark.parametrize("chunks, strategy", [(None, None), (24, "blockwise"), (100, "rechunk"), (7, "map-reduce")])
+    def test_grouped_stat(self, hourly, stat, chunks, strategy):
+        """Grouped statistics match the xarray resampling, whatever the mapping of groups on chunks"""
+        data = hourly if chunks is None else hourly.chunk({"time": chunks, "lat": 2})
+        freq = "MS" if strategy == "map-reduce" else "1D"
+        if strategy:
+            codes, _ = group_codes(data.time, freq)
+            assert select_strategy(codes, data.chunks[0]) == strategy
+            xr.testing.assert_allclose(grouped_stat(data, stat, freq, strategy=strategy), grouped_stat(data, stat, freq))
+
+        expected = getattr(hourly.resample(time=freq), stat)()
+        result = grouped_stat(data, stat, freq)
+        xr.testing.assert_allclose(result, expected)
+        assert result.attrs == hourly.attrs
+
+    def test_grouped_strategy_error(self, hourly):
+        """A forced strategy has to fit the chunks"""
+        data = hourly.chunk({"time": 100})
+        with pytest.raises(ValueError, match="whole groups"):
+            grouped_stat(data, "mean", "1D", strategy="blockwise")
+        with pytest.raises(ValueError, match="not supported"):
+            grouped_stat(data, "mean", "1D", strategy="groupby")
+
+    def test_grouped_histogram(self, hourly):
+        """Grouped histograms match the histograms of each group, empty ones included"""
+        expected = hourly.resample(time="1D").map(histogram, bins=10, range=(278, 282), density=True)
+        for data in [hourly, hourly.chunk({"time": 50})]:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", RuntimeWarning)
+                result = TimStat().timstat(data, stat="histogram", freq="1D", bins=10, range=(278, 282), density=True)
+            xr.testing.assert_allclose(result, expected)
+            assert {key: value for key, value in result.attrs.items() if key != "history"} == expected.attrs
+            assert result.name == expected.name == "pdf"
+            assert np.isnan(result.isel(time=42)).all()
+
+
+@pytest.mark.aqua
+class TestClimatology:
+    """Climatologies and anomalies against the xarray groupby"""
+
+    @pytest.mark.parametrize("stat", ["mean", "std", "max", "min"])
+    @pytest.mark.parametrize("chunks", [None, 100])
+    def test_climatology(self, daily, stat, chunks):
+        """Climatologies computed together match the xarray groupby of each of them"""
+        data = daily if chunks is None else daily.chunk({"time": chunks})
+        result = TimStat().climatology(data, freq=["monthly", "seasonal", "dayofyear"], stat=stat)
+        for freq, dim in CLIMATOLOGIES.items():
+            expected = getattr(daily.groupby(f"time.{dim}"), stat)()
+            if freq == "seasonal":
+                expected = expected.sel(season=climatology_labels("seasonal"))
+            xr.testing.assert_allclose(result[freq], expected.assign_coords({dim: result[freq][dim]}))
+            assert result[freq].attrs["units"] == "K"
+
+    def test_climatology_exclude_incomplete(self, daily):
+        """Incomplete seasons are excluded, as in timstat"""
+        result = TimStat().climatology(daily, freq="seasonal", exclude_incomplete=True)
+        complete = daily.sel(time=slice("2000-03-01", "2003-08-31"))
+        expected = complete.groupby("time.season").mean().sel(season=climatology_labels("seasonal"))
+        xr.testing.assert_allclose(result, expected)
+
+    @pytest.mark.parametrize("freq", ["monthly", "seasonal", "dayofyear"])
+    def test_anomalies(self, daily, freq):
+        """Anomalies are lazy and computed from the kept climatology of the base period"""
+        timstat = TimStat()
+        base_period = ("2000-03-01", "2002-02-28")
+        data = daily.chunk({"time": 90}).to_dataset()
+        result = timstat.anomalies(data, freq=freq, base_period=base_period)
+        assert result["2t"].chunks == data["2t"].chunks
+
+        dim = CLIMATOLOGIES[freq]
+        base = daily.sel(time=slice(*base_period))
+        expected = daily.groupby(f"time.{dim}") - base.groupby(f"time.{dim}").mean()
+        xr.testing.assert_allclose(result["2t"], expected.drop_vars(dim))
+        assert len(timstat._climatologies) == 1
+
+        # the climatology of the base period is not computed again
+        again = timstat.anomalies(data, freq=freq, base_period=base_period)
+        assert len(timstat._climatologies) == 1
+        xr.testing.assert_allclose(again, result)
+        with pytest.raises(ValueError):
+            timstat.anomalies(data, freq=freq, base_period=("1990-01-01", "1990-12-31"))
+
+    def test_anomalies_time_not_first(self, daily):
+        """Anomalies keep the dimension order of data whose time axis is not the first one"""
+        data = daily.transpose("lat", "time", "lon")
+        clim = TimStat().climatology(data, freq="monthly")  # (lat, month, lon)
+        for array in [data, data.chunk({"time": 90})]:
+            result = anomalies(array, clim)
+            assert result.dims == data.dims
+            expected = daily.groupby("time.month") - daily.groupby("time.month").mean()
+            xr.testing.assert_allclose(result, expected.drop_vars("month").transpose(*data.dims))
@@ -1,9 +1,13 @@
 """Test cases for the Trender class."""
 
+import numpy as np
+import pandas as pd
 import pytest
+import xarray as xr
 from conftest import LOGLEVEL
 
 from aqua import Reader
+from aqua.core.reader import Trender
 
 loglevel = LOGLEVEL
 
@@ -54,3 +58,29 @@ class TestTrender:
 
         assert list(det2.data_vars) == ["2t", "skt"]
         assert pytest.approx(det2["skt"].isel(time=10, lon=2, lat=2).values) == -0.098381225331
+
+
+@pytest.mark.aqua
+def test_trender_polyfit():
+    """Closed-form fit matches xarray polyfit, also skipping NaNs and accumulating chunks"""
+    time = pd.date_range("2000-01-01", periods=120, freq="MS")
+    values = np.random.default_rng(0).random((120, 4, 5)) + np.linspace(0, 2, 120)[:, None, None] ** 2
+    data = xr.DataArray(values, dims=("time", "lat", "lon"), coords={"time": time})
+    data[10:30, 0, 0] = np.nan
+    trender = Trender(loglevel=loglevel)
+
+    reference = data.polyfit("time", deg=2, skipna=True).polyfit_coefficients
+    coeffs = trender.coeffs(data.chunk({"time": 40}), degree=2, skipna=True)
+    np.testing.assert_allclose(coeffs.values, reference.values, rtol=1e-6)
+
+    trend = trender.trend(data.isel(lat=slice(1, 4)), degree=2)
+    reference = xr.polyval(data.time, data.isel(lat=slice(1, 4)).polyfit("time", deg=2).polyfit_coefficients)
+    np.testing.assert_allclose(trend.values, reference.transpose(*trend.dims).values, rtol=1e-6)
+
+    fit = trender.accumulator(degree=2)
+    for start in range(0, 120, 50):
+        fit.update(data.isel(time=slice(start, start + 50)))
+    np.testing.assert_allclose(fit.coeffs().values, coeffs.values, rtol=1e-6)
+    chunk = data.isel(time=slice(50, 60))
+    trend = trender.trend(data, degree=2, skipna=True).isel(time=slice(50, 60))
+    np.testing.assert_allclose(fit.detrend(chunk).values, (chunk - trend).values, rtol=1e-6, atol=1e-10)
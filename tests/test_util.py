@@ -18,7 +18,8 @@ from aqua.core.util import (
 )
 from aqua.core.util.string import lat_to_phrase, strlist_to_phrase
 from aqua.core.util.time import frequency_string_to_pandas
-from aqua.core.util.units import multiply_units
+from aqua.core.util.units import _conversion_plan, convert_units, multiply_units
+from aqua.core.util.zarr import create_zarr_reference
 
 
 @pytest.fixture
@@ -272,6 +273,23 @@ def test_multiply_units_no_normalization():
     assert result == "meter ** 2"
 
 
+@pytest.mark.aqua
+def test_convert_units_cached_plan():
+    """Test that unit conversion plans are cached and returned as independent copies"""
+    _conversion_plan.cache_clear()
+    first = convert_units("K", "Celsius")
+    assert first == {"offset": pytest.approx(-273.15)}
+    first["offset"] = 0
+    second = convert_units("K", "Celsius", var="2t")
+    assert second == {"offset": pytest.approx(-273.15)}
+    info = _conversion_plan.cache_info()
+    assert info.misses == 1 and info.hits == 1
+
+    # deltat is part of the cache key
+    assert convert_units("kg m-2", "kg m-2 s-1", deltat=3600)["factor"] == pytest.approx(1 / 3600)
+    assert convert_units("kg m-2", "kg m-2 s-1", deltat=60)["factor"] == pytest.approx(1 / 60)
+
+
 @pytest.mark.aqua
 def test_cftime_365cal():
     """Test cftime with 365-day calendar"""
@@ -316,3 +334,25 @@ def test_frequency_string_to_pandas(input_freq, expected_output):
     """Test the frequency_string_to_pandas function with and without numerical prefixes"""
     result = frequency_string_to_pandas(input_freq)
     assert result == expected_output
+
+
+@pytest.mark.aqua
+@pytest.mark.parametrize("parquet", [False, True])
+def test_create_zarr_reference_update(tmp_path, parquet):
+    """Test the parallel and incremental creation of a Zarr reference"""
+    files = []
+    for month in range(1, 5):
+        time = pd.date_range(f"2000-0{month}-01", periods=3, freq="D")
+        data = xr.Dataset({"a": (("time", "lat"), np.random.rand(3, 5))}, coords={"time": time, "lat": np.arange(5.0)})
+        files.append(str(tmp_path / f"data_{month}.nc"))
+        data.to_netcdf(files[-1])
+
+    outfile = str(tmp_path / ("reference.parq" if parquet else "reference.json"))
+    assert create_zarr_reference(files[:2], outfile, loglevel=LOGLEVEL, nprocs=2, parquet=parquet) == outfile
+    create_zarr_reference(files, outfile, loglevel=LOGLEVEL, update=True, parquet=parquet)
+
+    options = {"fo": outfile, "remote_protocol": "file"}
+    data = xr.open_dataset("reference://", engine="zarr", backend_kwargs={"consolidated": False, "storage_options": options})
+    with xr.open_mfdataset(files) as expected:
+        assert data.time.size == 12
+        xr.testing.assert_allclose(data.a, expected.a)
@@ -1,9 +1,12 @@
 """Tests for streaming"""
 
+import numpy as np
 import pytest
+import xarray as xr
 from conftest import LOGLEVEL
 
 from aqua import Reader
+from aqua.core.vertinterp import level_weights, vertinterp
 
 loglevel = LOGLEVEL
 
@@ -50,3 +53,35 @@ def test_vertinterp_exceptions(reader, data):
     # no levels
     with pytest.raises(KeyError):
         reader.vertinterp(select["ocpt"], units="m", vert_coord="nz1")
+
+
+@pytest.mark.aqua
+def test_vertinterp_engine():
+    """Gather and blend interpolation matches xarray interp, also on column levels and log-pressure"""
+    plev = np.array([100000, 92500, 85000, 70000, 50000, 30000, 10000.0])
+    values = np.random.default_rng(42).random((3, plev.size, 4, 5)).astype("float32")
+    data = xr.DataArray(values, dims=("time", "plev", "lat", "lon"), coords={"plev": ("plev", plev, {"units": "Pa"})})
+    targets = [100000, 92500, 60000, 40000, 5000]
+
+    for method in ["linear", "nearest"]:
+        interp = vertinterp(data.chunk({"time": 1, "plev": 2}), targets, method=method)
+        assert interp.dims == data.dims
+        assert interp.dtype == np.float32
+        np.testing.assert_allclose(interp.values, data.interp(plev=targets, method=method).values, rtol=1e-5)
+
+    assert level_weights.cache_info().currsize >= 2
+    assert vertinterp(data, 60000).dims == ("time", "lat", "lon")
+
+    pressure = data.plev.broadcast_like(data)
+    interp = vertinterp(data, targets, pressure=pressure, log=True)
+    reference = data.assign_coords(plev=np.log(plev)).interp(plev=np.log(targets))
+    np.testing.assert_allclose(interp.values, reference.values, rtol=1e-5)
+
+    # pressure without some dimensions of the data, e.g. constant in time
+    for chunks in [{}, {"time": 1, "lat": 2}]:
+        interp = vertinterp(data.chunk(chunks), targets, pressure=pressure.isel(time=0, drop=True), log=True)
+        assert interp.dims == data.dims
+        np.testing.assert_allclose(interp.values, reference.values, rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        vertinterp(data, targets, method="cubic")